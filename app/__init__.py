@@ -1,13 +1,13 @@
 from flask import Flask
 from app.configs.base_config import BaseConfig
-from app.extensions import db
+from app.extensions import db, init_extensions
 
 app = Flask(__name__)
 config = BaseConfig(app.root_path)
 app.config.from_object(config)
 
 # Initialize extensions
-db.init_app(app)
+init_extensions(app)
 
 if __name__ == '__main__':
     app.run()
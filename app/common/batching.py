@@ -0,0 +1,123 @@
+"""Bounded-memory iteration over large tables for bots and maintenance jobs.
+
+``iter_chunks`` walks a query in primary-key order with keyset chunks
+(``WHERE pk > :last ORDER BY pk LIMIT :chunk_size``) instead of OFFSET, so
+every chunk costs the same no matter how deep into the table the job is.
+After the caller has handled a chunk the helper commits, records the last
+key in a JobCheckpoint and expunges the chunk from the session, so the
+identity map never holds more than one chunk of rows.
+"""
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
+from sqlalchemy import func, select, update
+from app.models.job_checkpoint import JobCheckpoint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', 500))
+
+def iter_chunks(query, key=None, chunk_size: Optional[int] = None,
+                checkpoint: Optional[str] = None, throttle: Optional[float] = None,
+                commit: bool = True, expunge_all: bool = False,
+                reset_on_complete: bool = True) -> Iterator[List]:
+    """Yield the rows of an ORM query as lists of at most ``chunk_size`` rows.
+
+    Work done on a chunk is committed when the caller asks for the next one.
+    If the caller raises, the current chunk is neither committed nor
+    checkpointed, so a rerun with the same checkpoint resumes at that chunk.
+
+    Args:
+        query: ORM query over a single entity, e.g.
+            ``db.session.query(Stipend).filter(...)``
+        key: Integer ordering column, defaults to the entity's primary key
+        chunk_size: Rows per chunk, defaults to BATCH_CHUNK_SIZE
+        checkpoint: JobCheckpoint name used to resume an interrupted run
+        throttle: Seconds to sleep between chunks, defaults to BATCH_THROTTLE_SECONDS
+        commit: Commit the session after each chunk
+        expunge_all: Clear the whole session after each chunk, not only the
+            chunk rows, for jobs that lazy-load many related objects
+        reset_on_complete: Clear the checkpoint once the walk finishes so
+            the next run starts from the beginning
+    """
+    session = query.session
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    throttle = float(os.getenv('BATCH_THROTTLE_SECONDS', 0)) if throttle is None else throttle
+    if key is None:
+        entity = query.column_descriptions[0]['entity']
+        key = getattr(entity, list(entity.__table__.primary_key.columns)[0].key)
+
+    last_key = None
+    if checkpoint:
+        last_key = JobCheckpoint.get_or_create(checkpoint).last_id
+        session.commit()
+        if last_key is not None:
+            logger.info(f"Resuming {checkpoint} after key {last_key}")
+
+    while True:
+        chunk_query = query if last_key is None else query.filter(key > last_key)
+        # The LIMIT bounds memory; the whole chunk is loaded at once
+        chunk = chunk_query.order_by(key).limit(chunk_size).all()
+        if not chunk:
+            break
+        # Read the key before the chunk is committed and expunged
+        last_key = getattr(chunk[-1], key.key)
+
+        yield chunk
+
+        if checkpoint:
+            _save_checkpoint(session, checkpoint, last_key)
+        if commit:
+            session.commit()
+        if expunge_all:
+            session.expunge_all()
+        else:
+            for row in chunk:
+                if row in session:
+                    session.expunge(row)
+        if len(chunk) < chunk_size:
+            break
+        if throttle:
+            time.sleep(throttle)
+
+    if checkpoint and reset_on_complete:
+        _save_checkpoint(session, checkpoint, None)
+        session.commit()
+
+def _save_checkpoint(session, name, last_key):
+    session.execute(update(JobCheckpoint).where(JobCheckpoint.name == name).values(
+        last_id=last_key, updated_at=datetime.utcnow()
+    ))
+
+def committed_id_bound(session, id_column, timestamp_column, after, chunk_size, lag):
+    """Upper id bound for the next chunk of a watermark job over an append-only table
+
+    Rows inserted in the last ``lag`` seconds and every row after them are
+    held back, so a transaction that took a lower id but commits late is
+    still ahead of the watermark when it becomes visible. A chunk after an
+    id gap wider than ``chunk_size`` starts at the next existing id.
+
+    Returns:
+        Optional[int]: The last id to process, or None if nothing is ready
+    """
+    upper = session.execute(
+        select(func.max(id_column)).where(id_column > after, id_column <= after + chunk_size)
+    ).scalar()
+    if upper is None:
+        # Jump over id gaps wider than one chunk instead of stalling before them
+        following = session.execute(select(func.min(id_column)).where(id_column > after)).scalar()
+        if following is not None:
+            upper = session.execute(
+                select(func.max(id_column)).where(id_column >= following, id_column < following + chunk_size)
+            ).scalar()
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=lag)
+    too_recent = session.execute(
+        select(func.min(id_column)).where(id_column > after, timestamp_column >= cutoff)
+    ).scalar()
+    if too_recent is not None and (upper is None or too_recent <= upper):
+        upper = too_recent - 1
+    if upper is None or upper <= after:
+        return None
+    return upper
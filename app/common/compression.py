@@ -0,0 +1,91 @@
+"""Parallel gzip compression for large streams such as database dumps.
+
+``ParallelGzipWriter`` splits its input into fixed-size blocks and
+compresses each one as an independent gzip member on a thread pool
+(zlib releases the GIL, so the threads run on separate cores), then
+writes the members in input order. Concatenated members are a valid
+gzip file (RFC 1952), so the output reads with ``gzip -d``, ``zcat``,
+``pigz -d`` and Python's ``gzip`` module. Each member costs about 20
+bytes of header, and the ratio is slightly below single-stream gzip
+because blocks do not share a dictionary.
+"""
+import gzip
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+class ParallelGzipWriter:
+    """Binary file-like writer producing multi-member gzip output
+
+    Args:
+        fileobj: Binary file opened for writing, or a path
+        level (int): Compression level (1-9)
+        threads (int): Compression threads, defaulting to the CPU count
+        block_size (int): Uncompressed bytes per gzip member
+    """
+
+    def __init__(self, fileobj, level=6, threads=None, block_size=DEFAULT_BLOCK_SIZE):
+        if not 1 <= level <= 9:
+            raise ValueError("Compression level must be between 1 and 9")
+        self._owns_file = isinstance(fileobj, (str, os.PathLike))
+        self._file = open(fileobj, 'wb') if self._owns_file else fileobj
+        self.level = level
+        self.threads = max(1, threads or os.cpu_count() or 1)
+        self.block_size = block_size
+        self._buffer = bytearray()
+        self._pending = deque()
+        # Bound the blocks in flight so a fast producer cannot fill memory
+        self._max_pending = self.threads * 2
+        self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='gzip')
+        self.closed = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed ParallelGzipWriter")
+        self._buffer += data
+        self.bytes_in += len(data)
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[:self.block_size]))
+            del self._buffer[:self.block_size]
+        return len(data)
+
+    def _submit(self, block):
+        self._pending.append(self._pool.submit(gzip.compress, block, self.level, mtime=0))
+        while len(self._pending) >= self._max_pending:
+            self._write_next()
+
+    def _write_next(self):
+        member = self._pending.popleft().result()
+        self._file.write(member)
+        self.bytes_out += len(member)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self._buffer or not self.bytes_in:
+                # An empty input still becomes one valid, empty gzip member
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._write_next()
+            self._file.flush()
+        finally:
+            self.closed = True
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            if self._owns_file:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
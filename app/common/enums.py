@@ -6,6 +6,7 @@ class NotificationType(Enum):
     # System and Admin Actions
     ADMIN_ACTION = 'admin_action'
     SYSTEM = 'system'
+    DIGEST = 'digest'
     
     # Audit and Logging
     AUDIT_LOG = 'audit_log'  # Add this line
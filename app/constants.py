@@ -20,6 +20,15 @@ class NotificationPriority(Enum):
     HIGH = 'high'
     CRITICAL = 'critical'
 
+class AuditDurability(str, Enum):
+    SYNC = 'sync'    # Written in the caller's transaction before it returns
+    ASYNC = 'async'  # Queued and written in batches by a background thread
+
+class AuditReadMode(str, Enum):
+    COALESCE = 'coalesce'  # One row per user/endpoint/window with a hit count
+    SAMPLE = 'sample'      # A random fraction of reads, each weighted by its hit count
+    EXACT = 'exact'        # One row per read, like any other event
+
 class FlashCategory(str, Enum):
     SUCCESS = "success"
     ERROR = "error"
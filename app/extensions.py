@@ -20,3 +20,12 @@ def init_extensions(app):
     csrf.init_app(app)
     limiter.init_app(app)
     mail.init_app(app)
+
+    from app.services.audit_writer import audit_writer
+    audit_writer.init_app(app)
+
+    from app.services.notification_hub import notification_hub
+    notification_hub.init_app(app)
+
+    from app.services.mail_queue import mail_queue
+    mail_queue.init_app(app)
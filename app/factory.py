@@ -1,29 +1,30 @@
 from flask import Flask
-from app.configs.base_config import BaseConfig, ProductionConfig
-from flask_sqlalchemy import SQLAlchemy
-
-db = SQLAlchemy()
+from app.configs.base_config import BaseConfig, ProductionConfig, TestingConfig
+from app.extensions import init_extensions
 
 def create_app(env='development'):
     if env == 'development':
         config_class = BaseConfig
+    elif env == 'testing':
+        config_class = TestingConfig
     else:
         config_class = ProductionConfig
-        
+
     app = Flask(__name__)
     # Pass app.root_path as a string to BaseConfig
     config = config_class(str(app.root_path))
-    app.config = config
-    
-    # Initialize database
-    db.init_app(app)
-    
+    app.config.from_object(config)
+
+    # Initialize the database and the background services (audit writer,
+    # notification hub, mail queue) that only run for their own app
+    init_extensions(app)
+
     # Setup paths
     config._setup_paths()
-    
+
     # Register blueprints
     with app.app_context():
         from app.routes import register_blueprints
         register_blueprints(app)
-        
+
     return app
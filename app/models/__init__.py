@@ -5,3 +5,12 @@ from app.models.audit_log import AuditLog
 from app.models.organization import Organization
 from app.models.stipend import Stipend
 from app.models.tag import Tag
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.review_finding import ReviewFinding
+from app.models.crawl_frontier import CrawlHost, CrawlURL
+from app.models.stipend_signature import StipendSignature, StipendLSHBand, DuplicateCandidate
+from app.models.bot import Bot
+from app.models.bot_run import BotRun, BotRunLogChunk
+from app.models.audit_rollup import AuditRollup
+from app.models.notification_counter import NotificationCounter
+from app.models.notification_read import NotificationReadMark, NotificationReadState
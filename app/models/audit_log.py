@@ -1,19 +1,27 @@
 import logging
 import json
+import os
+import weakref
 from datetime import datetime, timezone
-from app.constants import NotificationType
-from flask import current_app
+from app.constants import AuditDurability
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import JSONB
 from app.extensions import db
 
-# Lazy import to avoid circular dependency
-def get_notification_model():
-    from app.models.notification import Notification
-    return Notification
-
 logger = logging.getLogger(__name__)
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_log'
+    __table_args__ = (
+        # Audit explorer filters; each ends with timestamp for newest-first paging
+        db.Index('ix_audit_log_user_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_audit_log_object_timestamp', 'object_type', 'object_id', 'timestamp'),
+        db.Index('ix_audit_log_action_timestamp', 'action', 'timestamp'),
+        # Containment queries on diffs, e.g. changes @> '{"diff": {"name": []}}'
+        db.Index('ix_audit_log_changes', 'changes', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        # Ids stay monotonic when a rollover empties the table; id watermarks depend on it
+        {'sqlite_autoincrement': True},
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     action = db.Column(db.String(100), nullable=False)
@@ -22,92 +30,169 @@ class AuditLog(db.Model):
     details = db.Column(db.Text, nullable=True)
     details_before = db.Column(db.Text, nullable=True)
     details_after = db.Column(db.Text, nullable=True)
+    # Compact payload, see compute_changes; details_before/after hold legacy rows
+    changes = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'), nullable=True)
     ip_address = db.Column(db.String(45), nullable=True)
     http_method = db.Column(db.String(10), nullable=True)
     endpoint = db.Column(db.String(100), nullable=True)
-    timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
+    # Read events are coalesced or sampled: hits this row stands for, and the last one
+    hit_count = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    last_seen_at = db.Column(db.DateTime, nullable=True)
+    # Whether the notification fan-out should consider this entry
+    notify = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
 
     @staticmethod
-    def create(user_id, action, details=None, object_type=None, object_id=None,
-              details_before=None, details_after=None, ip_address=None,
-              http_method=None, endpoint=None, commit=True, notify=True):
-        """Create audit log entry with enhanced error handling and logging"""
-        logger = logging.getLogger(__name__)
+    def build_row(user_id, action, details=None, object_type=None, object_id=None,
+                  details_before=None, details_after=None, ip_address=None,
+                  http_method=None, endpoint=None, notify=True):
+        """Validate an audit entry and return it as a row dict"""
+        # Validate required fields
+        if not action:
+            logger.error("Attempt to create audit log without action")
+            raise ValueError("Action is required")
+        if not isinstance(action, str):
+            logger.error(f"Invalid action type: {type(action)}")
+            raise TypeError("Action must be a string")
         
-        # Ensure audit_log table exists
-        if not db.inspect(db.engine).has_table('audit_log'):
-            logger.error("Audit log table does not exist")
-            raise RuntimeError("Audit log table not found")
-            
+        # Validate object type/id relationship
+        if object_type and not object_id:
+            raise ValueError("object_id is required when object_type is provided")
+        if object_id and not object_type:
+            raise ValueError("object_type is required when object_id is provided")
+        
+        # Validate string lengths
+        if action and len(action) > 100:
+            raise ValueError("Action exceeds maximum length of 100 characters")
+        if object_type and len(object_type) > 50:
+            raise ValueError("Object type exceeds maximum length of 50 characters")
+        
+        # Validate and diff complex data
+        if details_before and not isinstance(details_before, (dict, str)):
+            raise ValueError("details_before must be dict or JSON string")
+        if details_after and not isinstance(details_after, (dict, str)):
+            raise ValueError("details_after must be dict or JSON string")
+
+        changes = None
         try:
-            logger.info(f"Creating audit log: {action} by user {user_id}")
-            
-            # Validate required fields
-            if not action:
-                logger.error("Attempt to create audit log without action")
-                raise ValueError("Action is required")
-            if not isinstance(action, str):
-                logger.error(f"Invalid action type: {type(action)}")
-                raise TypeError("Action must be a string")
-            
-            # Validate object type/id relationship
-            if object_type and not object_id:
-                raise ValueError("object_id is required when object_type is provided")
-            if object_id and not object_type:
-                raise ValueError("object_type is required when object_id is provided")
-            
-            # Validate string lengths
-            if action and len(action) > 100:
-                raise ValueError("Action exceeds maximum length of 100 characters")
-            if object_type and len(object_type) > 50:
-                raise ValueError("Object type exceeds maximum length of 50 characters")
-            
-            # Validate and serialize complex data
-            if details_before and not isinstance(details_before, (dict, str)):
-                raise ValueError("details_before must be dict or JSON string")
-            if details_after and not isinstance(details_after, (dict, str)):
-                raise ValueError("details_after must be dict or JSON string")
-            
-            # Convert dictionaries to JSON strings
+            before = json.loads(details_before) if isinstance(details_before, str) else details_before
+            after = json.loads(details_after) if isinstance(details_after, str) else details_after
+            if isinstance(before, (dict, type(None))) and isinstance(after, (dict, type(None))):
+                changes = compute_changes(before, after)
+        except ValueError:
+            pass
+        if changes is not None:
+            details_before = details_after = None
+        else:
+            # Free-form payloads that are not JSON objects are kept as text
             if isinstance(details_before, dict):
                 details_before = json.dumps(details_before)
             if isinstance(details_after, dict):
                 details_after = json.dumps(details_after)
 
-            # Create the audit log entry
-            log = AuditLog(
-                user_id=user_id,
-                action=action,
-                details=details,
-                object_type=object_type,
-                object_id=object_id,
-                details_before=details_before,
-                details_after=details_after,
-                ip_address=ip_address,
-                http_method=http_method,
-                endpoint=endpoint,
-                timestamp=datetime.now(timezone.utc)
-            )
-            
-            # Use context manager for session management
-            with db.session.begin_nested():
-                db.session.add(log)
-                if commit:
-                    db.session.commit()
+        return {
+            'user_id': user_id,
+            'action': action,
+            'details': details,
+            'object_type': object_type,
+            'object_id': object_id,
+            'details_before': details_before,
+            'details_after': details_after,
+            'changes': changes,
+            'ip_address': ip_address,
+            'http_method': http_method,
+            'endpoint': endpoint,
+            'timestamp': datetime.now(timezone.utc),
+            'hit_count': 1,
+            'last_seen_at': None,
+            'notify': notify
+        }
+
+    def reconstruct_states(self):
+        """Rebuild the full object state before and after this entry
+
+        Update entries only store changed fields, so the object's earlier
+        entries are replayed from its create entry (or the oldest one still
+        in the table). Fields that no remaining entry mentions are missing.
+
+        Returns:
+            tuple: (before, after) dicts; before is None for creates and
+            after is None for deletes
+        """
+        if self.object_type is None:
+            return apply_changes(None, self.changes, self.details_before, self.details_after)
+        history = db.session.query(
+            AuditLog.changes, AuditLog.details_before, AuditLog.details_after
+        ).filter(
+            AuditLog.object_type == self.object_type,
+            AuditLog.object_id == self.object_id,
+            tuple_(AuditLog.timestamp, AuditLog.id) <= tuple_(self.timestamp, self.id)
+        ).order_by(AuditLog.timestamp, AuditLog.id)
+        before = after = None
+        for changes, details_before, details_after in history:
+            before, after = apply_changes(after, changes, details_before, details_after)
+        return before, after
+
+    @staticmethod
+    def record_read(user_id, action, details=None, object_type=None, object_id=None,
+                    ip_address=None, http_method=None, endpoint=None):
+        """Record a read-only event such as a page view or search
+
+        Reads are not written one row each: depending on AUDIT_READ_MODE the
+        audit writer coalesces them per user and endpoint into one row per
+        window, or keeps a random sample. Use ``create`` for anything that
+        changes data.
+        """
+        row = AuditLog.build_row(
+            user_id, action, details=details, object_type=object_type,
+            object_id=object_id, ip_address=ip_address,
+            http_method=http_method, endpoint=endpoint, notify=False
+        )
+        from app.services.audit_writer import audit_writer
+        audit_writer.submit_read(row)
+
+    @staticmethod
+    def create(user_id, action, details=None, object_type=None, object_id=None,
+              details_before=None, details_after=None, ip_address=None,
+              http_method=None, endpoint=None, commit=True, notify=True, durability=None):
+        """Create audit log entry with enhanced error handling and logging
+
+        Args:
+            durability: AuditDurability.SYNC writes the entry in the current
+                session before returning (use it for security events);
+                AuditDurability.ASYNC queues it for the background audit
+                writer and returns an unsaved AuditLog. Defaults to
+                AUDIT_DEFAULT_DURABILITY, which defaults to sync.
+        """
+        durability = AuditDurability(
+            durability or os.getenv('AUDIT_DEFAULT_DURABILITY', AuditDurability.SYNC.value)
+        )
+        _ensure_audit_table()
             
-            # Create notification if needed
-            if notify and object_type != 'Notification':
-                try:
-                    Notification = get_notification_model()
-                    Notification.create(
-                        type=NotificationType.AUDIT_LOG.value,
-                        message=f"{action.capitalize()} operation on {object_type} {object_id}",
-                        user_id=user_id,
-                        related_object=log
-                    )
-                except Exception as e:
-                    current_app.logger.error(f"Error creating notification for audit log: {str(e)}")
+        try:
+            row = AuditLog.build_row(
+                user_id, action, details=details, object_type=object_type,
+                object_id=object_id, details_before=details_before,
+                details_after=details_after, ip_address=ip_address,
+                http_method=http_method, endpoint=endpoint, notify=notify
+            )
+            log = AuditLog(**row)
+
+            if durability == AuditDurability.ASYNC:
+                from app.services.audit_writer import audit_writer
+                audit_writer.submit(row)
+                return log
+
+            db.session.add(log)
+            if commit:
+                db.session.commit()
+            else:
+                db.session.flush()
             
+            # Notifications are generated from committed entries by the fan-out stage
+            from app.services.audit_writer import audit_writer
+            audit_writer.start()
+
             logger.info(f"Created audit log: {action} by user {user_id}")
             return log
             
@@ -115,3 +200,71 @@ class AuditLog(db.Model):
             db.session.rollback()
             logger.error(f"Error creating audit log: {str(e)}", exc_info=True)
             raise
+
+def _jsonable(state):
+    return json.loads(json.dumps(state, default=str))
+
+def compute_changes(before, after):
+    """Return the compact audit payload for an object going from before to after
+
+    Creates store the full new state, deletes the full old state and
+    updates only the fields that changed, as ``[old, new]`` pairs::
+
+        {"after": {...}}   {"before": {...}}   {"diff": {"name": ["Old", "New"]}}
+    """
+    if before is None and after is None:
+        return None
+    if before is None:
+        return {'after': _jsonable(after)}
+    if after is None:
+        return {'before': _jsonable(before)}
+    before, after = _jsonable(before), _jsonable(after)
+    return {'diff': {
+        field: [before.get(field), after.get(field)]
+        for field in sorted(before.keys() | after.keys())
+        if before.get(field) != after.get(field)
+    }}
+
+def _load_state(text):
+    try:
+        state = json.loads(text) if text else None
+    except ValueError:
+        return None
+    return state if isinstance(state, dict) else None
+
+def apply_changes(state, changes, details_before=None, details_after=None):
+    """Apply one audit entry to the object state preceding it
+
+    Handles legacy entries that stored whole objects as JSON text.
+
+    Returns:
+        tuple: (before, after) states around the entry
+    """
+    if changes is None:
+        return _load_state(details_before) or state, _load_state(details_after)
+    if 'after' in changes:
+        return None, dict(changes['after'])
+    if 'before' in changes:
+        return dict(changes['before']), None
+    diff = changes.get('diff', {})
+    before = dict(state or {}, **{field: values[0] for field, values in diff.items()})
+    after = dict(state or {}, **{field: values[1] for field, values in diff.items()})
+    return before, after
+
+_checked_engines = weakref.WeakSet()
+
+def _ensure_audit_table():
+    """Check once per engine that the audit_log table exists
+
+    The check runs on the session's own connection: a separate checkout
+    would roll back the caller's open transaction on single-connection
+    pools such as in-memory SQLite.
+    """
+    connection = db.session.connection()
+    engine = connection.engine
+    if engine in _checked_engines:
+        return
+    if not db.inspect(connection).has_table('audit_log'):
+        logger.error("Audit log table does not exist")
+        raise RuntimeError("Audit log table not found")
+    _checked_engines.add(engine)
@@ -0,0 +1,34 @@
+from app.extensions import db
+
+class RollupGranularity:
+    HOUR = 'hour'
+    DAY = 'day'
+
+class AuditRollup(db.Model):
+    """Number of audit events per time bucket, action, object type and user.
+
+    Maintained incrementally by ``AuditRollupService`` so activity charts
+    never aggregate the raw audit log. ``user_id`` 0 stands for events
+    without a user and ``object_type`` '' for events without an object;
+    key columns are never NULL so rows can be upserted.
+    """
+    __tablename__ = 'audit_rollup'
+    granularity = db.Column(db.String(10), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    action = db.Column(db.String(100), primary_key=True)
+    object_type = db.Column(db.String(50), primary_key=True, default='')
+    user_id = db.Column(db.Integer, primary_key=True, default=0)
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'granularity': self.granularity,
+            'bucket_start': self.bucket_start.isoformat(),
+            'action': self.action,
+            'object_type': self.object_type or None,
+            'user_id': self.user_id or None,
+            'count': self.count
+        }
+
+    def __repr__(self):
+        return f"<AuditRollup {self.granularity} {self.bucket_start} {self.action}={self.count}>"
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone, timedelta
 from croniter import croniter
+from sqlalchemy.orm import deferred
 from app.extensions import db
 
 class BotStatus:
@@ -7,6 +8,7 @@ class BotStatus:
     RUNNING = 'running'
     COMPLETED = 'completed'
     FAILED = 'failed'
+    CANCELLED = 'cancelled'
     SCHEDULED = 'scheduled'
 
 class BotSchedule:
@@ -21,13 +23,14 @@ class Bot(db.Model):
     description = db.Column(db.Text, nullable=True)
     status = db.Column(db.String(50), default='inactive')
     last_run = db.Column(db.DateTime, nullable=True)
-    error_log = db.Column(db.Text, nullable=True)
+    # Legacy unbounded log columns; run logs live in bot_run_log_chunk now
+    error_log = deferred(db.Column(db.Text, nullable=True))
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     is_active = db.Column(db.Boolean, default=True)
     schedule = db.Column(db.String(100), nullable=True)  # Stores cron expression
     next_run = db.Column(db.DateTime, nullable=True)
-    last_error = db.Column(db.Text, nullable=True)
+    last_error = deferred(db.Column(db.Text, nullable=True))
     run_count = db.Column(db.Integer, default=0)
     success_count = db.Column(db.Integer, default=0)
     failure_count = db.Column(db.Integer, default=0)
@@ -68,7 +71,6 @@ class Bot(db.Model):
             'description': self.description,
             'status': self.status,
             'last_run': self.last_run.isoformat() if self.last_run else None,
-            'error_log': self.error_log,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'is_active': self.is_active,
@@ -0,0 +1,75 @@
+from datetime import datetime
+from app.extensions import db
+
+class BotRun(db.Model):
+    """One execution of a bot.
+
+    The run's log output lives in ``bot_run_log_chunk`` rows, so listing
+    runs or bots never loads log text.
+    """
+    __tablename__ = 'bot_run'
+    __table_args__ = (
+        db.Index('ix_bot_run_bot_started', 'bot_id', 'started_at'),
+        db.Index('ix_bot_run_status_heartbeat', 'status', 'heartbeat_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    bot_id = db.Column(db.Integer, db.ForeignKey('bot.id', ondelete='CASCADE'), nullable=False)
+    status = db.Column(db.String(50), nullable=False, default='running')
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    error_summary = db.Column(db.String(500), nullable=True)
+    log_size = db.Column(db.BigInteger, nullable=False, default=0)  # Uncompressed bytes
+    log_chunks = db.Column(db.Integer, nullable=False, default=0)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+
+    @property
+    def is_finished(self):
+        return self.finished_at is not None
+
+    @property
+    def eta_seconds(self):
+        """Seconds left at the rate seen up to the last heartbeat, if known"""
+        if self.is_finished or not self.total or not self.processed or not self.heartbeat_at:
+            return None
+        elapsed = (self.heartbeat_at - self.started_at).total_seconds()
+        rate = self.processed / max(elapsed, 1e-6)
+        return max(self.total - self.processed, 0) / rate
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'bot_id': self.bot_id,
+            'status': self.status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'error_summary': self.error_summary,
+            'log_size': self.log_size,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'processed': self.processed,
+            'total': self.total,
+            'eta_seconds': self.eta_seconds,
+            'cancel_requested': self.cancel_requested
+        }
+
+    def __repr__(self):
+        return f"<BotRun {self.id} bot={self.bot_id} {self.status}>"
+
+class BotRunLogChunk(db.Model):
+    """An append-only, zlib-compressed block of a bot run's log.
+
+    ``start_offset`` is the position of the block's first byte in the
+    uncompressed log, which lets a tail reader resume from a byte offset.
+    """
+    __tablename__ = 'bot_run_log_chunk'
+    run_id = db.Column(db.Integer, db.ForeignKey('bot_run.id', ondelete='CASCADE'), primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True)
+    start_offset = db.Column(db.BigInteger, nullable=False)
+    length = db.Column(db.Integer, nullable=False)  # Uncompressed bytes
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<BotRunLogChunk {self.run_id}#{self.seq}>"
@@ -0,0 +1,65 @@
+from datetime import datetime
+from app.extensions import db
+
+class CrawlStatus:
+    PENDING = 'pending'
+    LEASED = 'leased'
+    FAILED = 'failed'
+
+class CrawlHost(db.Model):
+    """Per-host politeness state for the crawl frontier."""
+    __tablename__ = 'crawl_host'
+    id = db.Column(db.Integer, primary_key=True)
+    host = db.Column(db.String(255), nullable=False, unique=True)
+    crawl_delay = db.Column(db.Float, nullable=False, default=1.0)  # Seconds between fetches
+    next_allowed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CrawlHost {self.host}>"
+
+class CrawlURL(db.Model):
+    """A URL known to the crawl frontier.
+
+    Rows are deduplicated on the hash of the normalized URL. A fetched URL
+    stays ``pending`` with a future ``next_fetch_at``; its recrawl interval
+    shrinks when the page changed and grows when it did not, so frequently
+    updated pages are revisited first.
+    """
+    __tablename__ = 'crawl_url'
+    __table_args__ = (
+        db.Index('ix_crawl_url_ready', 'status', 'next_fetch_at', 'priority'),
+        db.Index('ix_crawl_url_lease_token', 'lease_token'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.Text, nullable=False)
+    url_hash = db.Column(db.String(64), nullable=False, unique=True)
+    host = db.Column(db.String(255), nullable=False, index=True)
+    priority = db.Column(db.Integer, nullable=False, default=0)  # Higher is fetched first
+    status = db.Column(db.String(20), nullable=False, default=CrawlStatus.PENDING)
+    next_fetch_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    recrawl_interval = db.Column(db.Integer, nullable=True)  # Seconds
+    content_hash = db.Column(db.String(64), nullable=True)
+    last_fetched_at = db.Column(db.DateTime, nullable=True)
+    fetch_count = db.Column(db.Integer, nullable=False, default=0)
+    error_count = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(255), nullable=True)
+    lease_owner = db.Column(db.String(100), nullable=True)
+    lease_token = db.Column(db.String(36), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    discovered_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'url': self.url,
+            'host': self.host,
+            'priority': self.priority,
+            'status': self.status,
+            'next_fetch_at': self.next_fetch_at.isoformat() if self.next_fetch_at else None,
+            'last_fetched_at': self.last_fetched_at.isoformat() if self.last_fetched_at else None,
+            'fetch_count': self.fetch_count,
+            'error_count': self.error_count
+        }
+
+    def __repr__(self):
+        return f"<CrawlURL {self.url}>"
@@ -0,0 +1,39 @@
+from datetime import datetime
+from app.extensions import db
+
+class JobCheckpoint(db.Model):
+    """Persistent high-water mark for bots and maintenance jobs.
+
+    A job stores the ordering key of the last row it fully processed so the
+    next run can resume from there instead of rescanning the whole table.
+    """
+    __tablename__ = 'job_checkpoint'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    last_timestamp = db.Column(db.DateTime, nullable=True)
+    last_id = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def get_or_create(cls, name):
+        """Return the checkpoint for a job, creating an empty one if needed"""
+        checkpoint = db.session.query(cls).filter_by(name=name).first()
+        if checkpoint is None:
+            checkpoint = cls(name=name)
+            db.session.add(checkpoint)
+            db.session.flush()
+        return checkpoint
+
+    def advance(self, last_timestamp=None, last_id=None):
+        """Move the high-water mark forward; the caller commits"""
+        self.last_timestamp = last_timestamp
+        self.last_id = last_id
+        self.updated_at = datetime.utcnow()
+        return self
+
+    def reset(self):
+        """Forget the high-water mark so the next run starts from scratch"""
+        return self.advance(None, None)
+
+    def __repr__(self):
+        return f"<JobCheckpoint {self.name} ({self.last_timestamp}, {self.last_id})>"
@@ -1,32 +1,48 @@
 from app.models.base_model import BaseModel
 from app.extensions import db
 from datetime import datetime
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, event, inspect
+from sqlalchemy.orm import column_property
 from app.common.enums import NotificationType, NotificationPriority
 from flask import current_app
 from app.models.user import User
+from app.models.notification_counter import NotificationCounter
+from app.models.notification_read import NotificationReadState
 
 class Notification(BaseModel):
     __tablename__ = 'notification'
+    __table_args__ = (
+        # Serves a user's notifications and the broadcasts (user_id NULL) past a read cursor
+        db.Index('ix_notification_user_id_id', 'user_id', 'id'),
+        # Unread and recent lists per user, and coalescing lookups
+        db.Index('ix_notification_user_read_created', 'user_id', 'read_status', 'created_at'),
+        db.Index('ix_notification_created_at', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     message = db.Column(db.String(255), nullable=False)
     type = db.Column(db.Enum(NotificationType), nullable=False)
-    read_status = db.Column(db.Boolean, default=False)
+    # active_history loads the old value on change, for the unread counter events
+    read_status = column_property(db.Column(db.Boolean, default=False), active_history=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     related_object_type = db.Column(db.String(50))
     related_object_id = db.Column(db.Integer)
-    user_id = db.Column(db.Integer, ForeignKey(User.id), nullable=True)
+    user_id = column_property(db.Column(db.Integer, ForeignKey(User.id), nullable=True), active_history=True)
     priority = db.Column(db.Enum(NotificationPriority), default=NotificationPriority.MEDIUM)
+    # Repeats merged into this row by the fan-out, and when the last one arrived
+    count = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    last_seen_at = db.Column(db.DateTime, nullable=True)
 
     user = db.relationship(User, backref='notifications')
 
-    def __init__(self, message, type, user_id=None, related_object_type=None, related_object_id=None):
+    def __init__(self, message, type, user_id=None, related_object_type=None, related_object_id=None, priority=None):
         super().__init__()
         self.message = message
         self.type = type
         self.user_id = user_id
         self.related_object_type = related_object_type
         self.related_object_id = related_object_id
+        if priority is not None:
+            self.priority = priority
 
     def mark_as_read(self):
         self.read_status = True
@@ -34,3 +50,38 @@ class Notification(BaseModel):
 
     def __repr__(self):
         return f"Notification('{self.message}', '{self.type}', '{self.read_status}')"
+
+def _is_unread(user_id, read_status):
+    # Broadcasts are unread for every user until their read state says otherwise
+    return user_id is None or not read_status
+
+@event.listens_for(Notification, 'after_insert')
+def _count_inserted(mapper, connection, target):
+    if _is_unread(target.user_id, target.read_status):
+        NotificationCounter.apply(connection, {target.user_id: 1})
+
+@event.listens_for(Notification, 'after_update')
+def _count_updated(mapper, connection, target):
+    state = inspect(target)
+    read_history = state.attrs.read_status.history
+    user_history = state.attrs.user_id.history
+    if not read_history.has_changes() and not user_history.has_changes():
+        return
+    old_user = user_history.deleted[0] if user_history.deleted else target.user_id
+    old_read = read_history.deleted[0] if read_history.deleted else target.read_status
+    deltas = {}
+    if _is_unread(old_user, old_read):
+        deltas[old_user] = deltas.get(old_user, 0) - 1
+    if _is_unread(target.user_id, target.read_status):
+        deltas[target.user_id] = deltas.get(target.user_id, 0) + 1
+    NotificationCounter.apply(connection, deltas)
+
+@event.listens_for(Notification, 'before_delete')
+def _forget_broadcast_reads(mapper, connection, target):
+    if target.user_id is None:
+        NotificationReadState.forget_broadcasts(connection, [target.id])
+
+@event.listens_for(Notification, 'after_delete')
+def _count_deleted(mapper, connection, target):
+    if _is_unread(target.user_id, target.read_status):
+        NotificationCounter.apply(connection, {target.user_id: -1})
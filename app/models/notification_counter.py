@@ -0,0 +1,43 @@
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.extensions import db
+
+# Counter key for system-wide notifications (user_id NULL). It counts every
+# broadcast; what each user has read is in NotificationReadState.
+BROADCAST_KEY = -1
+
+def counter_key(user_id):
+    return BROADCAST_KEY if user_id is None else user_id
+
+class NotificationCounter(db.Model):
+    """Unread notification count per user, kept in step with ``notification``.
+
+    ORM changes to notifications update it from mapper events in the same
+    flush; bulk statements call ``apply`` in their own transaction. The
+    badge count is one primary key lookup instead of a scan.
+    """
+    __tablename__ = 'notification_counter'
+    user_id = db.Column(db.Integer, primary_key=True)
+    unread = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def apply(cls, connection, deltas):
+        """Add ``{user_id: delta}`` to the counters on ``connection``
+
+        user_id None stands for system-wide notifications.
+        """
+        rows = [{'user_id': counter_key(user_id), 'unread': delta, 'updated_at': datetime.utcnow()}
+                for user_id, delta in deltas.items() if delta]
+        if not rows:
+            return
+        insert = pg_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+        statement = insert(cls)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=['user_id'],
+            set_={'unread': cls.unread + statement.excluded.unread, 'updated_at': statement.excluded.updated_at}
+        ), rows)
+
+    def __repr__(self):
+        return f"<NotificationCounter {self.user_id}={self.unread}>"
@@ -0,0 +1,91 @@
+from datetime import datetime
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.extensions import db
+
+def _insert(connection):
+    return pg_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+
+class NotificationReadMark(db.Model):
+    """A user has read one system-wide notification.
+
+    Only broadcasts newer than the user's ``broadcast_cursor`` get a mark,
+    so the table stays sparse: marking everything read moves the cursor
+    and drops the user's marks.
+    """
+    __tablename__ = 'notification_read_mark'
+    user_id = db.Column(db.Integer, primary_key=True)
+    notification_id = db.Column(db.Integer, primary_key=True, index=True)
+    read_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class NotificationReadState(db.Model):
+    """Per-user read state for system-wide notifications.
+
+    A broadcast is one ``notification`` row with user_id NULL, whatever the
+    number of users. The user has read every broadcast with id up to
+    ``broadcast_cursor`` plus those with a ``NotificationReadMark``;
+    ``broadcast_read`` counts them, so unread broadcasts are the broadcast
+    counter minus ``broadcast_read``.
+    """
+    __tablename__ = 'notification_read_state'
+    user_id = db.Column(db.Integer, primary_key=True)
+    broadcast_cursor = db.Column(db.Integer, nullable=False, default=0)
+    broadcast_read = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def apply(cls, connection, user_id, read_delta, cursor=None):
+        """Add ``read_delta`` to the user's read broadcasts, optionally moving the cursor"""
+        statement = _insert(connection)(cls)
+        values = {'user_id': user_id, 'broadcast_read': read_delta, 'updated_at': datetime.utcnow()}
+        set_ = {
+            'broadcast_read': cls.broadcast_read + statement.excluded.broadcast_read,
+            'updated_at': statement.excluded.updated_at
+        }
+        if cursor is not None:
+            values['broadcast_cursor'] = cursor
+            set_['broadcast_cursor'] = statement.excluded.broadcast_cursor
+        connection.execute(statement.values(**values).on_conflict_do_update(index_elements=['user_id'], set_=set_))
+
+    @classmethod
+    def forget_broadcasts(cls, connection, ids):
+        """Drop read state for broadcasts about to be deleted
+
+        Must run before the notification rows are deleted: the read count
+        of users whose cursor covers a broadcast is corrected by counting
+        the rows that still exist.
+        """
+        from app.models.notification import Notification
+        if not ids:
+            return
+        notification = Notification.__table__
+        marks = NotificationReadMark.__table__
+        covered = select(func.count()).select_from(notification).where(
+            notification.c.id.in_(ids), notification.c.id <= cls.broadcast_cursor
+        ).scalar_subquery()
+        marked = select(func.count()).select_from(marks).where(
+            marks.c.user_id == cls.user_id, marks.c.notification_id.in_(ids)
+        ).scalar_subquery()
+        connection.execute(update(cls).where(or_(
+            cls.broadcast_cursor >= min(ids),
+            cls.user_id.in_(select(marks.c.user_id).where(marks.c.notification_id.in_(ids)))
+        )).values(broadcast_read=cls.broadcast_read - covered - marked))
+        connection.execute(marks.delete().where(marks.c.notification_id.in_(ids)))
+
+    @classmethod
+    def recount(cls, connection):
+        """Recount ``broadcast_read`` for every user from the cursor and the marks"""
+        from app.models.notification import Notification
+        notification = Notification.__table__
+        marks = NotificationReadMark.__table__
+        covered = select(func.count()).select_from(notification).where(
+            notification.c.user_id.is_(None), notification.c.id <= cls.broadcast_cursor
+        ).scalar_subquery()
+        marked = select(func.count()).select_from(marks.join(notification, and_(
+            notification.c.id == marks.c.notification_id, notification.c.user_id.is_(None)
+        ))).where(marks.c.user_id == cls.user_id).scalar_subquery()
+        connection.execute(update(cls).values(broadcast_read=covered + marked))
+
+    def __repr__(self):
+        return f"<NotificationReadState {self.user_id} cursor={self.broadcast_cursor}>"
@@ -5,5 +5,5 @@ stipend_tag_association = Table(
     'stipend_tag_association',
     BaseModel.metadata,
     Column('stipend_id', Integer, ForeignKey('stipends.id')),
-    Column('tag_id', Integer, ForeignKey('tags.id'))
+    Column('tag_id', Integer, ForeignKey('tag.id'))
 )
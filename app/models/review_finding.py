@@ -0,0 +1,33 @@
+from datetime import datetime
+from app.extensions import db
+
+class ReviewIssue:
+    MISSING_FIELD = 'missing_field'
+    PAST_DEADLINE = 'past_deadline'
+    INVALID_URL = 'invalid_url'
+
+class ReviewFinding(db.Model):
+    """A data-quality problem ReviewBot found on a stipend."""
+    __tablename__ = 'review_finding'
+    __table_args__ = (
+        db.Index('ix_review_finding_stipend_issue', 'stipend_id', 'issue'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    stipend_id = db.Column(db.Integer, nullable=False)
+    field = db.Column(db.String(50), nullable=True)
+    issue = db.Column(db.String(50), nullable=False)
+    message = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'stipend_id': self.stipend_id,
+            'field': self.field,
+            'issue': self.issue,
+            'message': self.message,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f"<ReviewFinding {self.issue} stipend={self.stipend_id}>"
@@ -1,5 +1,5 @@
 from app.models.base_model import BaseModel
-from sqlalchemy import Column, String, DateTime, Integer, Boolean, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Boolean, ForeignKey, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.organization import Organization
@@ -12,6 +12,9 @@ class Stipend(BaseModel):
     name = Column(String(100), nullable=False)
     description = Column(String(500))
     active = Column(Boolean, default=True)
+    homepage_url = Column(String(255))
+    eligibility_criteria = Column(Text)
+    application_deadline = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -0,0 +1,54 @@
+from datetime import datetime
+from app.extensions import db
+
+class DuplicateStatus:
+    OPEN = 'open'
+    MERGED = 'merged'
+    DISMISSED = 'dismissed'
+
+class StipendSignature(db.Model):
+    """MinHash signature of a stipend's name, description and organization."""
+    __tablename__ = 'stipend_signature'
+    stipend_id = db.Column(db.Integer, primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class StipendLSHBand(db.Model):
+    """One LSH band bucket of a stipend signature.
+
+    Stipends sharing any (band, bucket) pair are duplicate candidates, so a
+    lookup touches only the rows in the new stipend's buckets.
+    """
+    __tablename__ = 'stipend_lsh_band'
+    __table_args__ = (
+        db.Index('ix_stipend_lsh_band_bucket', 'band', 'bucket'),
+    )
+    stipend_id = db.Column(db.Integer, primary_key=True)
+    band = db.Column(db.SmallInteger, primary_key=True)
+    bucket = db.Column(db.BigInteger, nullable=False)
+
+class DuplicateCandidate(db.Model):
+    """A flagged pair of stipends that look like near-duplicates."""
+    __tablename__ = 'duplicate_candidate'
+    __table_args__ = (
+        db.UniqueConstraint('stipend_id', 'duplicate_of_id', name='uq_duplicate_candidate_pair'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    stipend_id = db.Column(db.Integer, nullable=False, index=True)
+    duplicate_of_id = db.Column(db.Integer, nullable=False, index=True)
+    similarity = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=DuplicateStatus.OPEN)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'stipend_id': self.stipend_id,
+            'duplicate_of_id': self.duplicate_of_id,
+            'similarity': self.similarity,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f"<DuplicateCandidate {self.stipend_id}~{self.duplicate_of_id} ({self.similarity:.2f})>"
@@ -3,3 +3,6 @@ from flask import Blueprint
 def register_blueprints(app):
     from app.routes.admin import register_admin_blueprints
     register_admin_blueprints(app)
+
+    from app.routes.notification_routes import notification_bp
+    app.register_blueprint(notification_bp)
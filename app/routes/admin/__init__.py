@@ -23,6 +23,10 @@ def register_admin_blueprints(app):
         )
         logger.debug("Registered stipend routes")
         
+        from .audit_routes import admin_audit_bp
+        app.register_blueprint(admin_audit_bp)
+        logger.debug("Registered audit explorer routes")
+
         # Register other admin blueprints here
         
         _admin_blueprints_registered = True
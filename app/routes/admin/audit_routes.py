@@ -0,0 +1,71 @@
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from flask_login import current_user, login_required
+from app.constants import AuditDurability
+from app.decorators import admin_required
+from app.models.audit_log import AuditLog
+from app.services.audit_explorer_service import AuditExplorerService, parse_filters
+
+admin_audit_bp = Blueprint('audit_admin', __name__, url_prefix='/admin/audit')
+
+@admin_audit_bp.route('/', methods=['GET'])
+@login_required
+@admin_required
+def explore():
+    """Page through audit entries filtered by user, object, action and time
+
+    Query args: user_id, action, object_type, object_id, since, until
+    (ISO 8601, until is exclusive), limit and the cursor returned by the
+    previous page.
+    """
+    try:
+        filters = parse_filters(request.args)
+        items, next_cursor = AuditExplorerService().page(
+            filters,
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int)
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        AuditLog.record_read(
+            user_id=current_user.id,
+            action='search_audit_log',
+            details=f"Searched audit log with filters {request.args.to_dict()}"[:1000],
+            ip_address=request.remote_addr,
+            http_method=request.method,
+            endpoint=request.endpoint
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error creating audit log: {str(e)}")
+    return jsonify({"items": items, "next_cursor": next_cursor})
+
+@admin_audit_bp.route('/export.csv', methods=['GET'])
+@login_required
+@admin_required
+def export_csv():
+    """Stream every entry matching the explorer filters as CSV"""
+    try:
+        filters = parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        AuditLog.create(
+            user_id=current_user.id,
+            action='export_audit_log',
+            details=f"Exported audit log with filters {request.args.to_dict()}",
+            ip_address=request.remote_addr,
+            http_method=request.method,
+            endpoint=request.endpoint,
+            notify=False,
+            durability=AuditDurability.SYNC
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error creating audit log: {str(e)}")
+
+    return Response(
+        stream_with_context(AuditExplorerService().export_csv(filters)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=audit_log.csv'}
+    )
@@ -1,5 +1,3 @@
-from datetime import datetime, timezone
-import time
 from flask import (
     Blueprint, render_template, request, redirect, 
     url_for, jsonify, current_app, flash
@@ -7,7 +5,10 @@ from flask import (
 from flask_login import login_required, current_user
 from app.controllers.admin_base_controller import AdminBaseController
 from app.forms.admin_forms import BotForm
-from app.services.bot_service import BotService
+from app.services.bot_service import BotService, run_bot
+from app.services.bot_run_service import BotRunService
+from app.models.bot import BotStatus
+from app.models.bot_run import BotRun
 from app.models.audit_log import AuditLog
 from app.extensions import db
 from app.utils import calculate_next_run
@@ -38,28 +39,78 @@ def run(id):
         flash(FlashMessages.BOT_NOT_FOUND.value, FlashCategory.ERROR.value)
         return redirect(url_for('admin.bot.index'))
 
-    try:
-        # Update bot status
-        bot.status = 'running'
-        bot.last_run = datetime.now(timezone.utc)
-        bot.error_log = None
-        db.session.commit()
-        
-        # Simulate bot running
-        time.sleep(2)  # Simulate processing time
-        bot.status = 'completed'
-        db.session.commit()
-        
+    bot_run = run_bot(bot)
+    if bot_run is None:
+        flash(f"Bot {bot.name} is already running", FlashCategory.WARNING.value)
+    elif bot_run.status == BotStatus.COMPLETED:
         flash(f"Bot {bot.name} completed successfully", FlashCategory.SUCCESS.value)
-    except Exception as e:
-        db.session.rollback()
-        bot.status = 'error'
-        bot.error_log = str(e)
-        db.session.commit()
-        flash(f"Failed to run bot: {str(e)}", FlashCategory.ERROR.value)
+    elif bot_run.status == BotStatus.CANCELLED:
+        flash(f"Bot {bot.name} was cancelled", FlashCategory.WARNING.value)
+    else:
+        flash(f"Failed to run bot {bot.name}, see its run log", FlashCategory.ERROR.value)
         
     return redirect(url_for('admin.bot.index'))
 
+@admin_bot_bp.route('/<int:id>/runs', methods=['GET'])
+@login_required
+def runs(id):
+    """List a bot's recent runs without loading any log text"""
+    bot = BotService().get_by_id(id)
+    if not bot:
+        flash(FlashMessages.BOT_NOT_FOUND.value, FlashCategory.ERROR.value)
+        return redirect(url_for('admin.bot.index'))
+    return render_template('admin/bots/runs.html', bot=bot,
+                           runs=BotRunService().recent_runs(bot.id))
+
+@admin_bot_bp.route('/runs/<int:run_id>/log', methods=['GET'])
+@login_required
+def run_log(run_id):
+    """Tail a run log from a byte offset.
+
+    HTMX requests get an HTML fragment that polls for the next offset
+    while the run is still going; other clients get JSON.
+    """
+    run = db.session.get(BotRun, run_id)
+    if not run:
+        return jsonify({"status": "error", "message": "Run not found"}), 404
+
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    text, next_offset = BotRunService().read_log(run_id, offset)
+    if request.headers.get('HX-Request'):
+        return render_template('admin/bots/_log_tail.html', run=run, text=text, offset=next_offset)
+    return jsonify({
+        "text": text,
+        "offset": next_offset,
+        "finished": run.is_finished,
+        "status": run.status,
+        "processed": run.processed,
+        "total": run.total,
+        "eta_seconds": run.eta_seconds
+    })
+
+@admin_bot_bp.route('/runs/<int:run_id>/cancel', methods=['POST'])
+@login_required
+def cancel_run(run_id):
+    """Ask a running bot to stop after its current batch"""
+    run = db.session.get(BotRun, run_id)
+    if not run:
+        flash("Bot run not found", FlashCategory.ERROR.value)
+        return redirect(url_for('admin.bot.index'))
+
+    if BotRunService().request_cancel(run_id):
+        AuditLog.create(
+            user_id=current_user.id,
+            action='cancel_bot_run',
+            object_type='Bot',
+            object_id=run.bot_id,
+            details=f"Requested cancellation of run {run_id}",
+            ip_address=request.remote_addr
+        )
+        flash("Cancellation requested; the bot stops after its current batch", FlashCategory.SUCCESS.value)
+    else:
+        flash("This run has already finished", FlashCategory.WARNING.value)
+    return redirect(url_for('admin.bot.runs', id=run.bot_id))
+
 @admin_bot_bp.route('/<int:id>/schedule', methods=['POST'])
 @login_required
 def schedule(id):
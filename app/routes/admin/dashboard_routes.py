@@ -3,10 +3,11 @@ from scripts.db_monitor import BackupDashboard
 from flask_login import current_user, login_required
 from app.utils import admin_required
 from app.extensions import db
-from app.models.notification import Notification
 from app.models.audit_log import AuditLog
 from app.models.bot import Bot
-from app.models.user import User
+from app.services.audit_partition_service import AuditPartitionService
+from app.services.audit_rollup_service import AuditRollupService
+from app.services.notification_service import get_notification_count
 import psutil
 from scripts.verification.verify_all import get_performance_metrics, get_check_metrics
 
@@ -18,7 +19,7 @@ admin_dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/admin/dashboa
 def dashboard():
     # Create audit log for dashboard access
     try:
-        audit_log = AuditLog(
+        AuditLog.record_read(
             user_id=current_user.id,
             action='view_dashboard',
             details="Accessed admin dashboard",
@@ -26,25 +27,21 @@ def dashboard():
             http_method=request.method,
             endpoint=request.endpoint
         )
-        db.session.add(audit_log)
-        db.session.commit()
     except Exception as e:
         current_app.logger.error(f"Error creating audit log: {str(e)}")
         db.session.rollback()
 
     try:
-        # Get recent activity with user information
-        recent_activity = db.session.query(AuditLog, User.username)\
-            .join(User, AuditLog.user_id == User.id, isouter=True)\
-            .order_by(AuditLog.timestamp.desc())\
-            .limit(10)\
-            .all()
+        # Get recent activity with user information from the newest partition
+        recent_activity = AuditPartitionService().recent_activity(limit=10)
+
+        # Activity chart data, read from the pre-aggregated rollups
+        rollups = AuditRollupService()
+        activity_series = rollups.activity_series(hours=24)
+        top_actions = rollups.top_actions(days=7)
         
         # Get unread notifications
-        notification_count = Notification.query.filter_by(
-            read_status=False,
-            user_id=current_user.id
-        ).count()
+        notification_count = get_notification_count(current_user.id)
         
         # Get bot status
         bots = Bot.query.all()
@@ -70,6 +67,8 @@ def dashboard():
                              title='Dashboard',
                              notification_count=notification_count,
                              recent_activity=recent_activity,
+                             activity_series=activity_series,
+                             top_actions=top_actions,
                              bots=bots,
                              performance_metrics=performance_metrics,
                              check_metrics=check_metrics,
@@ -80,6 +79,8 @@ def dashboard():
         return render_template('admin/dashboard.html',
                              notification_count=0,
                              recent_activity=[],
+                             activity_series=[],
+                             top_actions=[],
                              bots=[],
                              performance_metrics={},
                              check_metrics={})
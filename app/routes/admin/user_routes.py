@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from app.models.audit_log import AuditLog
 from app.models.notification import Notification
 from app.services.notification_service import get_notification_count
+from app.services.mail_queue import mail_queue
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_wtf.csrf import generate_csrf
@@ -264,7 +265,14 @@ def reset_password(id):
         
         db.session.commit()
         
-        # TODO: Send email with temporary password
+        if user.email:
+            mail_queue.send_email(
+                subject='Your password has been reset',
+                recipients=[user.email],
+                body=(f"Hello {user.username},\n\n"
+                      f"An administrator has reset your password. Your temporary password is: {temp_password}\n\n"
+                      "Please log in and change it as soon as possible.")
+            )
         logging.info(f"Password reset for user {user.id} by admin {current_user.id}")
         
         flash_message(FlashMessages.PASSWORD_RESET_SUCCESS.value, FlashCategory.SUCCESS.value)
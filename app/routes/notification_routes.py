@@ -0,0 +1,87 @@
+from datetime import datetime
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from flask_login import current_user, login_required
+from app.common.enums import NotificationType
+from app.services.notification_hub import notification_hub
+from app.services.notification_service import delete_notifications, mark_notifications_read
+
+notification_bp = Blueprint('notifications', __name__, url_prefix='/notifications')
+
+def _parse_bulk_filters(data, allow_before=False):
+    """Read ids, type and before from a bulk request body, raising ValueError on bad input"""
+    filters = {}
+    if data.get('ids') is not None:
+        ids = data['ids']
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            raise ValueError("ids must be a list of integers")
+        filters['ids'] = ids
+    if data.get('type'):
+        try:
+            filters['type'] = NotificationType(data['type'])
+        except ValueError:
+            raise ValueError(f"Unknown notification type: {data['type']}")
+    if allow_before and data.get('before'):
+        try:
+            filters['before'] = datetime.fromisoformat(data['before'])
+        except (TypeError, ValueError):
+            raise ValueError("before must be an ISO 8601 date or datetime")
+    return filters
+
+@notification_bp.route('/read', methods=['POST'])
+@login_required
+def mark_read():
+    """Mark the current user's notifications read
+
+    JSON body (all optional): ids, type. An empty body marks everything read.
+    """
+    try:
+        filters = _parse_bulk_filters(request.get_json(silent=True) or {})
+        count = mark_notifications_read(current_user.id, **filters)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error marking notifications read: {str(e)}")
+        return jsonify({"status": "error", "message": "Could not mark notifications read"}), 500
+    return jsonify({"status": "success", "count": count})
+
+@notification_bp.route('/delete', methods=['POST'])
+@login_required
+def delete():
+    """Delete the current user's notifications
+
+    JSON body (all optional): ids, type, before (ISO 8601). An empty body
+    deletes everything.
+    """
+    try:
+        filters = _parse_bulk_filters(request.get_json(silent=True) or {}, allow_before=True)
+        count = delete_notifications(current_user.id, **filters)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error deleting notifications: {str(e)}")
+        return jsonify({"status": "error", "message": "Could not delete notifications"}), 500
+    return jsonify({"status": "success", "count": count})
+
+@notification_bp.route('/stream', methods=['GET'])
+@login_required
+def stream():
+    """Server-Sent Events stream of the current user's new notifications
+
+    Resumes after the ``Last-Event-ID`` header (or ``last_event_id``
+    query arg) when the browser reconnects.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    if last_event_id is None:
+        last_event_id = request.args.get('last_event_id', type=int)
+    if not notification_hub.connect():
+        response = jsonify({"status": "error", "message": "Too many open notification streams"})
+        response.headers['Retry-After'] = str(int(notification_hub.heartbeat))
+        return response, 503
+
+    response = Response(
+        stream_with_context(notification_hub.stream(current_user.id, last_event_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(notification_hub.disconnect)
+    return response
@@ -0,0 +1,376 @@
+"""Monthly partitioning and archival of the audit log.
+
+On PostgreSQL ``audit_log`` becomes a natively range-partitioned table
+with one ``audit_log_pYYYY_MM`` partition per month, so queries bounded
+by ``timestamp`` only scan the partitions they need. SQLite has no
+partitioning; there ``audit_log`` holds the current month only and the
+maintenance job rolls older rows into ``audit_log_pYYYY_MM`` tables,
+with an ``audit_log_history`` view over all of them.
+
+Months older than the retention window are exported to gzipped JSONL
+files in the archive directory and dropped. ``index.json`` in that
+directory lists every archive with its row count and time range, and
+``iter_archive`` filters archives offline without a database.
+"""
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import Column, Index, MetaData, Table, func, insert, select, text
+from app.extensions import db
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = 'audit_log_p'
+PARTITION_PATTERN = re.compile(r'^audit_log_p(\d{4})_(\d{2})$')
+HISTORY_VIEW = 'audit_log_history'
+ARCHIVE_INDEX = 'index.json'
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: datetime) -> str:
+    return f'{PARTITION_PREFIX}{month.year:04d}_{month.month:02d}'
+
+def partition_month(name: str) -> Optional[datetime]:
+    """Return the month a partition name stands for, or None for other tables"""
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1)
+
+def _encode(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+class AuditPartitionService:
+    def __init__(self, archive_dir=None):
+        self.retention_months = int(os.getenv('AUDIT_RETENTION_MONTHS', 12))
+        self.months_ahead = int(os.getenv('AUDIT_PARTITIONS_AHEAD', 2))
+        self.archive_dir = Path(archive_dir or os.getenv('AUDIT_ARCHIVE_DIR', 'archives/audit'))
+        self.chunk_size = int(os.getenv('AUDIT_ARCHIVE_CHUNK_SIZE', 5000))
+
+    @property
+    def dialect(self):
+        return db.engine.dialect.name
+
+    def run_maintenance(self, now=None) -> Dict:
+        """Create upcoming partitions, roll over and archive expired months
+
+        Meant to run daily from cron (see ``scripts/audit_maintenance.py``);
+        every step is idempotent.
+
+        Returns:
+            dict: What the run created, rolled over and archived
+        """
+        now = now or datetime.utcnow()
+        report = {'created': [], 'rolled_over': {}, 'archived': {}}
+        if self.dialect == 'postgresql':
+            if not self.is_partitioned():
+                report['created'] += self.convert_to_partitioned(now)
+            report['created'] += self.ensure_partitions(now)
+        else:
+            report['rolled_over'] = self.rollover(now)
+        cutoff = add_months(month_start(now), -self.retention_months)
+        for name in self.list_partitions():
+            if partition_month(name) < cutoff:
+                report['archived'][name] = self.archive_partition(name)
+        if self.dialect != 'postgresql':
+            self.rebuild_history_view()
+        logger.info(f"Audit log maintenance: {report}")
+        return report
+
+    def list_partitions(self) -> List[str]:
+        """Names of the monthly partitions (or tables), oldest first"""
+        if self.dialect == 'postgresql':
+            names = db.session.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = 'audit_log'"
+            )).scalars().all()
+        else:
+            names = db.inspect(db.engine).get_table_names()
+        return sorted(name for name in names if partition_month(name))
+
+    def partition_table(self, name) -> Table:
+        """A Table object for a partition, with the audit_log columns and no constraints"""
+        columns = [Column(column.name, column.type) for column in AuditLog.__table__.columns]
+        return Table(name, MetaData(), *columns)
+
+    # PostgreSQL
+
+    def is_partitioned(self) -> bool:
+        return db.session.execute(text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'audit_log'"
+        )).first() is not None
+
+    def convert_to_partitioned(self, now=None) -> List[str]:
+        """Swap a plain audit_log for a partitioned one, keeping its rows
+
+        Runs in one transaction and holds an exclusive lock on audit_log
+        while rows are copied, so schedule it for a quiet period.
+        """
+        now = now or datetime.utcnow()
+        with db.engine.begin() as connection:
+            connection.execute(text("LOCK TABLE audit_log IN ACCESS EXCLUSIVE MODE"))
+            sequence = connection.execute(
+                text("SELECT pg_get_serial_sequence('audit_log', 'id')")
+            ).scalar()
+            connection.execute(text("ALTER TABLE audit_log RENAME TO audit_log_legacy"))
+            # Free the index names for the new table
+            connection.execute(text("ALTER INDEX IF EXISTS audit_log_pkey RENAME TO audit_log_legacy_pkey"))
+            for index in AuditLog.__table__.indexes:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+            connection.execute(text(
+                "CREATE TABLE audit_log (LIKE audit_log_legacy INCLUDING DEFAULTS) "
+                "PARTITION BY RANGE (timestamp)"
+            ))
+            # The primary key of a partitioned table must include the partition key
+            connection.execute(text(
+                "ALTER TABLE audit_log ADD CONSTRAINT audit_log_pkey PRIMARY KEY (id, timestamp)"
+            ))
+            connection.execute(text(
+                'ALTER TABLE audit_log ADD FOREIGN KEY (user_id) REFERENCES "user" (id)'
+            ))
+            # Indexes on the parent are created on every partition
+            for index in AuditLog.__table__.indexes:
+                index.create(connection)
+            if sequence:
+                # Keep the id sequence alive when the legacy table is dropped
+                connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY audit_log.id"))
+
+            months = {month_start(value) for value in connection.execute(text(
+                "SELECT DISTINCT date_trunc('month', timestamp) FROM audit_log_legacy"
+            )).scalars()}
+            created = [self._create_partition(connection, month) for month in sorted(months)]
+            created = [name for name in created if name] + self.ensure_partitions(now, connection)
+            connection.execute(text("INSERT INTO audit_log SELECT * FROM audit_log_legacy"))
+            connection.execute(text("DROP TABLE audit_log_legacy"))
+        logger.info(f"Converted audit_log to a partitioned table with {len(created)} partitions")
+        return created
+
+    def ensure_partitions(self, now=None, connection=None) -> List[str]:
+        """Create partitions for the current month and ``months_ahead`` more"""
+        now = now or datetime.utcnow()
+        months = [add_months(month_start(now), offset) for offset in range(self.months_ahead + 1)]
+        if connection is None:
+            with db.engine.begin() as connection:
+                return self.ensure_partitions(now, connection)
+        created = [self._create_partition(connection, month) for month in months]
+        return [name for name in created if name]
+
+    def _create_partition(self, connection, month) -> Optional[str]:
+        name = partition_name(month)
+        exists = connection.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar()
+        if exists:
+            return None
+        connection.execute(text(
+            f"CREATE TABLE {name} PARTITION OF audit_log "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+        ))
+        return name
+
+    # SQLite and other databases without native partitioning
+
+    def rollover(self, now=None) -> Dict[str, int]:
+        """Move rows from before the current month into their monthly tables
+
+        Each month is copied and deleted in one transaction, so a failed
+        run leaves every row in exactly one table. If ``audit_log`` was
+        created without AUTOINCREMENT, its newest row stays behind so SQLite
+        cannot hand out its ids again.
+
+        Returns:
+            dict: Rows moved per monthly table
+        """
+        now = now or datetime.utcnow()
+        current = month_start(now)
+        audit = AuditLog.__table__
+        movable = audit.c.timestamp < current
+        if not self._has_autoincrement():
+            movable &= audit.c.id < select(func.max(audit.c.id)).scalar_subquery()
+        oldest_query = select(func.min(audit.c.timestamp)).where(movable)
+        moved = {}
+        while True:
+            # Moved rows leave audit_log, so this skips straight past empty months
+            with db.engine.connect() as connection:
+                oldest = connection.execute(oldest_query).scalar()
+            if oldest is None:
+                break
+            month = month_start(oldest)
+            in_month = movable & (audit.c.timestamp >= month) & (audit.c.timestamp < add_months(month, 1))
+            name = partition_name(month)
+            with db.engine.begin() as connection:
+                table = self._ensure_monthly_table(connection, name)
+                columns = [column.name for column in table.columns]
+                result = connection.execute(insert(table).from_select(
+                    columns, select(*[audit.c[column] for column in columns]).where(in_month)
+                ))
+                connection.execute(audit.delete().where(in_month))
+            moved[name] = result.rowcount
+        logger.info(f"Rolled over audit rows: {moved}")
+        return moved
+
+    def _has_autoincrement(self) -> bool:
+        with db.engine.connect() as connection:
+            ddl = connection.execute(text(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'audit_log'"
+            )).scalar()
+        return 'AUTOINCREMENT' in (ddl or '').upper()
+
+    def _ensure_monthly_table(self, connection, name) -> Table:
+        table = self.partition_table(name)
+        inspector = db.inspect(connection)
+        if not inspector.has_table(name):
+            table.create(connection)
+            for index in AuditLog.__table__.indexes:
+                if index.dialect_kwargs:
+                    continue  # PostgreSQL-only index types
+                Index(index.name.replace('audit_log', name, 1),
+                      *[table.c[column.name] for column in index.columns]).create(connection)
+            return table
+        # Tables rolled over before a column was added to audit_log
+        existing = {column['name'] for column in inspector.get_columns(name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(f'ALTER TABLE {name} ADD COLUMN {column.name} {column_type}'))
+        return table
+
+    def rebuild_history_view(self):
+        """Recreate the view that unions the hot table with every monthly table"""
+        columns = ', '.join(column.name for column in AuditLog.__table__.columns)
+        selects = [f'SELECT {columns} FROM {name}' for name in ['audit_log'] + self.list_partitions()]
+        with db.engine.begin() as connection:
+            connection.execute(text(f'DROP VIEW IF EXISTS {HISTORY_VIEW}'))
+            connection.execute(text(f'CREATE VIEW {HISTORY_VIEW} AS ' + ' UNION ALL '.join(selects)))
+
+    # Archives
+
+    def archive_partition(self, name) -> int:
+        """Export a partition to ``<archive_dir>/<name>.jsonl.gz`` and drop it
+
+        The archive is written to a temporary file and renamed into place,
+        and the partition is only dropped once the file holds every row.
+
+        Returns:
+            int: Number of archived rows
+        """
+        month = partition_month(name)
+        if month is None:
+            raise ValueError(f"Not an audit log partition: {name}")
+        table = self.partition_table(name)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        target = self.archive_dir / f'{name}.jsonl.gz'
+        partial = target.with_name(target.name + '.tmp')
+
+        count, first, last = 0, None, None
+        with db.engine.connect() as connection:
+            result = connection.execution_options(yield_per=self.chunk_size).execute(
+                select(table).order_by(table.c.timestamp, table.c.id)
+            )
+            with gzip.open(partial, 'wt', encoding='utf-8') as out:
+                for row in result.mappings():
+                    out.write(json.dumps({key: _encode(value) for key, value in row.items()}) + '\n')
+                    count += 1
+                    first = first or row['timestamp']
+                    last = row['timestamp']
+            expected = connection.execute(select(func.count()).select_from(table)).scalar()
+        if count != expected:
+            partial.unlink()
+            raise RuntimeError(f"Archive of {name} has {count} rows, table has {expected}; not dropping")
+        partial.replace(target)
+
+        self._update_index(name, {
+            'month': month.strftime('%Y-%m'),
+            'file': target.name,
+            'rows': count,
+            'min_timestamp': _encode(first),
+            'max_timestamp': _encode(last),
+            'archived_at': datetime.utcnow().isoformat()
+        })
+        with db.engine.begin() as connection:
+            if self.dialect == 'postgresql':
+                connection.execute(text(f'ALTER TABLE audit_log DETACH PARTITION {name}'))
+            connection.execute(text(f'DROP TABLE {name}'))
+        logger.info(f"Archived {count} audit rows from {name} to {target}")
+        return count
+
+    def _update_index(self, name, entry):
+        path = self.archive_dir / ARCHIVE_INDEX
+        index = json.loads(path.read_text()) if path.exists() else {}
+        index[name] = entry
+        partial = path.with_name(path.name + '.tmp')
+        partial.write_text(json.dumps(index, indent=2, sort_keys=True))
+        partial.replace(path)
+
+    # Hot queries
+
+    def recent_activity(self, limit=10, now=None):
+        """Latest audit entries with usernames, touching only the newest month(s)
+
+        The timestamp bound lets PostgreSQL prune every partition but the
+        current one; the previous month is only read early in a month,
+        when the current one has fewer than ``limit`` entries.
+        """
+        from app.models.user import User
+        current = month_start(now or datetime.utcnow())
+        query = db.session.query(AuditLog, User.username)\
+            .join(User, AuditLog.user_id == User.id, isouter=True)\
+            .order_by(AuditLog.timestamp.desc())
+        rows = query.filter(AuditLog.timestamp >= current).limit(limit).all()
+        if len(rows) < limit:
+            rows += query.filter(
+                AuditLog.timestamp >= add_months(current, -1),
+                AuditLog.timestamp < current
+            ).limit(limit - len(rows)).all()
+        return rows
+
+def iter_archive(archive_dir, since=None, until=None, action=None, user_id=None,
+                 object_type=None, object_id=None) -> Iterator[Dict]:
+    """Yield archived audit entries matching the filters, oldest first
+
+    Works without a database. Archives whose time range falls outside
+    ``since``/``until`` are skipped without being opened.
+    """
+    archive_dir = Path(archive_dir)
+    path = archive_dir / ARCHIVE_INDEX
+    if not path.exists():
+        return
+    index = json.loads(path.read_text())
+    for name in sorted(index):
+        entry = index[name]
+        if entry['rows'] == 0:
+            continue
+        if since and datetime.fromisoformat(entry['max_timestamp']) < since:
+            continue
+        if until and datetime.fromisoformat(entry['min_timestamp']) >= until:
+            continue
+        with gzip.open(archive_dir / entry['file'], 'rt', encoding='utf-8') as lines:
+            for line in lines:
+                row = json.loads(line)
+                timestamp = datetime.fromisoformat(row['timestamp'])
+                if since and timestamp < since:
+                    continue
+                if until and timestamp >= until:
+                    continue
+                if action and row['action'] != action:
+                    continue
+                if user_id is not None and row['user_id'] != user_id:
+                    continue
+                if object_type and row['object_type'] != object_type:
+                    continue
+                if object_id is not None and row['object_id'] != object_id:
+                    continue
+                row['timestamp'] = timestamp
+                yield row
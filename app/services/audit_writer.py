@@ -0,0 +1,255 @@
+"""Background writer for asynchronous audit log entries.
+
+Requests validate an entry and put the row on a bounded in-process queue;
+a daemon thread drains the queue and writes batches with one multi-row
+INSERT each. When the queue is full the caller writes its entry
+synchronously instead of dropping it. The queue is flushed on interpreter
+shutdown. Between batches the thread also runs the notification fan-out
+every NOTIFICATION_FANOUT_SECONDS, so audited requests never write
+notifications themselves.
+
+Read events (page views, searches) are cheaper still: in coalesce mode
+repeated reads by one user of one endpoint within AUDIT_READ_WINDOW_SECONDS
+become a single row whose ``hit_count`` and ``last_seen_at`` cover the
+whole window; in sample mode only AUDIT_READ_SAMPLE_RATE of them are kept.
+"""
+import atexit
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from flask import current_app, has_app_context
+from sqlalchemy import insert
+from app.constants import AuditReadMode
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+
+class AuditWriter:
+    def __init__(self):
+        self.app = None
+        self.max_queue = int(os.getenv('AUDIT_QUEUE_SIZE', 10000))
+        self.batch_size = int(os.getenv('AUDIT_BATCH_SIZE', 200))
+        self.flush_interval = float(os.getenv('AUDIT_FLUSH_SECONDS', 1.0))
+        self.put_timeout = float(os.getenv('AUDIT_QUEUE_PUT_TIMEOUT', 0.05))
+        self.fanout_interval = float(os.getenv('NOTIFICATION_FANOUT_SECONDS', 2.0))
+        self.read_mode = AuditReadMode(os.getenv('AUDIT_READ_MODE', AuditReadMode.COALESCE.value))
+        self.read_window = timedelta(seconds=float(os.getenv('AUDIT_READ_WINDOW_SECONDS', 300)))
+        self.read_sample_rate = float(os.getenv('AUDIT_READ_SAMPLE_RATE', 0.1))
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._reads = {}  # Coalescing key -> row of the open window
+        self._reads_lock = threading.Lock()
+        self._write_through = threading.local()
+        self.written = 0
+        self.dropped = 0
+        self.reads_skipped = 0
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['audit_writer'] = self
+        atexit.register(self.close)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the writer thread if the current app is the writer's app"""
+        if self._owns_context():
+            self._ensure_started()
+
+    @contextmanager
+    def write_through(self, session):
+        """Write this thread's entries inline through ``session`` inside the block
+
+        Dry runs use it so their audit entries join the transaction that is
+        rolled back, instead of being committed on a connection of their own.
+        """
+        previous = getattr(self._write_through, 'session', None)
+        self._write_through.session = session
+        try:
+            yield
+        finally:
+            self._write_through.session = previous
+
+    def submit(self, row: Dict) -> None:
+        """Queue a validated audit row, writing it inline if the queue is full
+
+        Entries from an app the writer was not initialized with are written
+        inline, so they never end up in another app's database.
+        """
+        session = getattr(self._write_through, 'session', None)
+        if session is not None:
+            from app.models.audit_log import AuditLog
+            session.execute(insert(AuditLog.__table__), [row])
+            self.written += 1
+            return
+        if not self._owns_context():
+            self._write_batch([row])
+            return
+        self._ensure_started()
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            logger.warning("Audit queue full; writing entry synchronously")
+            self._write_batch([row])
+
+    def submit_read(self, row: Dict) -> None:
+        """Coalesce or sample a read event according to the read mode"""
+        if self.read_mode == AuditReadMode.SAMPLE:
+            if random.random() >= self.read_sample_rate:
+                self.reads_skipped += 1
+                return
+            # Weight kept rows so hit_count sums estimate the real number of reads
+            self.submit(dict(row, hit_count=max(1, round(1 / self.read_sample_rate))))
+            return
+        if self.read_mode == AuditReadMode.EXACT or not self._owns_context() or \
+                getattr(self._write_through, 'session', None) is not None:
+            self.submit(row)
+            return
+
+        key = (row['user_id'], row['action'], row['endpoint'], row['object_type'], row['object_id'])
+        with self._reads_lock:
+            pending = self._reads.get(key)
+            if pending is not None and row['timestamp'] - pending['timestamp'] < self.read_window:
+                pending['hit_count'] += 1
+                pending['last_seen_at'] = row['timestamp']
+                self.reads_skipped += 1
+                return
+            self._reads[key] = dict(row, hit_count=1, last_seen_at=row['timestamp'])
+        if pending is not None:
+            self.submit(pending)
+        self._ensure_started()
+
+    def _take_reads(self, force=False) -> List:
+        """Remove coalesced reads whose window has closed and return them as entries"""
+        cutoff = datetime.now(timezone.utc) - self.read_window
+        with self._reads_lock:
+            closed = [key for key, pending in self._reads.items()
+                      if force or pending['timestamp'] <= cutoff]
+            return [self._reads.pop(key) for key in closed]
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything queued so far, including open read windows, is written"""
+        reads = self._take_reads(force=True)
+        if not self.running:
+            self._write_batch(reads)
+            return self._queue.empty()
+        for entry in reads:
+            self._queue.put(entry)
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush the queue and stop the writer thread"""
+        if not self.running:
+            self._write_batch(self._take_reads(force=True))
+            return
+        for entry in self._take_reads(force=True):
+            self._queue.put(entry)
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(f"Audit writer did not stop within {timeout}s; "
+                         f"about {self._queue.qsize()} entries not written")
+
+    def _owns_context(self):
+        return self.app is not None and has_app_context() and \
+            current_app._get_current_object() is self.app
+
+    def _ensure_started(self):
+        if self.running:
+            return
+        with self._lock:
+            if not self.running:
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        with self.app.app_context():
+            last_sweep = last_fanout = time.monotonic()
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = None
+                if time.monotonic() - last_sweep >= self.flush_interval:
+                    last_sweep = time.monotonic()
+                    self._write_batch(self._take_reads())
+                if time.monotonic() - last_fanout >= self.fanout_interval:
+                    last_fanout = time.monotonic()
+                    self._fan_out()
+                if item is None:
+                    continue
+                batch, stop = self._drain(item)
+                if batch:
+                    self._write_batch([entry for entry in batch if not isinstance(entry, _FlushRequest)])
+                    for entry in batch:
+                        if isinstance(entry, _FlushRequest):
+                            entry.done.set()
+                if stop:
+                    return
+
+    def _drain(self, item):
+        """Collect up to batch_size queued items without blocking"""
+        batch = []
+        while True:
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+            if isinstance(item, _FlushRequest) or len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+
+    def _write_batch(self, rows: List) -> None:
+        if not rows:
+            return
+        from app.extensions import db
+        from app.models.audit_log import AuditLog
+        table = AuditLog.__table__
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(table), rows)
+            self.written += len(rows)
+            return
+        except Exception as e:
+            logger.error(f"Audit batch of {len(rows)} failed ({e}); retrying entries one by one")
+        for row in rows:
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(insert(table), [row])
+                self.written += 1
+            except Exception as row_error:
+                self.dropped += 1
+                logger.error(f"Dropped audit entry {row.get('action')}: {row_error}")
+
+    def _fan_out(self):
+        from app.extensions import db
+        from app.services.notification_fanout_service import NotificationFanoutService
+        from app.services.notification_hub import notification_hub
+        try:
+            service = NotificationFanoutService()
+            if service.run() + service.run_digest():
+                notification_hub.wake()
+        except Exception as e:
+            logger.error(f"Notification fan-out failed: {e}")
+        finally:
+            db.session.remove()
+
+audit_writer = AuditWriter()
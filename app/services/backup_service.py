@@ -3,15 +3,24 @@ import os
 import subprocess
 import datetime
 import gzip
+import json
+import re
 import shutil
+import tempfile
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from app.extensions import db
+from app.common.compression import ParallelGzipWriter
 from app.constants import FlashMessages
-from scripts.db_monitor import BackupMetric
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_NAME = 'manifest.json'
+
+# A TABLE DATA line of `pg_restore --list`: "3401; 0 16390 TABLE DATA public stipends owner"
+TOC_TABLE_DATA = re.compile(r'^(\d+);\s+\d+\s+\d+\s+TABLE DATA\s+(\S+)\s+(\S+)')
+TOC_SEQUENCE_SET = re.compile(r'^(\d+);\s+\d+\s+\d+\s+SEQUENCE SET\s+(\S+)\s+(\S+)')
+
 class BackupService:
     """Service for managing database backups and restores with enhanced features.
     
@@ -33,6 +42,11 @@ class BackupService:
         max_backups (int): Maximum number of backups to keep
         db_url (str): Database connection URL
         compression_level (int): Gzip compression level (1-9)
+        compression_threads (int): Threads compressing the dump in parallel
+        backup_format (str): 'plain' for one gzipped SQL file, 'directory'
+            for a pg_dump directory-format dump written and restored with
+            ``jobs`` parallel workers
+        jobs (int): pg_dump/pg_restore worker processes for directory backups
     """
     
     def __init__(self):
@@ -40,7 +54,13 @@ class BackupService:
         self.retention_days = int(os.getenv('BACKUP_RETENTION_DAYS', 7))
         self.max_backups = int(os.getenv('MAX_BACKUPS', 10))
         self.db_url = db.engine.url.render_as_string(hide_password=False)
-        self.compression_level = 9
+        self.compression_level = int(os.getenv('BACKUP_COMPRESSION_LEVEL', 9))
+        self.compression_threads = int(os.getenv('BACKUP_COMPRESSION_THREADS', os.cpu_count() or 1))
+        self.pipe_chunk_size = 1024 * 1024
+        self.backup_format = os.getenv('BACKUP_FORMAT', 'plain')
+        if self.backup_format not in ('plain', 'directory'):
+            raise ValueError(f"Unknown BACKUP_FORMAT: {self.backup_format}")
+        self.jobs = int(os.getenv('BACKUP_JOBS', os.cpu_count() or 1))
         
         # Ensure backup directory exists
         self.backup_dir.mkdir(parents=True, exist_ok=True)
@@ -51,47 +71,43 @@ class BackupService:
         Returns:
             Tuple[bool, str]: (success, message) indicating backup status
         """
-        from scripts.db_monitor import dashboard
+        from scripts.db_monitor import BackupMetric, dashboard
         from scripts.db_alerts import alerts
         
         start_time = datetime.datetime.now()
         timestamp = start_time.strftime('%Y%m%d_%H%M%S')
-        backup_file = self.backup_dir / f'db_backup_{timestamp}.sql.gz'
+        suffix = 'dir' if self.backup_format == 'directory' else 'sql.gz'
+        backup_file = self.backup_dir / f'db_backup_{timestamp}.{suffix}'
         
         try:
-            # Create backup using pg_dump
-            with gzip.open(backup_file, 'wb', compresslevel=self.compression_level) as f:
-                process = subprocess.Popen(
-                    ['pg_dump', self.db_url],
-                    stdout=f,
-                    stderr=subprocess.PIPE
-                )
-                _, stderr = process.communicate()
-                
-                if process.returncode != 0:
-                    error_msg = f"Backup failed: {stderr.decode('utf-8')}"
-                    logger.error(error_msg)
-                    
-                    # Record failed backup
-                    duration = (datetime.datetime.now() - start_time).total_seconds()
-                    dashboard.add_metric(BackupMetric(
-                        timestamp=start_time,
-                        success=False,
-                        size_mb=0,
-                        duration_sec=duration,
-                        error=error_msg
-                    ))
-                    return False, error_msg
+            if self.backup_format == 'directory':
+                error_msg = self.dump_directory(backup_file)
+            else:
+                error_msg = self._dump_plain(backup_file)
+
+            if error_msg:
+                logger.error(error_msg)
+
+                # Record failed backup
+                duration = (datetime.datetime.now() - start_time).total_seconds()
+                dashboard.add_metric(BackupMetric(
+                    timestamp=start_time,
+                    success=False,
+                    size_mb=0,
+                    duration_sec=duration,
+                    error=error_msg
+                ))
+                return False, error_msg
                     
             # Get backup size
-            backup_size = backup_file.stat().st_size / (1024 * 1024)  # Convert to MB
+            backup_size = self._size(backup_file) / (1024 * 1024)  # Convert to MB
             duration = (datetime.datetime.now() - start_time).total_seconds()
             
             # Verify backup integrity
             if not self.verify_backup(backup_file):
                 error_msg = "Backup verification failed"
                 logger.error(error_msg)
-                backup_file.unlink()  # Remove invalid backup
+                self._remove(backup_file)  # Remove invalid backup
                 
                 # Record failed verification
                 dashboard.add_metric(BackupMetric(
@@ -129,6 +145,86 @@ class BackupService:
             logger.error(error_msg, exc_info=True)
             return False, error_msg
             
+    def _dump_plain(self, backup_file: Path) -> Optional[str]:
+        """Write a gzipped plain-SQL dump; returns an error message on failure"""
+        # Compress blocks of pg_dump's output on a thread pool
+        with ParallelGzipWriter(backup_file, level=self.compression_level,
+                                threads=self.compression_threads) as f, \
+                tempfile.TemporaryFile() as errors:
+            process = subprocess.Popen(
+                ['pg_dump', self.db_url],
+                stdout=subprocess.PIPE,
+                stderr=errors
+            )
+            for chunk in iter(lambda: process.stdout.read(self.pipe_chunk_size), b''):
+                f.write(chunk)
+            process.wait()
+
+            if process.returncode != 0:
+                errors.seek(0)
+                return f"Backup failed: {errors.read().decode('utf-8')}"
+        return None
+
+    def dump_directory(self, backup_dir: Path) -> Optional[str]:
+        """Write a directory-format dump with ``jobs`` tables dumped in parallel
+
+        Each table's data lands in its own compressed file. A
+        ``manifest.json`` listing every table with its dump id, file and
+        size is written next to pg_dump's table of contents.
+
+        Returns:
+            Optional[str]: Error message on failure, None on success
+        """
+        result = subprocess.run(
+            ['pg_dump', '--format=directory', f'--jobs={self.jobs}',
+             f'--compress={self.compression_level}', f'--file={backup_dir}', self.db_url],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        if result.returncode != 0:
+            return f"Backup failed: {result.stderr.decode('utf-8')}"
+
+        listing = subprocess.run(['pg_restore', '--list', str(backup_dir)], capture_output=True)
+        if listing.returncode != 0:
+            return f"Backup listing failed: {listing.stderr.decode('utf-8')}"
+        tables = {}
+        for line in listing.stdout.decode('utf-8').splitlines():
+            match = TOC_TABLE_DATA.match(line)
+            if not match:
+                continue
+            dump_id, schema, table = match.groups()
+            data_file = next((backup_dir / f'{dump_id}{ext}' for ext in ('.dat.gz', '.dat')
+                              if (backup_dir / f'{dump_id}{ext}').exists()), None)
+            tables[f'{schema}.{table}'] = {
+                'dump_id': int(dump_id),
+                'file': data_file.name if data_file else None,
+                'bytes': data_file.stat().st_size if data_file else 0
+            }
+        manifest = {
+            'format': 'directory',
+            'created_at': datetime.datetime.now().isoformat(),
+            'jobs': self.jobs,
+            'compression_level': self.compression_level,
+            'tables': tables
+        }
+        (backup_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+        return None
+
+    def read_manifest(self, backup_dir: Path) -> dict:
+        """Load a directory backup's manifest"""
+        return json.loads((Path(backup_dir) / MANIFEST_NAME).read_text())
+
+    def _size(self, backup: Path) -> int:
+        if backup.is_dir():
+            return sum(f.stat().st_size for f in backup.iterdir() if f.is_file())
+        return backup.stat().st_size
+
+    def _remove(self, backup: Path) -> None:
+        if backup.is_dir():
+            shutil.rmtree(backup)
+        else:
+            backup.unlink()
+
     def verify_backup(self, backup_file: Path) -> bool:
         """Verify the integrity of a backup file.
         
@@ -139,6 +235,10 @@ class BackupService:
             bool: True if backup is valid, False otherwise
         """
         try:
+            if backup_file.is_dir():
+                # pg_dump's table of contents and our manifest must both be there
+                return (backup_file / 'toc.dat').exists() and 'tables' in self.read_manifest(backup_file)
+
             # Test decompression and basic SQL syntax
             with gzip.open(backup_file, 'rb') as f:
                 header = f.read(100)
@@ -149,48 +249,69 @@ class BackupService:
             
     def cleanup_old_backups(self) -> None:
         """Remove old backups based on retention policy."""
-        backups = sorted(self.backup_dir.glob('*.sql.gz'), key=os.path.getmtime)
+        backups = sorted(
+            list(self.backup_dir.glob('*.sql.gz')) + list(self.backup_dir.glob('*.dir')),
+            key=os.path.getmtime
+        )
         
         # Remove by age
         cutoff = datetime.datetime.now() - datetime.timedelta(days=self.retention_days)
+        kept = []
         for backup in backups:
             if datetime.datetime.fromtimestamp(backup.stat().st_mtime) < cutoff:
-                backup.unlink()
+                self._remove(backup)
                 logger.info(f"Removed old backup: {backup.name}")
+            else:
+                kept.append(backup)
                 
         # Remove by count
-        while len(backups) > self.max_backups:
-            oldest = backups.pop(0)
-            oldest.unlink()
+        while len(kept) > self.max_backups:
+            oldest = kept.pop(0)
+            self._remove(oldest)
             logger.info(f"Removed backup (max count): {oldest.name}")
             
-    def restore_backup(self, backup_file: Path) -> Tuple[bool, str]:
+    def restore_backup(self, backup_file: Path, tables: Optional[List[str]] = None) -> Tuple[bool, str]:
         """Restore database from a backup file.
         
         Args:
-            backup_file (Path): Path to the backup file
+            backup_file (Path): Path to the backup file or directory
+            tables (List[str], optional): Restore only these tables (by name
+                or schema.name); needs a directory-format backup
             
         Returns:
             Tuple[bool, str]: (success, message) indicating restore status
         """
+        backup_file = Path(backup_file)
         try:
             # Verify backup before restore
             if not self.verify_backup(backup_file):
                 error_msg = "Cannot restore - backup verification failed"
                 logger.error(error_msg)
                 return False, error_msg
+
+            if backup_file.is_dir():
+                return self._restore_directory(backup_file, tables)
+            if tables:
+                return False, "Selective restore needs a directory-format backup"
                 
-            # Restore using psql
-            with gzip.open(backup_file, 'rb') as f:
+            # Restore using psql, decompressing into its stdin
+            with gzip.open(backup_file, 'rb') as f, tempfile.TemporaryFile() as errors:
                 process = subprocess.Popen(
                     ['psql', self.db_url],
-                    stdin=f,
-                    stderr=subprocess.PIPE
+                    stdin=subprocess.PIPE,
+                    stderr=errors
                 )
-                _, stderr = process.communicate()
+                try:
+                    shutil.copyfileobj(f, process.stdin, self.pipe_chunk_size)
+                except BrokenPipeError:
+                    pass  # psql exited early; its status and stderr say why
+                finally:
+                    process.stdin.close()
+                process.wait()
                 
                 if process.returncode != 0:
-                    error_msg = f"Restore failed: {stderr.decode('utf-8')}"
+                    errors.seek(0)
+                    error_msg = f"Restore failed: {errors.read().decode('utf-8')}"
                     logger.error(error_msg)
                     return False, error_msg
                     
@@ -201,3 +322,128 @@ class BackupService:
             error_msg = f"Restore error: {str(e)}"
             logger.error(error_msg, exc_info=True)
             return False, error_msg
+
+    def _restore_directory(self, backup_dir: Path, tables: Optional[List[str]]) -> Tuple[bool, str]:
+        """Restore a directory backup
+
+        A full restore drops and recreates every object with ``jobs``
+        parallel pg_restore workers.
+
+        With ``tables`` the schema is left alone and only the tables' rows
+        and sequence values are replaced, so keys, indexes and foreign keys
+        stay in place. The tables are truncated and reloaded in one psql
+        transaction, referenced tables first, so a failure at any point
+        leaves them exactly as they were. The load is a single stream
+        (``jobs`` does not apply). Tables referencing the selected ones must
+        be selected too, or the truncate fails, and tables referencing each
+        other in a cycle cannot be restored this way.
+        """
+        if not tables:
+            result = subprocess.run(
+                ['pg_restore', f'--jobs={self.jobs}', f'--dbname={self.db_url}',
+                 '--clean', '--if-exists', str(backup_dir)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
+            return self._restore_result(backup_dir, result.returncode, result.stderr, 'all tables')
+
+        available = self.read_manifest(backup_dir)['tables']
+        names = {name.split('.', 1)[1]: name for name in available}
+        missing = [table for table in tables if table not in available and table not in names]
+        if missing:
+            return False, f"Tables not in backup: {', '.join(missing)}"
+        selected = [table if table in available else names[table] for table in tables]
+
+        listing = subprocess.run(['pg_restore', '--list', str(backup_dir)], capture_output=True)
+        if listing.returncode != 0:
+            return False, f"Restore failed: {listing.stderr.decode('utf-8')}"
+        in_selected = ', '.join("'{}'".format(name.replace("'", "''")) for name in selected)
+        error, sequences = self._psql(
+            "SELECT pg_get_serial_sequence(format('%I.%I', table_schema, table_name), column_name) "
+            f"FROM information_schema.columns WHERE (table_schema || '.' || table_name) IN ({in_selected})"
+        )
+        if not error:
+            error, references = self._psql(
+                "SELECT cn.nspname || '.' || c.relname, fn.nspname || '.' || f.relname FROM pg_constraint k "
+                "JOIN pg_class c ON c.oid = k.conrelid JOIN pg_namespace cn ON cn.oid = c.relnamespace "
+                "JOIN pg_class f ON f.oid = k.confrelid JOIN pg_namespace fn ON fn.oid = f.relnamespace "
+                "WHERE k.contype = 'f'"
+            )
+        if error:
+            return False, f"Restore failed: {error}"
+        sequences = {name.replace('"', '') for name in sequences.split()}
+
+        data, sequence_sets = {}, []
+        for line in listing.stdout.decode('utf-8').splitlines():
+            table, sequence = TOC_TABLE_DATA.match(line), TOC_SEQUENCE_SET.match(line)
+            if table and '.'.join(table.groups()[1:]) in selected:
+                data['.'.join(table.groups()[1:])] = line
+            elif sequence and '.'.join(sequence.groups()[1:]) in sequences:
+                sequence_sets.append(line)
+        depends_on = {name: set() for name in data}
+        for pair in references.splitlines():
+            referencing, _, referenced = pair.partition('|')
+            if referencing in depends_on and referenced in depends_on and referencing != referenced:
+                depends_on[referencing].add(referenced)
+        ordered = []
+        while depends_on:
+            ready = [name for name, needed in depends_on.items() if not needed - set(ordered)]
+            if not ready:
+                return False, f"Restore failed: foreign keys form a cycle between {', '.join(depends_on)}"
+            for name in ready:
+                ordered.append(name)
+                del depends_on[name]
+        entries = [data[name] for name in ordered] + sequence_sets
+
+        truncate = 'BEGIN;\nTRUNCATE TABLE ' + ', '.join(
+            '.'.join(f'"{part}"' for part in name.split('.', 1)) for name in selected
+        ) + ';\n'
+        with tempfile.TemporaryDirectory() as workdir, tempfile.TemporaryFile() as errors:
+            toc = Path(workdir) / 'restore.list'
+            toc.write_text('\n'.join(entries) + '\n')
+            # pg_restore writes the rows as SQL; psql loads them in the transaction opened here,
+            # which only commits once pg_restore has produced all of them
+            restore = subprocess.Popen(
+                ['pg_restore', '--data-only', f'--use-list={toc}', '--file=-', str(backup_dir)],
+                stdout=subprocess.PIPE, stderr=errors
+            )
+            load = subprocess.Popen(
+                ['psql', '--no-psqlrc', '--quiet', '--set=ON_ERROR_STOP=1', '--file=-', self.db_url],
+                stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=errors
+            )
+            try:
+                load.stdin.write(truncate.encode('utf-8'))
+                shutil.copyfileobj(restore.stdout, load.stdin, self.pipe_chunk_size)
+                if restore.wait() == 0:
+                    load.stdin.write(b'COMMIT;\n')
+                else:
+                    # Dropping the connection rolls the transaction back
+                    load.kill()
+            except BrokenPipeError:
+                restore.kill()
+                restore.wait()
+            finally:
+                restore.stdout.close()
+                try:
+                    load.stdin.close()
+                except BrokenPipeError:
+                    pass
+            returncode = load.wait() or restore.returncode
+            errors.seek(0)
+            return self._restore_result(backup_dir, returncode, errors.read(), ', '.join(tables))
+
+    def _psql(self, sql: str) -> Tuple[Optional[str], str]:
+        """Run one statement, returning an error message or None and the unaligned output"""
+        result = subprocess.run(['psql', '--no-psqlrc', '--tuples-only', '--no-align',
+                                 '--set=ON_ERROR_STOP=1', f'--command={sql}', self.db_url],
+                                capture_output=True)
+        if result.returncode != 0:
+            return result.stderr.decode('utf-8'), ''
+        return None, result.stdout.decode('utf-8')
+
+    def _restore_result(self, backup_dir: Path, returncode: int, stderr: bytes, restored: str) -> Tuple[bool, str]:
+        if returncode != 0:
+            error_msg = f"Restore failed: {stderr.decode('utf-8')}"
+            logger.error(error_msg)
+            return False, error_msg
+        logger.info(f"Database restored from: {backup_dir.name} ({restored})")
+        return True, f"Database restored from: {backup_dir.name} ({restored})"
@@ -0,0 +1,319 @@
+"""Bot run records and their chunked, compressed logs.
+
+Log lines are buffered in memory and appended as zlib-compressed blocks
+to ``bot_run_log_chunk``. Blocks are written on their own connection, so
+a bot's session commits and rollbacks never lose or duplicate log output.
+Readers tail a run by byte offset and only ever decompress the blocks
+past that offset.
+
+The ``bot_run`` row doubles as the run's status row: running bots write
+throttled heartbeats with their progress to it and pick up cancellation
+requests from it, and runs that stop heartbeating are reaped as failed.
+"""
+import logging
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Tuple
+from flask import current_app
+from sqlalchemy import exists, insert, or_, select, update
+from sqlalchemy.exc import OperationalError
+from app.extensions import db
+from app.models.bot import Bot, BotStatus
+from app.models.bot_run import BotRun, BotRunLogChunk
+
+logger = logging.getLogger(__name__)
+
+ERROR_SUMMARY_LENGTH = 500
+
+class BotRunLogWriter:
+    """Append-only writer for one run's log"""
+
+    def __init__(self, run_id, block_size=None, flush_interval=None):
+        self.run_id = run_id
+        self.block_size = block_size or int(os.getenv('BOT_LOG_BLOCK_SIZE', 16 * 1024))
+        self.flush_interval = flush_interval if flush_interval is not None else \
+            float(os.getenv('BOT_LOG_FLUSH_SECONDS', 2.0))
+        self.compression_level = int(os.getenv('BOT_LOG_COMPRESSION_LEVEL', 6))
+        self._buffer = []
+        self._buffered = 0
+        self._seq = 0
+        self._offset = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        with self._lock:
+            self._buffer.append(data)
+            self._buffered += len(data)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if self._buffered >= self.block_size or due:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        data = b''.join(self._buffer)
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(BotRunLogChunk), [{
+                    'run_id': self.run_id,
+                    'seq': self._seq,
+                    'start_offset': self._offset,
+                    'length': len(data),
+                    'data': zlib.compress(data, self.compression_level),
+                    'created_at': datetime.utcnow()
+                }])
+                connection.execute(update(BotRun).where(BotRun.id == self.run_id).values(
+                    log_size=self._offset + len(data),
+                    log_chunks=self._seq + 1
+                ))
+        except OperationalError as e:
+            # e.g. SQLite locked by the bot's open transaction; keep the block for the next flush
+            logger.debug(f"Deferred log flush for bot run {self.run_id}: {e}")
+            return
+        self._buffer, self._buffered = [], 0
+        self._seq += 1
+        self._offset += len(data)
+
+class BotRunLogHandler(logging.Handler):
+    """Logging handler that sends a bot's log records to its run log"""
+
+    def __init__(self, writer, level=logging.INFO):
+        super().__init__(level)
+        self.writer = writer
+        self.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    def emit(self, record):
+        try:
+            self.writer.write(self.format(record) + '\n')
+            if record.levelno >= logging.ERROR:
+                self.writer.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.writer.flush()
+
+class BotRunHeartbeat:
+    """BotContext progress callback that reports to the run's status row
+
+    Writes are throttled to one per ``interval`` seconds and go through
+    their own connection. Each write also reads ``cancel_requested`` and
+    cancels the context when an admin asked for it. ``start`` also beats
+    from a background thread every ``interval`` seconds, so a batch that
+    runs longer than the reaper's timeout does not get a live run reaped.
+    """
+
+    def __init__(self, run_id, interval=None):
+        self.run_id = run_id
+        self.interval = interval if interval is not None else \
+            float(os.getenv('BOT_HEARTBEAT_SECONDS', 15))
+        self._last_beat = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __call__(self, ctx):
+        now = time.monotonic()
+        with self._lock:
+            if self._last_beat is not None and now - self._last_beat < self.interval:
+                return
+            self._last_beat = now
+        self.beat(ctx)
+
+    def beat(self, ctx):
+        """Write the heartbeat and progress now and pick up cancellation"""
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(update(BotRun).where(BotRun.id == self.run_id).values(
+                    heartbeat_at=datetime.utcnow(),
+                    processed=ctx.processed,
+                    total=ctx.total
+                ))
+                cancel = connection.execute(
+                    select(BotRun.cancel_requested).where(BotRun.id == self.run_id)
+                ).scalar()
+        except OperationalError as e:
+            logger.debug(f"Skipped heartbeat for bot run {self.run_id}: {e}")
+            return
+        if cancel:
+            ctx.cancel()
+
+    def start(self, ctx):
+        """Keep beating from a daemon thread until ``stop``"""
+        app = current_app._get_current_object()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, args=(app, ctx),
+                                        name=f'bot-run-{self.run_id}-heartbeat', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, app, ctx):
+        with app.app_context():
+            while not self._stopped.wait(self.interval):
+                with self._lock:
+                    due = self._last_beat is None or time.monotonic() - self._last_beat >= self.interval
+                    if due:
+                        self._last_beat = time.monotonic()
+                if due:
+                    self.beat(ctx)
+
+class BotRunService:
+    def __init__(self):
+        self.heartbeat_timeout = int(os.getenv('BOT_HEARTBEAT_TIMEOUT', 300))
+
+    def claim(self, bot) -> bool:
+        """Mark a bot as running unless a live run already holds it
+
+        Stale runs are reaped first, so a crashed run does not block the
+        bot forever. The conditional UPDATE makes concurrent claims safe:
+        only one caller sees a changed row.
+        """
+        self.reap_stale_runs()
+        claimed = db.session.query(Bot).filter(
+            Bot.id == bot.id,
+            or_(Bot.status.is_(None), Bot.status != BotStatus.RUNNING)
+        ).update({
+            Bot.status: BotStatus.RUNNING,
+            Bot.last_run: datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+        db.session.refresh(bot)
+        return bool(claimed)
+
+    def start_run(self, bot) -> BotRun:
+        now = datetime.utcnow()
+        run = BotRun(bot_id=bot.id, status=BotStatus.RUNNING, started_at=now, heartbeat_at=now)
+        db.session.add(run)
+        db.session.commit()
+        return run
+
+    def heartbeat(self, run) -> BotRunHeartbeat:
+        return BotRunHeartbeat(run.id)
+
+    def request_cancel(self, run_id) -> bool:
+        """Ask a live run to stop at its next batch boundary"""
+        requested = db.session.query(BotRun).filter(
+            BotRun.id == run_id,
+            BotRun.finished_at.is_(None)
+        ).update({BotRun.cancel_requested: True}, synchronize_session=False)
+        db.session.commit()
+        return bool(requested)
+
+    def reap_stale_runs(self) -> int:
+        """Fail running runs whose last heartbeat is older than the timeout
+
+        Bots left marked running without a live run, e.g. after a crash
+        between ``claim`` and ``start_run`` or from before run rows
+        existed, are failed once their claim is older than the timeout.
+
+        Returns:
+            int: Number of reaped runs and orphaned bots
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.heartbeat_timeout)
+        stale = db.session.query(BotRun.id, BotRun.bot_id).filter(
+            BotRun.status == BotStatus.RUNNING,
+            BotRun.heartbeat_at < cutoff
+        ).all()
+
+        if stale:
+            db.session.query(BotRun).filter(
+                BotRun.id.in_([run_id for run_id, _ in stale]),
+                BotRun.status == BotStatus.RUNNING
+            ).update({
+                BotRun.status: BotStatus.FAILED,
+                BotRun.finished_at: now,
+                BotRun.error_summary: f"No heartbeat for {self.heartbeat_timeout} seconds"
+            }, synchronize_session=False)
+            logger.warning(f"Reaped {len(stale)} stale bot runs: {[run_id for run_id, _ in stale]}")
+
+        # Covers the bots of the runs just reaped as well
+        orphaned = {bot_id for (bot_id,) in db.session.query(Bot.id).filter(
+            Bot.status == BotStatus.RUNNING,
+            or_(Bot.last_run.is_(None), Bot.last_run < cutoff),
+            ~exists().where(BotRun.bot_id == Bot.id, BotRun.status == BotStatus.RUNNING)
+        )}
+        if orphaned:
+            db.session.query(Bot).filter(
+                Bot.id.in_(orphaned),
+                Bot.status == BotStatus.RUNNING
+            ).update({Bot.status: BotStatus.FAILED}, synchronize_session=False)
+        db.session.commit()
+
+        orphaned -= {bot_id for _, bot_id in stale}
+        if orphaned:
+            logger.warning(f"Reset bots marked running without a live run: {sorted(orphaned)}")
+        return len(stale) + len(orphaned)
+
+    def attach_log(self, run, bot_logger, level=logging.INFO) -> BotRunLogHandler:
+        """Capture ``bot_logger`` output into the run's log until detached"""
+        handler = BotRunLogHandler(BotRunLogWriter(run.id), level)
+        bot_logger.addHandler(handler)
+        return handler
+
+    def detach_log(self, bot_logger, handler):
+        bot_logger.removeHandler(handler)
+        handler.flush()
+        handler.close()
+
+    def finish_run(self, run, status, error=None, ctx=None):
+        run.status = status
+        run.finished_at = datetime.utcnow()
+        if ctx is not None:
+            run.processed = ctx.processed
+            run.total = ctx.total
+        if error is not None:
+            run.error_summary = str(error)[:ERROR_SUMMARY_LENGTH]
+        db.session.commit()
+        return run
+
+    def recent_runs(self, bot_id, limit=20):
+        return BotRun.query.filter_by(bot_id=bot_id).order_by(
+            BotRun.started_at.desc()
+        ).limit(limit).all()
+
+    def read_log(self, run_id, offset=0, max_bytes=None) -> Tuple[str, int]:
+        """Return log text from a byte offset and the offset to resume from
+
+        Only blocks ending past ``offset`` are loaded; at most about
+        ``max_bytes`` of uncompressed text is returned per call.
+        """
+        max_bytes = max_bytes or int(os.getenv('BOT_LOG_TAIL_BYTES', 64 * 1024))
+        rows = db.session.execute(
+            select(BotRunLogChunk.start_offset, BotRunLogChunk.length, BotRunLogChunk.data)
+            .where(BotRunLogChunk.run_id == run_id,
+                   BotRunLogChunk.start_offset + BotRunLogChunk.length > offset)
+            .order_by(BotRunLogChunk.seq)
+        )
+        parts = []
+        next_offset = offset
+        for start_offset, length, data in rows:
+            block = zlib.decompress(data)[max(offset - start_offset, 0):]
+            parts.append(block)
+            next_offset = start_offset + length
+            if next_offset - offset >= max_bytes:
+                break
+        return b''.join(parts).decode('utf-8', errors='replace'), next_offset
+
+    def full_log(self, run_id) -> str:
+        text, offset = '', 0
+        while True:
+            part, next_offset = self.read_log(run_id, offset)
+            if next_offset == offset:
+                return text
+            text, offset = text + part, next_offset
@@ -28,53 +28,107 @@ class BotService(BaseService):
         return db.session.get(Bot, bot_id)
 
 from datetime import datetime
-from flask import request
+import logging
+from flask import has_request_context, request
 from flask_login import current_user
-from app.models.notification import Notification, NotificationType
+from app.common.enums import NotificationPriority, NotificationType
+from app.models.notification import Notification
 from app.models.audit_log import AuditLog
+from bots.base import BotCancelled, BotContext
+from bots.registry import get_bot_class
+from app.services.notification_service import create_notification
+
+logger = logging.getLogger(__name__)
 
 def run_bot(bot):
+    """Run a bot unless a live run of it is already in progress
+
+    Returns:
+        BotRun: The finished run, or None if the bot was already running
+    """
+    from app.services.bot_run_service import BotRunService
+    run_service = BotRunService()
+    if not run_service.claim(bot):
+        logger.warning(f"Refusing to start {bot.name}: a run is already in progress")
+        return None
+
+    run = None
+    handler = None
+    bot_logger = None
+    ctx = None
     try:
-        bot.status = 'running'
-        bot.last_run = datetime.utcnow()
-        bot.last_error = None
-        db.session.commit()
+        run = run_service.start_run(bot)
         
         # Create audit log
         AuditLog.create(
-            user_id=current_user.id if current_user.is_authenticated else 0,
+            user_id=current_user.id if has_request_context() and current_user.is_authenticated else 0,
             action=f'run_bot_{bot.name}',
             object_type='Bot',
             object_id=bot.id,
-            ip_address=request.remote_addr
+            ip_address=request.remote_addr if has_request_context() else None
         )
         
-        # Run the appropriate bot
-        if bot.name == 'TagBot':
-            from bots.tag_bot import TagBot
-            TagBot().run()
-        elif bot.name == 'UpdateBot':
-            from bots.update_bot import UpdateBot
-            UpdateBot().run()
-        elif bot.name == 'ReviewBot':
-            from bots.review_bot import ReviewBot
-            ReviewBot().run()
-        else:
-            raise ValueError(f"Unknown bot type: {bot.name}")
+        # Bot code is imported only now, through the registry
+        bot_instance = get_bot_class(bot.name)()
+        bot_logger = bot_instance.logger
+        handler = run_service.attach_log(run, bot_logger)
+        heartbeat = run_service.heartbeat(run)
+        ctx = BotContext(bot=bot, progress_callback=heartbeat)
+        # Beats between batches too, so a slow batch is not mistaken for a dead run
+        heartbeat.start(ctx)
+        try:
+            bot_instance.run(bot_instance.iter_batches(ctx), ctx)
+        finally:
+            heartbeat.stop()
             
-        bot.status = 'completed'
-        Notification.create(
-            type=NotificationType.BOT_SUCCESS,
-            message=f"{bot.name} completed successfully"
+        bot.status = BotStatus.COMPLETED
+        run_service.finish_run(run, BotStatus.COMPLETED, ctx=ctx)
+        create_notification(
+            NotificationType.BOT_SUCCESS,
+            f"{bot.name} completed successfully - processed {ctx.processed} items",
+            related_object=bot
         )
+    except BotCancelled as e:
+        db.session.rollback()
+        bot_logger.warning(str(e))
+        bot.status = BotStatus.CANCELLED
+        run_service.finish_run(run, BotStatus.CANCELLED, error=e, ctx=ctx)
     except Exception as e:
-        bot.status = 'failed'
-        Notification.create(
-            type=NotificationType.BOT_ERROR,
-            message=f"{bot.name} failed: {str(e)}"
+        db.session.rollback()
+        if bot_logger is not None:
+            bot_logger.exception(f"{bot.name} failed")
+        bot.status = BotStatus.FAILED
+        if run is not None:
+            run_service.finish_run(run, BotStatus.FAILED, error=e, ctx=ctx)
+        create_notification(
+            NotificationType.BOT_ERROR,
+            f"{bot.name} failed: {str(e)}"[:255],
+            related_object=bot,
+            priority=NotificationPriority.HIGH
         )
     finally:
+        if handler is not None:
+            run_service.detach_log(bot_logger, handler)
         db.session.commit()
+    return run
+
+def run_due_bots():
+    """Run every active bot whose scheduled time has passed
+
+    Bots that are still running are skipped by ``run_bot``, so a slow run
+    is never overlapped by its next scheduled one.
+    """
+    now = datetime.utcnow()
+    due = db.session.query(Bot).filter(
+        Bot.is_active.is_(True),
+        Bot.next_run.isnot(None),
+        Bot.next_run <= now
+    ).all()
+    for bot in due:
+        run_bot(bot)
+        bot.next_run = bot.calculate_next_run()
+        db.session.commit()
+    return len(due)
 
 def get_all_bots():
     return db.session.query(Bot).all()
@@ -113,7 +167,7 @@ def delete_bot(bot):
     db.session.commit()
 
 def get_recent_logs(limit=5):
-    return Notification.query.order_by(Notification.created_at.desc()).limit(limit).all()
+    return db.session.query(Notification).order_by(Notification.created_at.desc()).limit(limit).all()
 
 def calculate_next_run(schedule):
     """Calculate next run time based on schedule string"""
@@ -128,51 +182,3 @@ def calculate_next_run(schedule):
         return now + timedelta(days=30)
     else:
         raise ValueError("Invalid schedule")
-from app.models import Bot, AuditLog
-from app.extensions import db
-from datetime import datetime
-
-class TagBot:
-    def run(self):
-        bot = Bot(name='TagBot', status='running', last_run=datetime.utcnow())
-        db.session.add(bot)
-        
-        try:
-            # Implement tagging logic
-            pass
-        except Exception as e:
-            bot.error_log = str(e)
-            bot.status = 'failed'
-        finally:
-            db.session.commit()
-
-class UpdateBot:
-    def run(self):
-        bot = Bot(name='UpdateBot', status='running', last_run=datetime.utcnow())
-        db.session.add(bot)
-        
-        try:
-            # Implement update logic
-            pass
-        except Exception as e:
-            bot.error_log = str(e)
-            bot.status = 'failed'
-        finally:
-            db.session.commit()
-
-class ReviewBot:
-    def run(self):
-        bot = Bot(name='ReviewBot', status='running', last_run=datetime.utcnow())
-        db.session.add(bot)
-        
-        try:
-            # Implement review logic
-            pass
-        except Exception as e:
-            bot.error_log = str(e)
-            bot.status = 'failed'
-        finally:
-            db.session.commit()
-def some_function():
-    from app.services.bot_service import run_bot  # Lazy import
-    run_bot()
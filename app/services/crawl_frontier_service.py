@@ -0,0 +1,268 @@
+import hashlib
+import logging
+import os
+import re
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from sqlalchemy import and_, insert, or_
+from app.extensions import db
+from app.models.crawl_frontier import CrawlHost, CrawlStatus, CrawlURL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid'}
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so equivalent spellings share one frontier entry.
+
+    Lowercases scheme and host, drops default ports, fragments, user info
+    and tracking parameters, collapses duplicate slashes and sorts the
+    query string.
+
+    Raises:
+        ValueError: If the URL is not an absolute http(s) URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        raise ValueError(f"Not an absolute http(s) URL: {url}")
+
+    host = parts.hostname.lower().rstrip('.')
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        netloc = f"{host}:{parts.port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path) or '/'
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith(TRACKING_PARAM_PREFIXES)
+    ))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+def url_hash(normalized_url: str) -> str:
+    return hashlib.sha256(normalized_url.encode('utf-8')).hexdigest()
+
+class CrawlFrontier:
+    """DB-backed URL queue shared by discovery bots.
+
+    All state lives in the ``crawl_url`` and ``crawl_host`` tables, so a bot
+    run can stop at any point and the next run resumes where it left off.
+    Workers lease disjoint batches: each lease claims at most one URL per
+    host and reserves the host's next fetch slot, so concurrent workers
+    never hit the same host at once. On PostgreSQL candidate host rows are
+    selected with ``FOR UPDATE SKIP LOCKED``; on SQLite the conditional
+    lease updates are serialized by the database write lock.
+    """
+
+    def __init__(self):
+        self.default_delay = float(os.getenv('CRAWL_DEFAULT_DELAY', 1.0))
+        self.lease_seconds = int(os.getenv('CRAWL_LEASE_SECONDS', 300))
+        self.batch_size = int(os.getenv('CRAWL_BATCH_SIZE', 20))
+        self.min_recrawl = int(os.getenv('CRAWL_MIN_RECRAWL_SECONDS', 6 * 3600))
+        self.max_recrawl = int(os.getenv('CRAWL_MAX_RECRAWL_SECONDS', 30 * 86400))
+        self.max_errors = int(os.getenv('CRAWL_MAX_ERRORS', 5))
+
+    @property
+    def _dialect(self):
+        return db.session.get_bind().dialect.name
+
+    def add_urls(self, urls: Iterable[str], priority: int = 0, commit: bool = True) -> int:
+        """Add URLs to the frontier, ignoring ones it already knows.
+
+        Returns:
+            int: Number of URLs that were new to the frontier
+        """
+        rows = {}
+        for url in urls:
+            try:
+                normalized = normalize_url(url)
+            except ValueError as e:
+                logger.warning(str(e))
+                continue
+            rows.setdefault(url_hash(normalized), {
+                'url': normalized,
+                'url_hash': url_hash(normalized),
+                'host': urlsplit(normalized).hostname,
+                'priority': priority,
+                'status': CrawlStatus.PENDING,
+                'next_fetch_at': datetime.utcnow(),
+                'fetch_count': 0,
+                'error_count': 0,
+                'discovered_at': datetime.utcnow()
+            })
+        if not rows:
+            return 0
+
+        known = {h for (h,) in db.session.query(CrawlURL.url_hash).filter(
+            CrawlURL.url_hash.in_(list(rows))
+        )}
+        new_rows = [row for key, row in rows.items() if key not in known]
+        if new_rows:
+            hosts = {row['host'] for row in new_rows}
+            self._insert_ignore(CrawlHost, [
+                {'host': host, 'crawl_delay': self.default_delay, 'next_allowed_at': datetime.utcnow()}
+                for host in hosts
+            ], 'host')
+            self._insert_ignore(CrawlURL, new_rows, 'url_hash')
+        if commit:
+            db.session.commit()
+        return len(new_rows)
+
+    def seed_from_organizations(self, priority: int = 10) -> int:
+        """Queue every organization website as a crawl seed"""
+        from app.models.organization import Organization
+        websites = [website for (website,) in db.session.query(Organization.website).filter(
+            Organization.website.isnot(None)
+        )]
+        return self.add_urls(websites, priority=priority)
+
+    def lease_batch(self, worker_id: str, limit: Optional[int] = None) -> List[CrawlURL]:
+        """Lease up to ``limit`` ready URLs, at most one per host.
+
+        Returns:
+            list: Leased CrawlURL rows, each carrying the ``lease_token``
+            needed to complete or fail it
+        """
+        limit = limit or self.batch_size
+        now = datetime.utcnow()
+        token = str(uuid.uuid4())
+
+        candidates = db.session.query(CrawlURL.id, CrawlURL.host, CrawlHost.crawl_delay).join(
+            CrawlHost, CrawlHost.host == CrawlURL.host
+        ).filter(
+            self._leasable(now),
+            CrawlURL.next_fetch_at <= now,
+            CrawlHost.next_allowed_at <= now
+        ).order_by(CrawlURL.priority.desc(), CrawlURL.next_fetch_at).limit(limit * 5)
+        if self._dialect == 'postgresql':
+            candidates = candidates.with_for_update(skip_locked=True, of=CrawlHost)
+
+        chosen_ids = []
+        seen_hosts = set()
+        for url_id, host, crawl_delay in candidates.all():
+            if host in seen_hosts:
+                continue
+            seen_hosts.add(host)
+            # Reserve the host's next slot; losing this race means another worker has it
+            claimed = db.session.query(CrawlHost).filter(
+                CrawlHost.host == host,
+                CrawlHost.next_allowed_at <= now
+            ).update({CrawlHost.next_allowed_at: now + timedelta(seconds=crawl_delay)},
+                     synchronize_session=False)
+            if claimed:
+                chosen_ids.append(url_id)
+            if len(chosen_ids) >= limit:
+                break
+
+        if chosen_ids:
+            db.session.query(CrawlURL).filter(
+                CrawlURL.id.in_(chosen_ids),
+                self._leasable(now)
+            ).update({
+                CrawlURL.status: CrawlStatus.LEASED,
+                CrawlURL.lease_owner: worker_id,
+                CrawlURL.lease_token: token,
+                CrawlURL.lease_expires_at: now + timedelta(seconds=self.lease_seconds)
+            }, synchronize_session=False)
+        db.session.commit()
+
+        if not chosen_ids:
+            return []
+        return db.session.query(CrawlURL).filter_by(lease_token=token).all()
+
+    def complete(self, crawl_url: CrawlURL, content_hash: Optional[str] = None,
+                 discovered_urls: Iterable[str] = ()) -> bool:
+        """Record a successful fetch and schedule the next one.
+
+        The recrawl interval halves when the content changed and doubles
+        when it did not, bounded by CRAWL_MIN/MAX_RECRAWL_SECONDS.
+
+        Returns:
+            bool: False if the lease expired and was taken by another worker
+        """
+        row = self._owned_row(crawl_url)
+        if row is None:
+            return False
+
+        now = datetime.utcnow()
+        interval = row.recrawl_interval or self.min_recrawl
+        if row.fetch_count and content_hash == row.content_hash:
+            interval = min(interval * 2, self.max_recrawl)
+        else:
+            interval = max(interval // 2, self.min_recrawl)
+
+        row.status = CrawlStatus.PENDING
+        row.content_hash = content_hash
+        row.recrawl_interval = interval
+        row.next_fetch_at = now + timedelta(seconds=interval)
+        row.last_fetched_at = now
+        row.fetch_count += 1
+        row.error_count = 0
+        row.last_error = None
+        self._release(row)
+
+        if discovered_urls:
+            self.add_urls(discovered_urls, priority=row.priority, commit=False)
+        db.session.commit()
+        return True
+
+    def fail(self, crawl_url: CrawlURL, error: str) -> bool:
+        """Record a failed fetch, backing off exponentially until max errors"""
+        row = self._owned_row(crawl_url)
+        if row is None:
+            return False
+
+        row.error_count += 1
+        row.last_error = str(error)[:255]
+        if row.error_count >= self.max_errors:
+            row.status = CrawlStatus.FAILED
+        else:
+            row.status = CrawlStatus.PENDING
+            row.next_fetch_at = datetime.utcnow() + timedelta(seconds=60 * 2 ** row.error_count)
+        self._release(row)
+        db.session.commit()
+        return True
+
+    def stats(self):
+        """Return the number of frontier URLs per status"""
+        counts = db.session.query(CrawlURL.status, db.func.count(CrawlURL.id)).group_by(CrawlURL.status)
+        return {status: count for status, count in counts}
+
+    def _leasable(self, now):
+        return or_(
+            CrawlURL.status == CrawlStatus.PENDING,
+            and_(CrawlURL.status == CrawlStatus.LEASED, CrawlURL.lease_expires_at < now)
+        )
+
+    def _owned_row(self, crawl_url):
+        row = db.session.query(CrawlURL).filter_by(
+            id=crawl_url.id, lease_token=crawl_url.lease_token
+        ).first()
+        if row is None or row.status != CrawlStatus.LEASED:
+            logger.warning(f"Lease lost for crawl URL {crawl_url.id}")
+            return None
+        return row
+
+    def _release(self, row):
+        row.lease_owner = None
+        row.lease_token = None
+        row.lease_expires_at = None
+
+    def _insert_ignore(self, model, rows, key):
+        """Multi-row insert that skips rows conflicting on ``key``"""
+        if self._dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif self._dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            column = getattr(model, key)
+            existing = {v for (v,) in db.session.query(column).filter(column.in_([r[key] for r in rows]))}
+            rows = [row for row in rows if row[key] not in existing]
+            if rows:
+                db.session.execute(insert(model), rows)
+            return
+        db.session.execute(dialect_insert(model).on_conflict_do_nothing(index_elements=[key]), rows)
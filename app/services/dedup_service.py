@@ -0,0 +1,254 @@
+"""Near-duplicate stipend detection with MinHash signatures and LSH banding.
+
+Each stipend's name, description and organization name are shingled into
+character n-grams and reduced to a fixed-size MinHash signature. The
+signature is split into bands; every band is hashed into a bucket stored in
+``stipend_lsh_band``. Two stipends become candidates only when they share a
+bucket, so checking a new stipend reads the rows in its own buckets instead
+of comparing it with every other stipend.
+"""
+import hashlib
+import logging
+import os
+import random
+import re
+import struct
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, delete, insert, or_, select, update
+from app.extensions import db
+from app.models.stipend_signature import (
+    DuplicateCandidate, DuplicateStatus, StipendLSHBand, StipendSignature
+)
+
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 128
+NUM_BANDS = 16  # 8 rows per band, candidate threshold ~0.7 similarity
+SHINGLE_SIZE = 5
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_SIGNATURE_FORMAT = f'<{NUM_PERMUTATIONS}I'
+
+# Fixed seed: signatures stored in the database must stay comparable across runs
+_rng = random.Random(4242)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+def _normalize(text: str) -> str:
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Return the set of character n-grams of the normalized text"""
+    text = _normalize(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+def _hash64(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'little')
+
+def compute_signature(text: str) -> Tuple[int, ...]:
+    """Compute the MinHash signature of a text"""
+    hashes = [_hash64(s.encode('utf-8')) for s in shingles(text)]
+    if not hashes:
+        return (_MAX_HASH,) * NUM_PERMUTATIONS
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+def band_buckets(signature: Sequence[int]) -> List[Tuple[int, int]]:
+    """Split a signature into (band, bucket) pairs for the LSH index"""
+    rows = len(signature) // NUM_BANDS
+    buckets = []
+    for band in range(NUM_BANDS):
+        chunk = struct.pack(f'<{rows}I', *signature[band * rows:(band + 1) * rows])
+        # Signed so the bucket fits a BIGINT column
+        buckets.append((band, _hash64(chunk) - (1 << 63)))
+    return buckets
+
+def estimate_similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """Estimate the Jaccard similarity of two texts from their signatures"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+def pack_signature(signature: Sequence[int]) -> bytes:
+    return struct.pack(_SIGNATURE_FORMAT, *signature)
+
+def unpack_signature(data: bytes) -> Tuple[int, ...]:
+    return struct.unpack(_SIGNATURE_FORMAT, data)
+
+class DedupService:
+    def __init__(self):
+        self.threshold = float(os.getenv('DEDUP_SIMILARITY_THRESHOLD', 0.8))
+
+    def stipend_text(self, stipend_id: int) -> Optional[str]:
+        """Return the text a stipend's signature is computed from"""
+        from app.models.organization import Organization
+        from app.models.stipend import Stipend
+        stipends = Stipend.__table__
+        organizations = Organization.__table__
+        row = db.session.execute(
+            select(stipends.c.name, stipends.c.description, organizations.c.name)
+            .select_from(stipends.outerjoin(organizations, organizations.c.id == stipends.c.organization_id))
+            .where(stipends.c.id == stipend_id)
+        ).first()
+        if row is None:
+            return None
+        return ' '.join(part for part in row if part)
+
+    def index_stipend(self, stipend_id: int, text: Optional[str] = None) -> Tuple[int, ...]:
+        """Store the signature and LSH buckets of a stipend, replacing old ones"""
+        text = text if text is not None else self.stipend_text(stipend_id)
+        if text is None:
+            raise ValueError(f"Stipend {stipend_id} not found")
+
+        signature = compute_signature(text)
+        self._remove_from_index(stipend_id)
+        db.session.execute(insert(StipendSignature), [{
+            'stipend_id': stipend_id,
+            'signature': pack_signature(signature),
+            'updated_at': datetime.utcnow()
+        }])
+        db.session.execute(insert(StipendLSHBand), [
+            {'stipend_id': stipend_id, 'band': band, 'bucket': bucket}
+            for band, bucket in band_buckets(signature)
+        ])
+        return signature
+
+    def find_candidates(self, stipend_id: int, signature: Sequence[int],
+                        threshold: Optional[float] = None) -> List[Tuple[int, float]]:
+        """Return (stipend_id, similarity) of indexed stipends similar to a signature
+
+        Only stipends sharing at least one LSH bucket are loaded and compared.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        bucket_match = or_(*(
+            and_(StipendLSHBand.band == band, StipendLSHBand.bucket == bucket)
+            for band, bucket in band_buckets(signature)
+        ))
+        candidate_ids = select(StipendLSHBand.stipend_id).where(
+            bucket_match, StipendLSHBand.stipend_id != stipend_id
+        ).distinct()
+        rows = db.session.execute(
+            select(StipendSignature.stipend_id, StipendSignature.signature)
+            .where(StipendSignature.stipend_id.in_(candidate_ids))
+        )
+
+        matches = []
+        for candidate_id, packed in rows:
+            similarity = estimate_similarity(signature, unpack_signature(packed))
+            if similarity >= threshold:
+                matches.append((candidate_id, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def check_stipend(self, stipend_id: int, text: Optional[str] = None) -> List[Tuple[int, float]]:
+        """Index a new or changed stipend and flag its near-duplicates
+
+        Returns:
+            list: (stipend_id, similarity) of the flagged duplicates
+        """
+        signature = self.index_stipend(stipend_id, text)
+        matches = self.find_candidates(stipend_id, signature)
+        if matches:
+            flagged = {dup_id for (dup_id,) in db.session.query(DuplicateCandidate.duplicate_of_id).filter(
+                DuplicateCandidate.stipend_id == stipend_id,
+                DuplicateCandidate.duplicate_of_id.in_([m[0] for m in matches])
+            )}
+            new_rows = [{
+                'stipend_id': stipend_id,
+                'duplicate_of_id': dup_id,
+                'similarity': similarity,
+                'status': DuplicateStatus.OPEN,
+                'created_at': datetime.utcnow()
+            } for dup_id, similarity in matches if dup_id not in flagged]
+            if new_rows:
+                db.session.execute(insert(DuplicateCandidate), new_rows)
+                logger.info(f"Flagged stipend {stipend_id} as possible duplicate of "
+                            f"{[row['duplicate_of_id'] for row in new_rows]}")
+        db.session.commit()
+        return matches
+
+    def open_candidates(self, limit: int = 100) -> List[DuplicateCandidate]:
+        return DuplicateCandidate.query.filter_by(status=DuplicateStatus.OPEN).order_by(
+            DuplicateCandidate.similarity.desc()
+        ).limit(limit).all()
+
+    def dismiss(self, candidate_id: int) -> None:
+        db.session.execute(update(DuplicateCandidate).where(
+            DuplicateCandidate.id == candidate_id
+        ).values(status=DuplicateStatus.DISMISSED))
+        db.session.commit()
+
+    def merge(self, keep_id: int, duplicate_id: int, user_id: Optional[int] = None) -> Dict:
+        """Merge a duplicate stipend into the one being kept
+
+        Tag associations are moved with set-based statements, the duplicate
+        is deleted and one audit log entry records the merge. The merged
+        pair is marked merged; open pairs of the duplicate with other
+        stipends are dismissed, since one side no longer exists.
+
+        Returns:
+            dict: Number of moved tags and the merged stipend ids
+        """
+        from app.models.audit_log import AuditLog
+        from app.models.relationships import stipend_tag_association as tags
+        from app.models.stipend import Stipend
+
+        if keep_id == duplicate_id:
+            raise ValueError("Cannot merge a stipend into itself")
+        stipends = Stipend.__table__
+        found = set(db.session.execute(
+            select(stipends.c.id).where(stipends.c.id.in_([keep_id, duplicate_id]))
+        ).scalars())
+        if found != {keep_id, duplicate_id}:
+            raise ValueError(f"Stipends not found: {sorted({keep_id, duplicate_id} - found)}")
+
+        try:
+            kept_tags = select(tags.c.tag_id).where(tags.c.stipend_id == keep_id)
+            moved = db.session.execute(insert(tags).from_select(
+                ['stipend_id', 'tag_id'],
+                select(db.literal(keep_id), tags.c.tag_id).where(
+                    tags.c.stipend_id == duplicate_id,
+                    tags.c.tag_id.not_in(kept_tags)
+                ).distinct()
+            )).rowcount
+            db.session.execute(delete(tags).where(tags.c.stipend_id == duplicate_id))
+
+            merged_pair = or_(
+                and_(DuplicateCandidate.stipend_id == duplicate_id, DuplicateCandidate.duplicate_of_id == keep_id),
+                and_(DuplicateCandidate.stipend_id == keep_id, DuplicateCandidate.duplicate_of_id == duplicate_id)
+            )
+            db.session.execute(update(DuplicateCandidate).where(merged_pair).values(status=DuplicateStatus.MERGED))
+            db.session.execute(update(DuplicateCandidate).where(
+                or_(DuplicateCandidate.stipend_id == duplicate_id,
+                    DuplicateCandidate.duplicate_of_id == duplicate_id),
+                DuplicateCandidate.status == DuplicateStatus.OPEN
+            ).values(status=DuplicateStatus.DISMISSED))
+            self._remove_from_index(duplicate_id)
+            db.session.execute(delete(stipends).where(stipends.c.id == duplicate_id))
+
+            AuditLog.create(
+                user_id=user_id,
+                action='merge_stipend',
+                object_type='Stipend',
+                object_id=keep_id,
+                details=f"Merged duplicate stipend {duplicate_id} into {keep_id}",
+                details_before={'duplicate_id': duplicate_id},
+                details_after={'kept_id': keep_id, 'moved_tags': moved},
+                commit=False
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error merging stipend {duplicate_id} into {keep_id}: {str(e)}")
+            raise
+
+        logger.info(f"Merged stipend {duplicate_id} into {keep_id}, moved {moved} tags")
+        return {'kept_id': keep_id, 'merged_id': duplicate_id, 'moved_tags': moved}
+
+    def _remove_from_index(self, stipend_id: int) -> None:
+        db.session.execute(delete(StipendLSHBand).where(StipendLSHBand.stipend_id == stipend_id))
+        db.session.execute(delete(StipendSignature).where(StipendSignature.stipend_id == stipend_id))
@@ -0,0 +1,252 @@
+"""Streaming extraction of stipend details from funder pages.
+
+Pages are parsed with the event-based ``html.parser.HTMLParser`` fed in
+small chunks. Only the text of elements matching the compiled field
+selectors is buffered, and parsing stops as soon as every field has a
+specific (non bare-tag) match, so no DOM is ever built. Batches of pages fan out across a process
+pool.
+"""
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FEED_CHUNK_SIZE = 4 * 1024
+MAX_FIELD_LENGTH = 2000
+MAX_FALLBACK_TEXT = 20000
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'template'}
+VOID_TAGS = {'meta', 'img', 'input', 'br', 'hr', 'link'}
+
+_SELECTOR_RE = re.compile(
+    r'^(?P<tag>[a-zA-Z][a-zA-Z0-9]*)?'
+    r'(?P<rest>(?:[.#][\w-]+|\[[\w-]+(?:=["\']?[^\]"\']*["\']?)?\])*)$'
+)
+_SELECTOR_PART_RE = re.compile(r'([.#])([\w-]+)|\[([\w-]+)(?:=["\']?([^\]"\']*)["\']?)?\]')
+
+class Selector:
+    """A compiled simple selector: ``tag.class#id[attr=value]``.
+
+    Only single-element selectors are supported; there are no descendant
+    combinators, which keeps matching to a few set operations per tag.
+    """
+    __slots__ = ('source', 'tag', 'id', 'classes', 'attrs')
+
+    def __init__(self, source):
+        match = _SELECTOR_RE.match(source.strip())
+        if not match or not source.strip():
+            raise ValueError(f"Unsupported selector: {source}")
+        self.source = source
+        self.tag = (match.group('tag') or '').lower() or None
+        self.id = None
+        self.classes = set()
+        self.attrs = []
+        for prefix, name, attr, value in _SELECTOR_PART_RE.findall(match.group('rest')):
+            if prefix == '#':
+                self.id = name
+            elif prefix == '.':
+                self.classes.add(name)
+            else:
+                self.attrs.append((attr.lower(), value or None))
+        self.classes = frozenset(self.classes)
+        self.attrs = tuple(self.attrs)
+
+    @property
+    def is_bare_tag(self):
+        return not (self.id or self.classes or self.attrs)
+
+    def matches(self, tag, attrs):
+        if self.tag and tag != self.tag:
+            return False
+        if self.id and attrs.get('id') != self.id:
+            return False
+        if self.classes and not self.classes.issubset((attrs.get('class') or '').split()):
+            return False
+        for name, value in self.attrs:
+            if name not in attrs or (value is not None and attrs[name] != value):
+                return False
+        return True
+
+    def __repr__(self):
+        return f"<Selector {self.source}>"
+
+def compile_selectors(field_selectors: Dict[str, Iterable[str]]) -> Dict[str, Tuple[Selector, ...]]:
+    return {field: tuple(Selector(s) for s in selectors) for field, selectors in field_selectors.items()}
+
+DEFAULT_SELECTORS = compile_selectors({
+    'name': ['[itemprop=name]', '.stipend-name', '.stipend-title', '#stipend-name', 'h1'],
+    'deadline': ['[itemprop=deadline]', '.deadline', '#deadline', 'time.deadline', 'time'],
+    'amount': ['[itemprop=amount]', '.amount', '#amount', '.stipend-amount'],
+    'eligibility': ['[itemprop=eligibility]', '.eligibility', '#eligibility', '.eligibility-criteria'],
+})
+
+# Used on the page text when no selector matched a field
+FALLBACK_PATTERNS = {
+    'deadline': re.compile(
+        r'(?:deadline|apply by|closing date)\s*[:\-]?\s*'
+        r'([A-Za-z0-9,./ ]{4,40}?)(?:\.|\n|$|\s{2,})',
+        re.IGNORECASE
+    ),
+    'amount': re.compile(
+        r'((?:[$€£]|USD|EUR|GBP|NOK)\s?\d[\d,. ]*(?:\s?(?:per|/)\s?(?:year|month|semester))?)',
+        re.IGNORECASE
+    ),
+}
+
+class StipendPageParser(HTMLParser):
+    """Event-driven parser that captures the text of selected elements"""
+
+    def __init__(self, selectors=None):
+        super().__init__(convert_charrefs=True)
+        self.selectors = selectors or DEFAULT_SELECTORS
+        self.fields = {}
+        self._priority = {}
+        self._final = set()
+        self._capture = None  # [field, tag, depth, chunks, priority]
+        self._skip_depth = 0
+        self._fallback = []
+        self._fallback_len = 0
+
+    @property
+    def done(self):
+        return len(self._final) == len(self.selectors)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+            return
+        if self._capture is not None:
+            if tag == self._capture[1]:
+                self._capture[2] += 1
+            return
+
+        attr_map = dict(attrs)
+        for field, selectors in self.selectors.items():
+            if field in self._final:
+                continue
+            best = self._priority.get(field, len(selectors))
+            for priority, selector in enumerate(selectors[:best]):
+                if not selector.matches(tag, attr_map):
+                    continue
+                content = attr_map.get('content') or attr_map.get('datetime')
+                if content or tag in VOID_TAGS:
+                    self._store(field, content or '', priority)
+                else:
+                    self._capture = [field, tag, 1, [], priority]
+                    return
+                break
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if self._capture is not None and self._capture[1] == tag:
+            self._capture[2] -= 1
+            self._finish_capture()
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+            return
+        if self._capture is not None and tag == self._capture[1]:
+            self._capture[2] -= 1
+            self._finish_capture()
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._capture is not None:
+            self._capture[3].append(data)
+            if sum(len(chunk) for chunk in self._capture[3]) > MAX_FIELD_LENGTH:
+                self._capture[2] = 0
+                self._finish_capture()
+        if self._fallback_len < MAX_FALLBACK_TEXT:
+            self._fallback.append(data)
+            self._fallback_len += len(data)
+
+    def _finish_capture(self):
+        if self._capture[2] > 0:
+            return
+        field, _, _, chunks, priority = self._capture
+        self._capture = None
+        self._store(field, ''.join(chunks), priority)
+
+    def _store(self, field, text, priority):
+        text = ' '.join(text.split())[:MAX_FIELD_LENGTH]
+        if text:
+            self.fields[field] = text
+            self._priority[field] = priority
+            # Bare tag selectors are fallbacks a more specific match may still replace
+            if not self.selectors[field][priority].is_bare_tag:
+                self._final.add(field)
+
+    def fallback_text(self):
+        return ' '.join(''.join(self._fallback).split())
+
+def extract_stipend(html: str, url: Optional[str] = None, selectors=None) -> Dict:
+    """Extract stipend name, deadline, amount and eligibility from a page.
+
+    Returns:
+        dict: Extracted fields; ``deadline`` is the parsed datetime (or None)
+        and ``deadline_text`` the raw text it came from
+    """
+    parser = StipendPageParser(selectors)
+    for start in range(0, len(html), FEED_CHUNK_SIZE):
+        parser.feed(html[start:start + FEED_CHUNK_SIZE])
+        if parser.done:
+            break
+    else:
+        parser.close()
+
+    fields = parser.fields
+    text = None
+    for field, pattern in FALLBACK_PATTERNS.items():
+        if field not in fields:
+            text = text if text is not None else parser.fallback_text()
+            match = pattern.search(text)
+            if match:
+                fields[field] = match.group(1).strip()
+
+    deadline_text = fields.get('deadline')
+    return {
+        'url': url,
+        'name': fields.get('name'),
+        'deadline_text': deadline_text,
+        'deadline': _parse_deadline(deadline_text),
+        'amount': fields.get('amount'),
+        'eligibility': fields.get('eligibility')
+    }
+
+def _parse_deadline(deadline_text):
+    if not deadline_text:
+        return None
+    from app.services.stipend_service import StipendService
+    try:
+        return StipendService().parse_flexible_date(deadline_text)
+    except (OverflowError, TypeError) as e:
+        logger.debug(f"Unparseable deadline {deadline_text!r}: {e}")
+        return None
+
+def _extract_page(page):
+    url, html = page
+    try:
+        return extract_stipend(html, url)
+    except Exception as e:
+        logger.error(f"Extraction failed for {url}: {str(e)}")
+        return {'url': url, 'error': str(e)}
+
+def extract_many(pages: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                 chunksize: int = 16) -> List[Dict]:
+    """Extract many ``(url, html)`` pages, fanning out across processes.
+
+    Args:
+        pages: Iterable of (url, html) pairs
+        workers: Process count, defaults to EXTRACTION_WORKERS or the CPU count
+        chunksize: Pages handed to a worker per task
+    """
+    workers = workers or int(os.getenv('EXTRACTION_WORKERS', 0)) or os.cpu_count() or 1
+    if workers == 1:
+        return [_extract_page(page) for page in pages]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_extract_page, pages, chunksize=chunksize))
@@ -0,0 +1,209 @@
+"""Background delivery for outgoing email.
+
+Requests build a ``flask_mail.Message`` and put it on a bounded in-process
+queue; a daemon thread delivers it, so a slow or unreachable mail server
+never adds to request latency. The thread collects up to MAIL_BATCH_SIZE
+messages, waiting at most MAIL_BATCH_SECONDS for more, and sends the batch
+over one SMTP connection. A message that fails is retried with
+exponential backoff (MAIL_RETRY_BASE_SECONDS doubling up to
+MAIL_RETRY_MAX_SECONDS, with jitter) until MAIL_MAX_ATTEMPTS is reached.
+When the SMTP connection itself fails, every unsent message of the batch
+is retried. When the queue is full the caller sends inline instead of
+dropping the message. The queue is flushed on interpreter shutdown.
+"""
+import atexit
+import heapq
+import itertools
+import logging
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+from typing import List
+from flask import current_app, has_app_context
+from flask_mail import Message
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+
+class _Outgoing:
+    def __init__(self, message):
+        self.message = message
+        self.attempts = 0
+
+class MailQueue:
+    def __init__(self):
+        self.app = None
+        self.max_queue = int(os.getenv('MAIL_QUEUE_SIZE', 1000))
+        self.batch_size = int(os.getenv('MAIL_BATCH_SIZE', 50))
+        self.batch_wait = float(os.getenv('MAIL_BATCH_SECONDS', 0.5))
+        self.put_timeout = float(os.getenv('MAIL_QUEUE_PUT_TIMEOUT', 0.05))
+        self.max_attempts = int(os.getenv('MAIL_MAX_ATTEMPTS', 5))
+        self.retry_base = float(os.getenv('MAIL_RETRY_BASE_SECONDS', 5))
+        self.retry_max = float(os.getenv('MAIL_RETRY_MAX_SECONDS', 600))
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._retries = []  # Heap of (due, sequence, outgoing)
+        self._retries_lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.connections = 0
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['mail_queue'] = self
+        atexit.register(self.close)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def send(self, message: Message) -> None:
+        """Queue a message, sending it inline if the queue is full
+
+        Messages from an app the queue was not initialized with are sent
+        inline with that app's mail settings.
+        """
+        if not self._owns_context():
+            self._deliver([_Outgoing(message)])
+            return
+        self._ensure_started()
+        try:
+            self._queue.put(_Outgoing(message), timeout=self.put_timeout)
+        except queue.Full:
+            logger.warning("Mail queue full; sending message synchronously")
+            self._deliver([_Outgoing(message)])
+
+    def send_email(self, subject, recipients, body, html=None, sender=None) -> None:
+        self.send(Message(subject=subject, recipients=list(recipients), body=body, html=html, sender=sender))
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Block until every message queued so far has had a delivery attempt"""
+        if not self.running:
+            return self._queue.empty()
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Deliver the queue and stop the mail thread"""
+        if self.running:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.error(f"Mail queue did not stop within {timeout}s; "
+                             f"about {self._queue.qsize()} messages not sent")
+        if self._retries:
+            logger.warning(f"{len(self._retries)} messages awaiting retry were not sent")
+
+    def _owns_context(self):
+        return self.app is not None and has_app_context() and \
+            current_app._get_current_object() is self.app
+
+    def _ensure_started(self):
+        if self.running:
+            return
+        with self._lock:
+            if not self.running:
+                self._thread = threading.Thread(target=self._run, name='mail-queue', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                try:
+                    item = self._queue.get(timeout=self._seconds_to_next_retry())
+                except queue.Empty:
+                    item = None
+                batch, flushes, stop = self._collect(item)
+                self._deliver(self._due_retries(self.batch_size - len(batch)) + batch)
+                for request in flushes:
+                    request.done.set()
+                if stop:
+                    return
+
+    def _collect(self, item):
+        """Gather up to batch_size queued messages, waiting briefly for more to share a connection"""
+        batch, flushes = [], []
+        deadline = time.monotonic() + self.batch_wait
+        while item is not None:
+            if item is _STOP:
+                return batch, flushes, True
+            if isinstance(item, _FlushRequest):
+                flushes.append(item)
+                return batch, flushes, False
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+        return batch, flushes, False
+
+    def _seconds_to_next_retry(self) -> float:
+        with self._retries_lock:
+            if not self._retries:
+                return 1.0
+            return min(max(self._retries[0][0] - time.monotonic(), 0.01), 1.0)
+
+    def _due_retries(self, limit) -> List[_Outgoing]:
+        due = []
+        now = time.monotonic()
+        with self._retries_lock:
+            while self._retries and self._retries[0][0] <= now and len(due) < max(limit, 1):
+                due.append(heapq.heappop(self._retries)[2])
+        return due
+
+    def _retry_later(self, outgoing, error):
+        outgoing.attempts += 1
+        if outgoing.attempts >= self.max_attempts:
+            self.failed += 1
+            logger.error(f"Giving up on mail '{outgoing.message.subject}' to {outgoing.message.recipients} "
+                         f"after {outgoing.attempts} attempts: {error}")
+            return
+        delay = min(self.retry_base * 2 ** (outgoing.attempts - 1), self.retry_max) * random.uniform(0.5, 1.0)
+        self.retried += 1
+        logger.warning(f"Mail '{outgoing.message.subject}' failed ({error}); retrying in {delay:.0f}s")
+        with self._retries_lock:
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._sequence), outgoing))
+
+    def _connect(self):
+        from app.extensions import mail
+        return mail.connect()
+
+    def _deliver(self, batch: List[_Outgoing]) -> None:
+        """Send a batch over one SMTP connection"""
+        if not batch:
+            return
+        pending = list(batch)
+        try:
+            with self._connect() as connection:
+                self.connections += 1
+                while pending:
+                    outgoing = pending[0]
+                    try:
+                        connection.send(outgoing.message)
+                        self.sent += 1
+                    except smtplib.SMTPServerDisconnected:
+                        raise
+                    except Exception as e:
+                        # Refused recipients or a bad message; the connection is still usable
+                        self._retry_later(outgoing, e)
+                    pending.pop(0)
+        except Exception as e:
+            logger.error(f"SMTP connection failed ({e}); {len(pending)} messages will be retried")
+            for outgoing in pending:
+                self._retry_later(outgoing, e)
+
+mail_queue = MailQueue()
@@ -0,0 +1,274 @@
+"""Notification fan-out from committed audit entries.
+
+Audited requests only write their audit entry. This stage reads entries
+committed after the ``notification_fanout`` JobCheckpoint in id order,
+routes each one through ``FANOUT_RULES`` and bulk-inserts the resulting
+notifications in the same transaction that advances the checkpoint. Each
+entry is fanned out exactly once. The audit writer thread runs it every
+few seconds; it can also be run from a script or a scheduler.
+
+A notification for the same user, type and related object as an unread
+one created within NOTIFICATION_COALESCE_SECONDS is merged into it,
+raising its ``count``. Low-priority notifications are not sent one by
+one: a second checkpoint, ``notification_digest``, collects them into one
+digest per user every NOTIFICATION_DIGEST_SECONDS (0 sends them
+immediately).
+"""
+import logging
+import os
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, func, insert, select, update
+from app.common.batching import committed_id_bound
+from app.common.enums import NotificationPriority, NotificationType
+from app.extensions import db
+from app.models.audit_log import AuditLog
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.notification_counter import NotificationCounter
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = 'notification_fanout'
+DIGEST_CHECKPOINT_NAME = 'notification_digest'
+
+class FanoutRule:
+    """Routes matching audit entries to a notification type and audience
+
+    An entry matches when its action starts with one of ``action_prefixes``
+    (any action if empty) and its object type is in ``object_types`` (any
+    type if empty). ``audience`` is 'actor' to notify the user who acted,
+    'broadcast' for a system-wide notification, or None to skip the entry.
+    """
+
+    def __init__(self, action_prefixes=(), object_types=(), notification_type=NotificationType.AUDIT_LOG,
+                 priority=NotificationPriority.MEDIUM, audience='actor'):
+        self.action_prefixes = tuple(action_prefixes)
+        self.object_types = tuple(object_types)
+        self.notification_type = notification_type
+        self.priority = priority
+        self.audience = audience
+
+    def matches(self, action, object_type):
+        if self.action_prefixes and not action.startswith(self.action_prefixes):
+            return False
+        return not self.object_types or object_type in self.object_types
+
+# First match wins
+FANOUT_RULES = [
+    FanoutRule(object_types=('Notification',), audience=None),
+    FanoutRule(action_prefixes=('view_', 'search_', 'export_', 'login', 'logout'), audience=None),
+    FanoutRule(action_prefixes=('delete',), notification_type=NotificationType.CRUD_DELETE,
+               priority=NotificationPriority.HIGH),
+    FanoutRule(action_prefixes=('create',), notification_type=NotificationType.CRUD_CREATE),
+    FanoutRule(action_prefixes=('update',), notification_type=NotificationType.CRUD_UPDATE,
+               priority=NotificationPriority.LOW),
+    FanoutRule(object_types=('Bot',), notification_type=NotificationType.ADMIN_ACTION),
+    FanoutRule(action_prefixes=('merge_stipend',), notification_type=NotificationType.ADMIN_ACTION,
+               audience='broadcast'),
+    FanoutRule(),
+]
+
+def route(entry, rules=None) -> Optional[Dict]:
+    """Return the notification row for an audit entry, or None if no one is notified"""
+    for rule in rules or FANOUT_RULES:
+        if rule.matches(entry['action'], entry['object_type']):
+            break
+    else:
+        return None
+    if rule.audience is None or (rule.audience == 'actor' and entry['user_id'] is None):
+        return None
+    target = f" on {entry['object_type']} {entry['object_id']}" if entry['object_type'] else ''
+    # Relate the notification to the audited object, so repeats about it can be merged
+    related = (entry['object_type'], entry['object_id']) if entry['object_id'] is not None else ('AuditLog', entry['id'])
+    return {
+        'message': f"{entry['action'].replace('_', ' ').capitalize()}{target}"[:255],
+        'type': rule.notification_type,
+        'priority': rule.priority,
+        'user_id': entry['user_id'] if rule.audience == 'actor' else None,
+        'related_object_type': related[0],
+        'related_object_id': related[1],
+        'read_status': False
+    }
+
+def coalesce_key(row):
+    """Rows with the same key may be merged; broadcasts are never merged"""
+    if row['user_id'] is None:
+        return None
+    return (row['user_id'], row['type'], row['related_object_type'], row['related_object_id'])
+
+class NotificationFanoutService:
+    def __init__(self, rules=None):
+        self.rules = rules or FANOUT_RULES
+        self.chunk_size = int(os.getenv('NOTIFICATION_FANOUT_CHUNK_SIZE', 1000))
+        self.lag = int(os.getenv('NOTIFICATION_FANOUT_LAG_SECONDS', 5))
+        self.coalesce_window = timedelta(seconds=float(os.getenv('NOTIFICATION_COALESCE_SECONDS', 300)))
+        self.digest_interval = timedelta(seconds=float(os.getenv('NOTIFICATION_DIGEST_SECONDS', 3600)))
+
+    def run(self, max_chunks=None) -> int:
+        """Fan out every audit entry committed since the last run
+
+        The first run starts at the newest entry, so existing history
+        does not produce notifications.
+
+        Returns:
+            int: Number of notifications created
+        """
+        checkpoint = JobCheckpoint.get_or_create(CHECKPOINT_NAME)
+        if checkpoint.last_id is None:
+            checkpoint.advance(last_id=db.session.query(func.coalesce(func.max(AuditLog.id), 0)).scalar())
+        db.session.commit()
+        created = chunks = 0
+        while max_chunks is None or chunks < max_chunks:
+            result = self._run_chunk()
+            if result is None:
+                break
+            created += result
+            chunks += 1
+        if created:
+            logger.info(f"Fanned out {created} notifications in {chunks} chunks")
+        return created
+
+    def _lock_range(self, name):
+        """Lock a checkpoint and return the committed audit id range after it, or None"""
+        audit = AuditLog.__table__
+        # Lock the checkpoint so overlapping runs cannot fan out a range twice
+        checkpoint = db.session.query(JobCheckpoint).filter_by(name=name).with_for_update().one()
+        upper = committed_id_bound(db.session, audit.c.id, audit.c.timestamp, checkpoint.last_id,
+                                   self.chunk_size, self.lag)
+        return checkpoint, checkpoint.last_id, upper
+
+    def _entries(self, start, upper):
+        audit = AuditLog.__table__
+        return db.session.execute(
+            select(audit.c.id, audit.c.user_id, audit.c.action, audit.c.object_type, audit.c.object_id)
+            .where(audit.c.id > start, audit.c.id <= upper, audit.c.notify.is_(True))
+        ).mappings().all()
+
+    def _run_chunk(self) -> Optional[int]:
+        checkpoint, start, upper = self._lock_range(CHECKPOINT_NAME)
+        if upper is None:
+            db.session.rollback()
+            return None
+        notifications = self.build_notifications(self._entries(start, upper))
+        if self.digest_interval:
+            notifications = [row for row in notifications if row['priority'] != NotificationPriority.LOW]
+        created = self.store(notifications)
+        checkpoint.advance(last_id=upper)
+        db.session.commit()
+        return created
+
+    def build_notifications(self, entries) -> List[Dict]:
+        return [row for row in (route(entry, self.rules) for entry in entries) if row is not None]
+
+    def store(self, notifications, now=None) -> int:
+        """Insert notification rows, merging repeats into recent unread ones
+
+        Runs in the caller's transaction.
+
+        Returns:
+            int: Number of rows inserted
+        """
+        from app.models.notification import Notification
+        now = now or datetime.utcnow()
+        new_rows, merged = [], {}
+        for row in notifications:
+            key = coalesce_key(row)
+            if key is None:
+                new_rows.append(dict(row, created_at=now, last_seen_at=now))
+            elif key in merged:
+                merged[key]['count'] += row.get('count', 1)
+            else:
+                merged[key] = dict(row, count=row.get('count', 1), created_at=now, last_seen_at=now)
+
+        open_ids = self._open_notifications(merged, now - self.coalesce_window)
+        increments = [{'target_id': open_ids[key], 'extra': row['count'], 'seen': now}
+                      for key, row in merged.items() if key in open_ids]
+        if increments:
+            table = Notification.__table__
+            db.session.execute(update(table).where(table.c.id == bindparam('target_id')).values(
+                count=table.c.count + bindparam('extra'), last_seen_at=bindparam('seen')
+            ), increments)
+        new_rows += [row for key, row in merged.items() if key not in open_ids]
+        if new_rows:
+            db.session.execute(insert(Notification.__table__), new_rows)
+            NotificationCounter.apply(db.session.connection(), Counter(row['user_id'] for row in new_rows))
+        return len(new_rows)
+
+    def _open_notifications(self, keyed_rows, since) -> Dict:
+        """Newest unread notification id per coalescing key, created since ``since``"""
+        from app.models.notification import Notification
+        if not keyed_rows:
+            return {}
+        table = Notification.__table__
+        rows = db.session.execute(
+            select(table.c.id, table.c.user_id, table.c.type, table.c.related_object_type, table.c.related_object_id)
+            .where(table.c.user_id.in_({key[0] for key in keyed_rows}),
+                   table.c.read_status.is_(False),
+                   table.c.created_at >= since)
+            .order_by(table.c.id)
+        ).all()
+        open_ids = {}
+        for row in rows:
+            key = (row.user_id, row.type, row.related_object_type, row.related_object_id)
+            if key in keyed_rows:
+                open_ids[key] = row.id
+        return open_ids
+
+    def run_digest(self, now=None) -> int:
+        """Send each user one digest of their low-priority notifications
+
+        Does nothing until NOTIFICATION_DIGEST_SECONDS have passed since
+        the previous digest.
+
+        Returns:
+            int: Number of digest notifications created
+        """
+        now = now or datetime.utcnow()
+        if not self.digest_interval:
+            return 0
+        checkpoint = JobCheckpoint.get_or_create(DIGEST_CHECKPOINT_NAME)
+        if checkpoint.last_id is None:
+            checkpoint.advance(last_id=db.session.query(func.coalesce(func.max(AuditLog.id), 0)).scalar())
+            db.session.commit()
+            return 0
+        due = checkpoint.updated_at is None or checkpoint.updated_at <= now - self.digest_interval
+        db.session.commit()
+        if not due:
+            return 0
+
+        actions = defaultdict(Counter)
+        checkpoint, start, upper = self._lock_range(DIGEST_CHECKPOINT_NAME)
+        last = start
+        while upper is not None:
+            for entry in self._entries(last, upper):
+                row = route(entry, self.rules)
+                if row is not None and row['priority'] == NotificationPriority.LOW:
+                    actions[row['user_id']][entry['action']] += 1
+            last = upper
+            upper = committed_id_bound(db.session, AuditLog.__table__.c.id, AuditLog.__table__.c.timestamp,
+                                       last, self.chunk_size, self.lag)
+        created = self.store([self.build_digest(user_id, counts, since=checkpoint.updated_at)
+                              for user_id, counts in actions.items()], now=now)
+        checkpoint.advance(last_id=last)
+        db.session.commit()
+        if created:
+            logger.info(f"Sent {created} notification digests")
+        return created
+
+    def build_digest(self, user_id, counts: Counter, since=None) -> Dict:
+        total = sum(counts.values())
+        summary = ', '.join(f"{count} x {action.replace('_', ' ')}" for action, count in counts.most_common(3))
+        if len(counts) > 3:
+            summary += ', ...'
+        period = f" since {since:%Y-%m-%d %H:%M}" if since else ''
+        return {
+            'message': f"{total} low-priority updates{period}: {summary}"[:255],
+            'type': NotificationType.DIGEST,
+            'priority': NotificationPriority.LOW,
+            'user_id': user_id,
+            'related_object_type': None,
+            'related_object_id': None,
+            'read_status': False,
+            'count': total
+        }
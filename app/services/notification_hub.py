@@ -0,0 +1,204 @@
+"""In-process pub/sub for live notifications over Server-Sent Events.
+
+Each worker process runs one poller thread, and only while someone is
+connected. It tails the ``notification`` table by id and publishes new
+rows into a ring buffer. Open streams wait on the hub and pick out their
+user's notifications and broadcasts, so an idle tab costs no queries:
+the worker makes one cheap query every NOTIFICATION_SSE_POLL_SECONDS
+however many tabs are open. After a fan-out commits, the audit writer
+wakes the poller so local notifications go out at once. Rows created in
+the last NOTIFICATION_SSE_LAG_SECONDS are held back, as in the watermark
+jobs, so a row that took a lower id but commits late is not skipped.
+
+The SSE event id is the notification id. A client reconnecting with
+``Last-Event-ID`` is replayed from the ring buffer, or from the table
+when it has been away longer than the buffer reaches. Streams send a
+comment every NOTIFICATION_SSE_HEARTBEAT_SECONDS so proxies keep them
+open. Each stream holds a worker thread or greenlet for its lifetime, so
+serve it from a threaded or async-capable worker (gevent, eventlet).
+NOTIFICATION_SSE_MAX_CONNECTIONS caps the streams per worker.
+"""
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List
+from sqlalchemy import func, or_, select
+
+logger = logging.getLogger(__name__)
+
+def format_event(event: Dict) -> str:
+    return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
+
+def _as_event(row) -> Dict:
+    return {
+        'id': row.id,
+        'user_id': row.user_id,
+        'message': row.message,
+        'type': row.type.value if hasattr(row.type, 'value') else row.type,
+        'priority': row.priority.value if hasattr(row.priority, 'value') else row.priority,
+        'count': row.count,
+        'created_at': row.created_at.isoformat() if row.created_at else None
+    }
+
+class NotificationHub:
+    def __init__(self):
+        self.app = None
+        self.buffer_size = int(os.getenv('NOTIFICATION_SSE_BUFFER', 1000))
+        self.max_connections = int(os.getenv('NOTIFICATION_SSE_MAX_CONNECTIONS', 100))
+        self.heartbeat = float(os.getenv('NOTIFICATION_SSE_HEARTBEAT_SECONDS', 15))
+        self.poll_interval = float(os.getenv('NOTIFICATION_SSE_POLL_SECONDS', 2))
+        self.lag = float(os.getenv('NOTIFICATION_SSE_LAG_SECONDS', 1))
+        self._events = deque(maxlen=self.buffer_size)
+        self._condition = threading.Condition()
+        self._wake = threading.Event()
+        self._thread = None
+        self.last_id = None  # Newest notification id seen by this worker
+        self._start_id = None  # Newest id when the poller started; the buffer is complete after it
+        self.connections = 0
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['notification_hub'] = self
+
+    def connect(self) -> bool:
+        """Reserve a stream slot, False when the worker is at its cap"""
+        with self._condition:
+            if self.connections >= self.max_connections:
+                return False
+            self.connections += 1
+        self._ensure_started()
+        return True
+
+    def disconnect(self) -> None:
+        with self._condition:
+            self.connections = max(self.connections - 1, 0)
+
+    def wake(self) -> None:
+        """Poll now instead of at the next interval"""
+        self._wake.set()
+
+    def publish(self, events: List[Dict]) -> None:
+        """Append events in id order and wake every waiting stream"""
+        if not events:
+            return
+        with self._condition:
+            self._events.extend(events)
+            self.last_id = max(self.last_id or 0, events[-1]['id'])
+            self._condition.notify_all()
+
+    def events_after(self, user_id, last_id):
+        """Buffered events for a user newer than ``last_id``, and the hub position
+
+        The events are None when some after ``last_id`` may not be in the
+        buffer, because they were evicted or published before this worker
+        started listening.
+        """
+        with self._condition:
+            floor = self._start_id
+            if len(self._events) == self.buffer_size:
+                floor = self._events[0]['id'] - 1
+            if floor is None or last_id < floor:
+                return None, self.last_id
+            return [event for event in self._events
+                    if event['id'] > last_id and event['user_id'] in (user_id, None)], self.last_id
+
+    def stream(self, user_id, last_event_id=None) -> Iterator[str]:
+        """Yield SSE text for one user until the client goes away
+
+        Call ``connect`` first and ``disconnect`` when the response closes.
+        """
+        yield f"retry: {int(self.poll_interval * 1000) + 1000}\n\n"
+        last_id = last_event_id
+        if last_id is None:
+            last_id = self.last_id if self.last_id is not None else self._newest_id()
+        while True:
+            events, position = self.events_after(user_id, last_id)
+            if events is None:
+                events = self._load_after(user_id, last_id)
+                caught_up = len(events) < self.buffer_size
+            else:
+                caught_up = True
+            for event in events:
+                yield format_event(event)
+                last_id = event['id']
+            if caught_up and position is not None:
+                last_id = max(last_id, position)
+            with self._condition:
+                has_news = self._condition.wait_for(lambda: (self.last_id or 0) > last_id, timeout=self.heartbeat)
+            if not has_news:
+                yield ": keep-alive\n\n"
+
+    def _newest_id(self) -> int:
+        from app.extensions import db
+        with db.engine.connect() as connection:
+            return self._committed_id(connection)
+
+    def _committed_id(self, connection) -> int:
+        """Newest id that is safe to publish: rows younger than ``lag`` and after them wait"""
+        from app.models.notification import Notification
+        table = Notification.__table__
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.lag)
+        too_recent = connection.execute(select(func.min(table.c.id)).where(table.c.created_at >= cutoff)).scalar()
+        if too_recent is not None:
+            return too_recent - 1
+        return connection.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar()
+
+    def _select_after(self, last_id, upper, limit, user_id=None):
+        from app.models.notification import Notification
+        table = Notification.__table__
+        query = select(table.c.id, table.c.user_id, table.c.message, table.c.type, table.c.priority,
+                       table.c.count, table.c.created_at).where(table.c.id > last_id, table.c.id <= upper)
+        if user_id is not None:
+            query = query.where(or_(table.c.user_id == user_id, table.c.user_id.is_(None)))
+        return query.order_by(table.c.id).limit(limit)
+
+    def _load_after(self, user_id, last_id) -> List[Dict]:
+        """Catch up a client that has been away longer than the buffer reaches"""
+        from app.extensions import db
+        with db.engine.connect() as connection:
+            upper = self._committed_id(connection)
+            rows = connection.execute(self._select_after(last_id, upper, self.buffer_size, user_id)).all()
+        return [_as_event(row) for row in rows]
+
+    def poll(self) -> int:
+        """Publish notifications committed since the last poll"""
+        from app.extensions import db
+        if self.last_id is None:
+            with self._condition:
+                self.last_id = self._start_id = self._newest_id()
+            return 0
+        with db.engine.connect() as connection:
+            upper = self._committed_id(connection)
+            if upper <= self.last_id:
+                return 0
+            rows = connection.execute(self._select_after(self.last_id, upper, self.buffer_size)).all()
+        self.publish([_as_event(row) for row in rows])
+        return len(rows)
+
+    def _ensure_started(self):
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='notification-hub', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                with self._condition:
+                    if not self.connections:
+                        # Later streams start from the newest row; the buffer would have a gap
+                        self._thread = None
+                        self._events.clear()
+                        self.last_id = self._start_id = None
+                        return
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f"Notification poll failed: {e}")
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+notification_hub = NotificationHub()
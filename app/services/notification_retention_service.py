@@ -0,0 +1,137 @@
+"""Retention policies and batched pruning for notifications.
+
+Each notification is kept for the ``read_days`` or ``unread_days`` of the
+first policy in ``RETENTION_POLICIES`` that matches its type and priority.
+Pruning walks the table in primary key order, NOTIFICATION_PRUNE_CHUNK_SIZE
+rows at a time, and deletes the expired rows of each chunk in its own
+short transaction, so no lock is held for long. Unread counters and
+broadcast read state are corrected in the same transaction as each
+delete. The walk stops at the first chunk too new for any policy.
+
+The position of the walk is kept in a JobCheckpoint, so a run cut short by
+``max_chunks`` is resumed by the next one. A finished walk resets it: rows
+kept on this pass may have expired by the next, and deleted rows cost
+nothing to walk past.
+"""
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import delete, select
+from app.common.enums import NotificationPriority, NotificationType
+from app.extensions import db
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.notification_counter import NotificationCounter
+from app.models.notification_read import NotificationReadState
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = 'notification_prune'
+
+class RetentionPolicy:
+    """How long matching notifications are kept once read, and while unread
+
+    A policy matches when the notification's type is in ``types`` (any
+    type if empty) and its priority is in ``priorities`` (any priority if
+    empty). None keeps matching notifications forever.
+    """
+
+    def __init__(self, types=(), priorities=(), read_days=None, unread_days=None):
+        self.types = tuple(types)
+        self.priorities = tuple(priorities)
+        self.read_days = read_days
+        self.unread_days = unread_days
+
+    def matches(self, type, priority):
+        if self.types and type not in self.types:
+            return False
+        return not self.priorities or priority in self.priorities
+
+    def keep_days(self, read_status, user_id=None) -> Optional[int]:
+        # Broadcasts have no shared read flag, so they age as unread
+        return self.read_days if read_status and user_id is not None else self.unread_days
+
+# First match wins
+RETENTION_POLICIES = [
+    RetentionPolicy(priorities=(NotificationPriority.CRITICAL,), read_days=365, unread_days=None),
+    RetentionPolicy(types=(NotificationType.DIGEST,), read_days=7, unread_days=30),
+    RetentionPolicy(priorities=(NotificationPriority.LOW,), read_days=7, unread_days=30),
+    RetentionPolicy(priorities=(NotificationPriority.HIGH,), read_days=90, unread_days=365),
+    RetentionPolicy(
+        read_days=int(os.getenv('NOTIFICATION_RETENTION_READ_DAYS', 30)),
+        unread_days=int(os.getenv('NOTIFICATION_RETENTION_UNREAD_DAYS', 180))
+    ),
+]
+
+class NotificationRetentionService:
+    def __init__(self, policies=None):
+        self.policies = policies or RETENTION_POLICIES
+        self.chunk_size = int(os.getenv('NOTIFICATION_PRUNE_CHUNK_SIZE', 1000))
+
+    def policy_for(self, type, priority) -> Optional[RetentionPolicy]:
+        for policy in self.policies:
+            if policy.matches(type, priority):
+                return policy
+        return None
+
+    def is_expired(self, row, now) -> bool:
+        policy = self.policy_for(row.type, row.priority or NotificationPriority.MEDIUM)
+        days = policy.keep_days(row.read_status, row.user_id) if policy else None
+        return days is not None and row.created_at is not None and row.created_at < now - timedelta(days=days)
+
+    def prune(self, now=None, max_chunks=None) -> Dict:
+        """Delete every expired notification, one keyset chunk at a time
+
+        Returns:
+            Dict: Rows scanned and deleted
+        """
+        from app.models.notification import Notification
+        now = now or datetime.utcnow()
+        table = Notification.__table__
+        shortest = min((days for policy in self.policies
+                        for days in (policy.read_days, policy.unread_days) if days is not None), default=None)
+        report = {'scanned': 0, 'deleted': 0}
+        if shortest is None:
+            return report
+        newest_expirable = now - timedelta(days=shortest)
+
+        checkpoint = JobCheckpoint.get_or_create(CHECKPOINT_NAME)
+        last_id = checkpoint.last_id or 0
+        db.session.commit()
+        chunks = 0
+        while max_chunks is None or chunks < max_chunks:
+            rows = db.session.execute(
+                select(table.c.id, table.c.user_id, table.c.type, table.c.priority,
+                       table.c.read_status, table.c.created_at)
+                .where(table.c.id > last_id).order_by(table.c.id).limit(self.chunk_size)
+            ).all()
+            if not rows or (rows[0].created_at and rows[0].created_at >= newest_expirable):
+                checkpoint.reset()
+                db.session.commit()
+                break
+            last_id = rows[-1].id
+            chunks += 1
+            report['scanned'] += len(rows)
+            expired = [row for row in rows if self.is_expired(row, now)]
+            if expired:
+                report['deleted'] += self._delete(expired)
+            checkpoint.advance(last_id=last_id)
+            db.session.commit()
+
+        if report['deleted']:
+            logger.info(f"Pruned {report['deleted']} of {report['scanned']} notifications scanned")
+        return report
+
+    def _delete(self, expired) -> int:
+        from app.models.notification import Notification
+        table = Notification.__table__
+        connection = db.session.connection()
+        NotificationReadState.forget_broadcasts(connection, [row.id for row in expired if row.user_id is None])
+        deleted = connection.execute(
+            delete(table).where(table.c.id.in_([row.id for row in expired]))
+            .returning(table.c.user_id, table.c.read_status)
+        ).all()
+        unread = Counter(user_id for user_id, read_status in deleted if user_id is None or not read_status)
+        NotificationCounter.apply(connection, {user_id: -count for user_id, count in unread.items()})
+        return len(deleted)
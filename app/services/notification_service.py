@@ -1,7 +1,11 @@
 import logging
 from app import db
+from datetime import datetime
+from sqlalchemy import delete, exists, func, insert, literal, select, update
 from app.models.notification import Notification
-from app.constants import NotificationType, NotificationPriority
+from app.models.notification_counter import BROADCAST_KEY, NotificationCounter
+from app.models.notification_read import NotificationReadMark, NotificationReadState
+from app.common.enums import NotificationType, NotificationPriority
 
 logger = logging.getLogger(__name__)
 
@@ -30,19 +34,27 @@ def create_notification(type: NotificationType, message: str, user_id=None, rela
         logger.error(f"Error creating notification: {str(e)}")
         raise
 
-def mark_notification_read(notification_id):
-    """Mark a notification as read"""
-    notification = Notification.query.get(notification_id)
+def mark_notification_read(notification_id, user_id=None):
+    """Mark a notification as read
+
+    System-wide notifications are marked read for ``user_id`` only.
+    """
+    notification = db.session.get(Notification, notification_id)
     if not notification:
         raise ValueError("Notification not found")
-    
-    notification.read_status = True
+
+    if notification.user_id is None:
+        if not user_id:
+            raise ValueError("User ID is required to mark a system-wide notification read")
+        _mark_broadcasts_read(user_id, ids=[notification_id])
+    else:
+        notification.read_status = True
     db.session.commit()
     return notification
 
 def delete_notification(notification_id):
     """Delete a notification"""
-    notification = Notification.query.get(notification_id)
+    notification = db.session.get(Notification, notification_id)
     if not notification:
         raise ValueError("Notification not found")
     
@@ -50,28 +62,160 @@ def delete_notification(notification_id):
     db.session.commit()
     return True
 
+def _owned_filter(user_id, ids=None, type=None, before=None):
+    """WHERE clause for a user's own notifications, narrowed by id list, type or age"""
+    if not user_id:
+        raise ValueError("User ID is required")
+    conditions = [Notification.user_id == user_id]
+    if ids is not None:
+        conditions.append(Notification.id.in_(ids))
+    if type is not None:
+        conditions.append(Notification.type == type)
+    if before is not None:
+        conditions.append(Notification.created_at < before)
+    return conditions
+
+def _broadcast_cursor(user_id):
+    return db.session.query(NotificationReadState.broadcast_cursor).filter_by(user_id=user_id).scalar() or 0
+
+def _mark_broadcasts_read(user_id, ids=None, type=None):
+    """Record broadcasts as read by one user without touching the shared rows"""
+    connection = db.session.connection()
+    cursor = _broadcast_cursor(user_id)
+    unread = [Notification.user_id.is_(None), Notification.id > cursor]
+
+    if ids is None and type is None:
+        # Move the cursor past every broadcast; marks behind it are redundant
+        latest = db.session.query(func.max(Notification.id)).filter(*unread).scalar()
+        if latest is None:
+            return 0
+        newly_read = db.session.query(func.count(Notification.id)).filter(*unread).scalar() - \
+            db.session.query(func.count()).filter(
+                NotificationReadMark.user_id == user_id, NotificationReadMark.notification_id > cursor
+            ).scalar()
+        NotificationReadState.apply(connection, user_id, newly_read, cursor=latest)
+        connection.execute(delete(NotificationReadMark).where(NotificationReadMark.user_id == user_id))
+        return newly_read
+
+    if ids is not None:
+        unread.append(Notification.id.in_(ids))
+    if type is not None:
+        unread.append(Notification.type == type)
+    already_read = exists().where(
+        NotificationReadMark.user_id == user_id, NotificationReadMark.notification_id == Notification.id
+    )
+    result = connection.execute(insert(NotificationReadMark).from_select(
+        ['notification_id', 'user_id', 'read_at'],
+        select(Notification.id, literal(user_id), literal(datetime.utcnow())).where(*unread, ~already_read)
+    ))
+    if result.rowcount:
+        NotificationReadState.apply(connection, user_id, result.rowcount)
+    return result.rowcount
+
+def mark_notifications_read(user_id, ids=None, type=None):
+    """Mark a user's unread notifications read in one UPDATE
+
+    With no ``ids`` or ``type`` every notification of the user is marked.
+    Matching system-wide notifications are marked read for this user
+    through ``NotificationReadState``.
+
+    Returns:
+        int: Number of notifications marked read
+    """
+    conditions = _owned_filter(user_id, ids=ids, type=type)
+    try:
+        result = db.session.execute(
+            update(Notification).where(*conditions, Notification.read_status == False).values(read_status=True)
+        )
+        NotificationCounter.apply(db.session.connection(), {user_id: -result.rowcount})
+        count = result.rowcount + _mark_broadcasts_read(user_id, ids=ids, type=type)
+        db.session.commit()
+        return count
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error marking notifications read for user {user_id}: {str(e)}")
+        raise
+
+def delete_notifications(user_id, ids=None, type=None, before=None):
+    """Delete a user's notifications in one DELETE
+
+    Matches by id list, type and creation time before ``before``; with no
+    filter every notification of the user is deleted. The read status of
+    each deleted row comes back with RETURNING, so the unread counter is
+    corrected in the same transaction.
+
+    Returns:
+        int: Number of notifications deleted
+    """
+    conditions = _owned_filter(user_id, ids=ids, type=type, before=before)
+    try:
+        read_statuses = db.session.execute(
+            delete(Notification).where(*conditions).returning(Notification.read_status)
+        ).scalars().all()
+        NotificationCounter.apply(db.session.connection(), {user_id: -sum(not read for read in read_statuses)})
+        db.session.commit()
+        return len(read_statuses)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error deleting notifications for user {user_id}: {str(e)}")
+        raise
+
 def get_notification_count(user_id):
-    """Get count of unread notifications for a user"""
+    """Get count of unread notifications for a user
+
+    Reads the user's counter, the system-wide counter and the user's
+    broadcast read state, three primary key lookups however many
+    notifications exist.
+    """
     try:
         if not user_id:
             raise ValueError("User ID is required")
-            
-        count = db.session.query(Notification).filter(
-            (Notification.user_id == user_id) |
-            (Notification.user_id.is_(None)),  # Include system-wide notifications
-            Notification.read_status == False
-        ).count()
-        
+
+        counters = dict(db.session.query(NotificationCounter.user_id, NotificationCounter.unread).filter(
+            NotificationCounter.user_id.in_([user_id, BROADCAST_KEY])  # Include system-wide notifications
+        ).all())
+        broadcasts_read = db.session.query(NotificationReadState.broadcast_read).filter_by(
+            user_id=user_id
+        ).scalar() or 0
+        count = counters.get(user_id, 0) + max(counters.get(BROADCAST_KEY, 0) - broadcasts_read, 0)
+
         # Log if count is high
         if count > 10:
             logger.warning(f"High notification count ({count}) for user {user_id}")
-            
+
         return count
     except Exception as e:
         logger.error(f"Error getting notification count for user {user_id}: {str(e)}")
         return 0  # Return 0 to prevent template rendering issues
-    finally:
-        db.session.close()
+
+def get_unread_notifications(user_id, limit=50):
+    """Newest unread notifications for a user, system-wide ones included"""
+    if not user_id:
+        raise ValueError("User ID is required")
+    own = db.session.query(Notification).filter(
+        Notification.user_id == user_id, Notification.read_status == False
+    ).order_by(Notification.id.desc()).limit(limit).all()
+    broadcasts = db.session.query(Notification).filter(
+        Notification.user_id.is_(None),
+        Notification.id > _broadcast_cursor(user_id),
+        ~exists().where(NotificationReadMark.user_id == user_id,
+                        NotificationReadMark.notification_id == Notification.id)
+    ).order_by(Notification.id.desc()).limit(limit).all()
+    return sorted(own + broadcasts, key=lambda n: n.id, reverse=True)[:limit]
+
+def rebuild_unread_counters():
+    """Recount every unread counter and broadcast read count from the tables
+
+    Use after bulk changes made outside the application.
+    """
+    counts = db.session.query(Notification.user_id, func.count()).filter(
+        (Notification.read_status == False) | Notification.user_id.is_(None)
+    ).group_by(Notification.user_id).all()
+    db.session.query(NotificationCounter).delete(synchronize_session=False)
+    NotificationCounter.apply(db.session.connection(), dict(counts))
+    NotificationReadState.recount(db.session.connection())
+    db.session.commit()
+    return len(counts)
 
 def get_notification_by_id(notification_id):
     """Get a notification by its ID"""
@@ -1,7 +1,7 @@
 from app.models.stipend import Stipend
 from app.models.organization import Organization
 from app.models.tag import Tag
-from app.models import db
+from app.extensions import db
 from datetime import datetime
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
@@ -9,6 +9,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Fields the duplicate-detection signature is computed from
+DEDUP_FIELDS = ('name', 'description', 'organization_id')
+
 class StipendService:
     def __init__(self):
         self.metrics = {
@@ -41,6 +44,7 @@ class StipendService:
             db.session.add(stipend)
             db.session.commit()
             logger.info(f"Stipend created successfully: {stipend.id}")
+            self._check_duplicates(stipend.id)
             return stipend
         except Exception as e:
             db.session.rollback()
@@ -55,19 +59,30 @@ class StipendService:
             # Handle tags separately
             if 'tags' in data:
                 tags = data.pop('tags')
-                stipend.tags = [Tag.query.get(tag_id) for tag_id in tags]
+                stipend.tags = [db.session.get(Tag, tag_id) for tag_id in tags]
             
             # Update other fields
             stipend.update(data, user_id)
             db.session.commit()
+            if any(field in data for field in DEDUP_FIELDS):
+                self._check_duplicates(stipend.id)
             return stipend
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error updating stipend {id}: {str(e)}")
             raise
 
+    def _check_duplicates(self, stipend_id):
+        """Re-index a new or edited stipend and flag its near-duplicates; never fails the save"""
+        from app.services.dedup_service import DedupService
+        try:
+            DedupService().check_stipend(stipend_id)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Duplicate check failed for stipend {stipend_id}: {str(e)}")
+
     def get(self, id):
-        return Stipend.query.get(id)
+        return db.session.get(Stipend, id)
 
     def delete(self, id, user_id=None):
         """Delete a stipend with audit logging"""
@@ -22,7 +22,6 @@ from werkzeug.security import generate_password_hash
 from croniter import croniter
 
 from app.models.audit_log import AuditLog
-from app.models.notification import Notification
 from app.models.user import User
 from app.extensions import db
 from app.constants import FlashMessages, FlashCategory
@@ -73,8 +72,11 @@ def validate_password_strength(password: str) -> bool:
     return True
 
 def get_unread_notification_count() -> int:
-    """Get count of unread notifications."""
-    return Notification.query.filter_by(read_status=False).count()
+    """Get count of unread notifications for the current user."""
+    from app.services.notification_service import get_notification_count
+    if not current_user.is_authenticated:
+        return 0
+    return get_notification_count(current_user.id)
 
 def generate_temp_password(length: int = 12) -> str:
     """Generate a temporary password."""
@@ -155,8 +157,11 @@ def validate_password_strength(password: str) -> bool:
     return True
 
 def get_unread_notification_count() -> int:
-    """Get count of unread notifications."""
-    return Notification.query.filter_by(read_status=False).count()
+    """Get count of unread notifications for the current user."""
+    from app.services.notification_service import get_notification_count
+    if not current_user.is_authenticated:
+        return 0
+    return get_notification_count(current_user.id)
 
 def generate_temp_password(length: int = 12) -> str:
     """Generate a temporary password."""
@@ -0,0 +1,118 @@
+import logging
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+class BotCancelled(Exception):
+    """Raised inside a bot run when cancellation was requested"""
+    pass
+
+class BotContext:
+    """Runtime state shared between the service running a bot and the bot.
+
+    The context carries progress counters and a cancellation flag. Bots call
+    ``report_progress`` after each batch and ``check_cancelled`` between
+    batches, which gives the caller cooperative control over long runs.
+    """
+
+    def __init__(self, bot=None, chunk_size=500, progress_callback=None):
+        self.bot = bot
+        self.chunk_size = chunk_size
+        self.processed = 0
+        self.total = None
+        self.started_at = time.monotonic()
+        self.stage_seconds = defaultdict(float)
+        self.stage_calls = defaultdict(int)
+        self._progress_callback = progress_callback
+        self._cancel_event = threading.Event()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a named stage of the run, e.g. ``load``, ``fetch`` or ``process``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] += time.perf_counter() - start
+            self.stage_calls[name] += 1
+
+    def report_progress(self, processed=0, total=None):
+        """Record processed rows and optionally the expected total"""
+        self.processed += processed
+        if total is not None:
+            self.total = total
+        if self._progress_callback:
+            self._progress_callback(self)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def eta_seconds(self):
+        """Estimated seconds remaining, or None when the total is unknown"""
+        if not self.total or not self.processed:
+            return None
+        rate = self.processed / max(self.elapsed, 1e-6)
+        return max(self.total - self.processed, 0) / rate
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise BotCancelled(f"{getattr(self.bot, 'name', 'Bot')} run was cancelled")
+
+class BaseBot(ABC):
+    """Common interface for bots run through the bot registry.
+
+    Subclasses must provide ``iter_batches`` (the work source) and
+    ``process_batch`` (the work); a bot missing either cannot be
+    instantiated. ``run`` drives the two, reporting progress
+    and honouring cancellation between batches.
+    """
+    name = None
+    description = ''
+    # Tables the fixture harness records as this bot's inputs
+    fixture_tables = ('stipends',)
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @abstractmethod
+    def iter_batches(self, ctx):
+        """Yield lists of items to process"""
+
+    @abstractmethod
+    def process_batch(self, batch, ctx):
+        """Process one batch of items"""
+
+    def run(self, batch_iter=None, ctx=None):
+        """Process every batch from ``batch_iter``.
+
+        Args:
+            batch_iter: Iterable of batches, defaults to ``iter_batches(ctx)``
+            ctx (BotContext): Run context, a fresh one is created if omitted
+
+        Returns:
+            BotContext: The context with final progress counters
+        """
+        ctx = ctx or BotContext()
+        if batch_iter is None:
+            batch_iter = self.iter_batches(ctx)
+        batch_iter = iter(batch_iter)
+        while True:
+            with ctx.stage('load'):
+                batch = next(batch_iter, None)
+            if batch is None:
+                return ctx
+            ctx.check_cancelled()
+            with ctx.stage('process'):
+                self.process_batch(batch, ctx)
+            ctx.report_progress(len(batch))
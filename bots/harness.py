@@ -0,0 +1,341 @@
+"""Record and replay bot runs for offline benchmarking.
+
+A fixture bundle is a directory holding:
+
+* ``manifest.json`` - the bot name, recorded tables and page index
+* ``tables/<table>.jsonl.gz`` - the rows of every table the bot reads
+* ``pages/<sha256>.html.gz`` - every page the bot fetched
+
+``record`` dumps the bot's input tables from the configured database and
+runs the bot in dry-run mode with a fetcher that saves each page.
+``replay`` loads the tables into the configured database, which should be
+an empty scratch database (in-memory SQLite by default), and runs the bot against the saved pages, so no network access is needed.
+Both run inside a transaction that is rolled back at the end: bot commits
+only release savepoints, audit entries are written into the same
+transaction, and nothing is persisted. Replay creates every model table in
+the scratch database, so bots find the tables they write to.
+
+Usage:
+    python -m bots.harness record UpdateBot fixtures/update --database-uri postgresql://...
+    python -m bots.harness replay fixtures/update [--repeat 3]
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from sqlalchemy import MetaData, insert, select
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.services.audit_writer import audit_writer
+from bots.base import BotContext
+from bots.registry import create_bot
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+class FixtureMiss(Exception):
+    """Raised when a replayed bot requests a page that was not recorded"""
+    pass
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'$d': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'$b64': base64.b64encode(value).decode('ascii')}
+    return value
+
+def _decode(value):
+    if isinstance(value, dict) and len(value) == 1:
+        if '$dt' in value:
+            return datetime.fromisoformat(value['$dt'])
+        if '$d' in value:
+            return date.fromisoformat(value['$d'])
+        if '$b64' in value:
+            return base64.b64decode(value['$b64'])
+    return value
+
+def _find_table(name):
+    """Look a table up in both model registries"""
+    from app.models.base_model import Base
+    for metadata in (db.metadata, Base.metadata):
+        if name in metadata.tables:
+            return metadata.tables[name]
+    raise ValueError(f"Unknown table: {name}")
+
+def _all_tables():
+    """Both model registries as one MetaData, so foreign keys between them resolve"""
+    from app.models.base_model import Base
+    metadata = MetaData()
+    for registry in (Base.metadata, db.metadata):
+        for table in registry.tables.values():
+            table.to_metadata(metadata)
+    return metadata
+
+class FixtureBundle:
+    """A directory of recorded tables and pages for one bot"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.manifest_path = self.path / 'manifest.json'
+        if self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text())
+        else:
+            self.manifest = {'format_version': FORMAT_VERSION, 'bot': None, 'tables': {}, 'pages': {}}
+
+    @property
+    def bot_name(self):
+        return self.manifest['bot']
+
+    def save_manifest(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps(self.manifest, indent=2, sort_keys=True))
+
+    def dump_table(self, table, chunk_size=1000):
+        """Write every row of ``table`` to the bundle, streaming from the database"""
+        target = self.path / 'tables' / f'{table.name}.jsonl.gz'
+        target.parent.mkdir(parents=True, exist_ok=True)
+        count = 0
+        result = db.session.execute(select(table).execution_options(yield_per=chunk_size))
+        with gzip.open(target, 'wt', encoding='utf-8') as out:
+            for row in result.mappings():
+                out.write(json.dumps({key: _encode(value) for key, value in row.items()}) + '\n')
+                count += 1
+        self.manifest['tables'][table.name] = count
+        return count
+
+    def load_table(self, table, chunk_size=1000):
+        """Insert the recorded rows of ``table`` with multi-row inserts"""
+        source = self.path / 'tables' / f'{table.name}.jsonl.gz'
+        rows = []
+        with gzip.open(source, 'rt', encoding='utf-8') as lines:
+            for line in lines:
+                rows.append({key: _decode(value) for key, value in json.loads(line).items()})
+                if len(rows) >= chunk_size:
+                    db.session.execute(insert(table), rows)
+                    rows = []
+        if rows:
+            db.session.execute(insert(table), rows)
+
+    def save_page(self, url, html):
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest() + '.html.gz'
+        target = self.path / 'pages' / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(target, 'wt', encoding='utf-8') as out:
+            out.write(html)
+        self.manifest['pages'][url] = name
+
+    def load_page(self, url):
+        name = self.manifest['pages'].get(url)
+        if name is None:
+            raise FixtureMiss(f"No recorded page for {url}")
+        with gzip.open(self.path / 'pages' / name, 'rt', encoding='utf-8') as page:
+            return page.read()
+
+class RecordingFetcher:
+    """Wrap a fetcher and save every page it returns into a bundle"""
+
+    def __init__(self, fetcher, bundle):
+        self.fetcher = fetcher
+        self.bundle = bundle
+
+    def __call__(self, url):
+        html = self.fetcher(url)
+        self.bundle.save_page(url, html)
+        return html
+
+class ReplayFetcher:
+    """Serve pages from a bundle; never touches the network"""
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+        self._cache = {}
+
+    def __call__(self, url):
+        if url not in self._cache:
+            self._cache[url] = self.bundle.load_page(url)
+        return self._cache[url]
+
+class BenchmarkContext(BotContext):
+    """BotContext that also records the memory peak of each top-level stage"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stage_peaks = {}
+        self._depth = 0
+
+    @contextmanager
+    def stage(self, name):
+        top_level = self._depth == 0 and tracemalloc.is_tracing()
+        if top_level:
+            tracemalloc.reset_peak()
+        self._depth += 1
+        try:
+            with super().stage(name):
+                yield
+        finally:
+            self._depth -= 1
+            if top_level:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.stage_peaks[name] = max(self.stage_peaks.get(name, 0), peak)
+
+@contextmanager
+def dry_run_session():
+    """Route ``db.session`` through a transaction that is always rolled back
+
+    Commits inside the block only release savepoints, and audit entries,
+    synchronous or not, are written through the same session.
+    """
+    connection = db.engine.connect()
+    driver_connection = connection.connection.driver_connection
+    sqlite = connection.dialect.name == 'sqlite'
+    if sqlite:
+        # pysqlite defers BEGIN and mishandles SAVEPOINT; take over transaction control
+        previous_isolation = driver_connection.isolation_level
+        driver_connection.isolation_level = None
+    transaction = connection.begin()
+    if sqlite:
+        connection.exec_driver_sql('BEGIN')
+    # A plain Session: Flask-SQLAlchemy's would route queries back to the engine
+    session = Session(bind=connection, join_transaction_mode='create_savepoint')
+    db.session.registry.set(session)
+    try:
+        with audit_writer.write_through(session):
+            yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        if sqlite:
+            driver_connection.isolation_level = previous_isolation
+        connection.close()
+        db.session.remove()
+
+def _run_bot(bot, ctx):
+    bot.run(bot.iter_batches(ctx), ctx)
+
+def record(bot_name, bundle_path, **bot_kwargs):
+    """Record the inputs and fetched pages of a dry run of ``bot_name``
+
+    Returns:
+        FixtureBundle: The written bundle
+    """
+    bundle = FixtureBundle(bundle_path)
+    bundle.manifest.update(bot=bot_name, recorded_at=datetime.utcnow().isoformat())
+    bot = create_bot(bot_name, **bot_kwargs)
+    for name in bot.fixture_tables:
+        count = bundle.dump_table(_find_table(name))
+        logger.info(f"Recorded {count} rows of {name}")
+
+    with dry_run_session():
+        if hasattr(bot, 'fetcher'):
+            bot.fetcher = RecordingFetcher(bot.fetcher, bundle)
+        _run_bot(bot, BotContext())
+    bundle.save_manifest()
+    logger.info(f"Recorded {len(bundle.manifest['pages'])} pages into {bundle.path}")
+    return bundle
+
+def replay(bundle_path, bot_name=None, **bot_kwargs):
+    """Replay a bundle in dry-run mode and measure the run
+
+    Every model table is created if missing, so the bot finds the tables
+    it writes to, and the recorded tables are loaded, all inside the
+    rolled-back transaction.
+
+    Returns:
+        dict: Throughput, per-stage timings and memory peaks
+    """
+    bundle = FixtureBundle(bundle_path)
+    bot_name = bot_name or bundle.bot_name
+    if not bot_name:
+        raise ValueError(f"No bot recorded in {bundle.path}")
+
+    bot = create_bot(bot_name, **bot_kwargs)
+    tables = [_find_table(name) for name in bundle.manifest['tables']]
+    with dry_run_session() as session:
+        _all_tables().create_all(session.connection(), checkfirst=True)
+        for table in tables:
+            bundle.load_table(table)
+        if hasattr(bot, 'fetcher'):
+            bot.fetcher = ReplayFetcher(bundle)
+
+        ctx = BenchmarkContext()
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            _run_bot(bot, ctx)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'bot': bot_name,
+        'items': ctx.processed,
+        'elapsed_seconds': elapsed,
+        'items_per_second': ctx.processed / elapsed if elapsed else None,
+        'peak_memory_kb': peak // 1024,
+        'stages': {
+            name: {
+                'seconds': seconds,
+                'calls': ctx.stage_calls[name],
+                'peak_memory_kb': ctx.stage_peaks[name] // 1024 if name in ctx.stage_peaks else None
+            }
+            for name, seconds in ctx.stage_seconds.items()
+        },
+        'summary': getattr(bot, 'summary', None)
+    }
+
+def format_report(report):
+    lines = [
+        f"{report['bot']}: {report['items']} items in {report['elapsed_seconds']:.3f}s "
+        f"({report['items_per_second'] or 0:.1f}/s), peak memory {report['peak_memory_kb']} KB"
+    ]
+    for name, stage in sorted(report['stages'].items(), key=lambda item: -item[1]['seconds']):
+        peak = f", peak {stage['peak_memory_kb']} KB" if stage['peak_memory_kb'] is not None else ''
+        lines.append(f"  {name:<10} {stage['seconds']:8.3f}s over {stage['calls']} calls{peak}")
+    return '\n'.join(lines)
+
+def _create_app(database_uri):
+    from flask import Flask
+    from app.configs.base_config import BaseConfig
+    flask_app = Flask('bots.harness')
+    flask_app.config.from_object(BaseConfig(flask_app.root_path))
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    db.init_app(flask_app)
+    return flask_app
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help='Record a dry run into a bundle')
+    record_parser.add_argument('bot')
+    record_parser.add_argument('bundle')
+    record_parser.add_argument('--database-uri', required=True)
+    replay_parser = subparsers.add_parser('replay', help='Replay a bundle offline')
+    replay_parser.add_argument('bundle')
+    replay_parser.add_argument('--bot')
+    replay_parser.add_argument('--database-uri', default='sqlite://')
+    replay_parser.add_argument('--repeat', type=int, default=1)
+    replay_parser.add_argument('--json', action='store_true', help='Print raw JSON reports')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    with _create_app(args.database_uri).app_context():
+        if args.command == 'record':
+            record(args.bot, args.bundle)
+            return
+        for _ in range(args.repeat):
+            report = replay(args.bundle, args.bot)
+            print(json.dumps(report, default=str) if args.json else format_report(report))
+
+if __name__ == '__main__':
+    main()
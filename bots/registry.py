@@ -0,0 +1,68 @@
+"""Registry of bot classes.
+
+Bots are discovered without importing them: modules named ``bots/*_bot.py``
+are parsed for ``BaseBot`` subclasses, and installed packages can add bots
+through the ``sf4.bots`` entry point group (``Name = package.module:Class``).
+A bot module is imported only when ``get_bot_class`` is called for it, so
+web workers do not pay for bot dependencies at startup.
+"""
+import ast
+import importlib
+import logging
+from functools import lru_cache
+from importlib.metadata import entry_points
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'sf4.bots'
+BOTS_DIR = Path(__file__).resolve().parent
+
+_class_cache = {}
+
+def _scan_bot_modules():
+    """Yield (name, 'module:Class') for BaseBot subclasses under bots/"""
+    for path in sorted(BOTS_DIR.glob('*_bot.py')):
+        try:
+            tree = ast.parse(path.read_text(encoding='utf-8'), filename=str(path))
+        except (OSError, SyntaxError) as e:
+            logger.error(f"Skipping bot module {path.name}: {e}")
+            continue
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            base_names = {getattr(base, 'id', getattr(base, 'attr', None)) for base in node.bases}
+            if 'BaseBot' in base_names:
+                yield node.name, f"bots.{path.stem}:{node.name}"
+
+def _entry_point_bots():
+    """Yield (name, 'module:Class') for bots registered by installed packages"""
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        yield ep.name, ep.value
+
+@lru_cache(maxsize=None)
+def discover_bots():
+    """Return a mapping of bot name to its import target"""
+    bots = dict(_scan_bot_modules())
+    bots.update(_entry_point_bots())
+    return bots
+
+def available_bots():
+    return sorted(discover_bots())
+
+def get_bot_class(name):
+    """Import and return the bot class registered under ``name``"""
+    if name in _class_cache:
+        return _class_cache[name]
+
+    target = discover_bots().get(name)
+    if target is None:
+        raise ValueError(f"Unknown bot type: {name}")
+
+    module_name, _, class_name = target.partition(':')
+    bot_class = getattr(importlib.import_module(module_name), class_name)
+    _class_cache[name] = bot_class
+    return bot_class
+
+def create_bot(name, **kwargs):
+    return get_bot_class(name)(**kwargs)
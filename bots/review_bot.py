@@ -0,0 +1,125 @@
+import logging
+import os
+from datetime import datetime
+from sqlalchemy import and_, insert, or_
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.review_finding import ReviewFinding, ReviewIssue
+from app.models.stipend import Stipend
+from app.utils import validate_url
+from app.extensions import db
+from bots.base import BaseBot
+
+class ReviewBot(BaseBot):
+    """Validate stipends that changed since the previous review run.
+
+    The bot keeps a ``(updated_at, id)`` high-water mark in a JobCheckpoint
+    row and walks only newer stipends in keyset-ordered chunks, so a run
+    costs time proportional to the number of changed stipends rather than
+    the size of the catalog.
+    """
+    CHECKPOINT_NAME = 'review_bot'
+    # Stipend columns that must be filled in
+    REQUIRED_FIELDS = ('name', 'description', 'organization_id')
+
+    def __init__(self, chunk_size=None):
+        super().__init__()
+        self.name = "ReviewBot"
+        self.description = "Flags stipends with missing fields, past deadlines or broken URLs."
+        self.chunk_size = chunk_size or int(os.getenv('REVIEW_BOT_CHUNK_SIZE', 500))
+        self.summary = {'reviewed': 0, 'findings': 0}
+
+    def iter_batches(self, ctx):
+        """Yield chunks of stipends changed since the last checkpoint"""
+        self._checkpoint = JobCheckpoint.get_or_create(self.CHECKPOINT_NAME)
+        # Rows touched while the run is in progress are left for the next run
+        self._run_started = datetime.utcnow()
+        return self._iter_changed(self._checkpoint.last_timestamp, self._checkpoint.last_id,
+                                  self._run_started)
+
+    def process_batch(self, chunk, ctx):
+        findings = []
+        for stipend in chunk:
+            findings.extend(self._review_stipend(stipend, self._run_started))
+
+        self._write_findings([stipend.id for stipend in chunk], findings)
+        last = chunk[-1]
+        self._checkpoint.advance(last.updated_at, last.id)
+        db.session.commit()
+
+        self.summary['reviewed'] += len(chunk)
+        self.summary['findings'] += len(findings)
+        for stipend in chunk:
+            db.session.expunge(stipend)
+
+    def run(self, batch_iter=None, ctx=None):
+        """Review every stipend changed since the last checkpoint.
+
+        The number of stipends reviewed and findings written is left in
+        ``summary``.
+
+        Returns:
+            BotContext: The context with final progress counters
+        """
+        self.summary = {'reviewed': 0, 'findings': 0}
+        ctx = super().run(batch_iter, ctx)
+        self.logger.info(
+            f"ReviewBot reviewed {self.summary['reviewed']} changed stipends, "
+            f"recorded {self.summary['findings']} findings"
+        )
+        return ctx
+
+    def _iter_changed(self, last_timestamp, last_id, upper_bound):
+        """Yield chunks of stipends ordered by (updated_at, id) past the mark"""
+        while True:
+            query = db.session.query(Stipend).filter(
+                Stipend.updated_at.isnot(None),
+                Stipend.updated_at <= upper_bound
+            )
+            if last_timestamp is not None:
+                query = query.filter(or_(
+                    Stipend.updated_at > last_timestamp,
+                    and_(Stipend.updated_at == last_timestamp, Stipend.id > (last_id or 0))
+                ))
+            chunk = query.order_by(Stipend.updated_at, Stipend.id).limit(self.chunk_size).all()
+            if not chunk:
+                return
+            # Read the key before the consumer commits and expunges the chunk
+            last_timestamp, last_id = chunk[-1].updated_at, chunk[-1].id
+            yield chunk
+
+    def _review_stipend(self, stipend, now):
+        """Return finding rows (as dicts) for a single stipend"""
+        findings = []
+        for field in self.REQUIRED_FIELDS:
+            value = getattr(stipend, field)
+            if value is None or (isinstance(value, str) and not value.strip()):
+                findings.append(self._finding(stipend, field, ReviewIssue.MISSING_FIELD,
+                                              f"{field} is missing"))
+
+        deadline = stipend.application_deadline
+        if deadline is not None and stipend.active and deadline < now:
+            findings.append(self._finding(stipend, 'application_deadline', ReviewIssue.PAST_DEADLINE,
+                                          f"Deadline {deadline:%Y-%m-%d} has passed but stipend is active"))
+
+        url = stipend.homepage_url
+        if url and not validate_url(url):
+            findings.append(self._finding(stipend, 'homepage_url', ReviewIssue.INVALID_URL,
+                                          f"Invalid homepage URL: {url}"[:255]))
+        return findings
+
+    def _finding(self, stipend, field, issue, message):
+        return {
+            'stipend_id': stipend.id,
+            'field': field,
+            'issue': issue,
+            'message': message,
+            'created_at': datetime.utcnow()
+        }
+
+    def _write_findings(self, stipend_ids, findings):
+        """Replace the findings of the reviewed stipends with one delete and one insert"""
+        db.session.query(ReviewFinding).filter(
+            ReviewFinding.stipend_id.in_(stipend_ids)
+        ).delete(synchronize_session=False)
+        if findings:
+            db.session.execute(insert(ReviewFinding), findings)
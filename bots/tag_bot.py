@@ -1,19 +1,25 @@
 import logging
 from datetime import datetime, timezone
-from app.models.notification import Notification, NotificationType
 from app.models.audit_log import AuditLog
-from app.models.notification import Notification
 from app.models.stipend import Stipend
 from app.models.tag import Tag
 from app.extensions import db
+from app.constants import AuditDurability
+from app.common.batching import iter_chunks
+from bots.base import BaseBot, BotCancelled, BotContext
 
-class TagBot:
-    def __init__(self):
+class TagBot(BaseBot):
+    CHECKPOINT_NAME = 'tag_bot'
+    fixture_tables = ('stipends', 'tag', 'stipend_tag_association')
+
+    def __init__(self, chunk_size=500):
+        super().__init__()
         self.name = "TagBot"
         self.description = "Automatically tags stipends based on content."
         self.status = "inactive"
         self.last_run = None
-        self.logger = logging.getLogger(self.__class__.__name__)
+        self.chunk_size = chunk_size
+        self._tags = None
         self.keywords = {
             'Research': ['research', 'study', 'academic'],
             'Internship': ['internship', 'training', 'placement'],
@@ -22,15 +28,37 @@ class TagBot:
             'Arts': ['art', 'music', 'dance', 'theater']
         }
 
-    def run(self):
-        """Run the TagBot to process and tag stipends."""
+    def iter_batches(self, ctx):
+        """Yield untagged stipends in primary-key order, one chunk at a time.
+
+        Each chunk is committed and expunged once tagged, and an interrupted
+        run resumes after the last committed chunk.
+        """
+        return iter_chunks(
+            db.session.query(Stipend).filter(~Stipend.tags.any()),
+            key=Stipend.id,
+            chunk_size=self.chunk_size,
+            checkpoint=self.CHECKPOINT_NAME
+        )
+
+    def process_batch(self, batch, ctx):
+        """Tag one chunk of stipends; iter_chunks commits it."""
+        for stipend in batch:
+            self._process_stipend(stipend)
+
+    def run(self, batch_iter=None, ctx=None):
+        """Run the TagBot to process and tag stipends.
+
+        Failures are audited and re-raised, so the caller (``run_bot``)
+        records the run as failed and sends the bot notifications.
+        """
+        ctx = ctx or BotContext(chunk_size=self.chunk_size)
         try:
             # Add audit log
             AuditLog.create(
                 user_id=0,  # System user
                 action='tagbot_run',
                 details='Starting TagBot execution',
-                object_type='Bot',
                 ip_address='127.0.0.1',
                 http_method='POST',
                 endpoint='admin.bot.run',
@@ -39,37 +67,17 @@ class TagBot:
             
             self._start_bot()
             
-            # Get untagged stipends
-            untagged_stipends = Stipend.query.filter(~Stipend.tags.any()).all()
-            
-            # Process each stipend
-            for stipend in untagged_stipends:
-                self._process_stipend(stipend)
-            
-            self._complete_bot()
-            
-            # Create success notification
-            Notification.create(
-                type=NotificationType.BOT_SUCCESS,
-                message=f"TagBot completed successfully - processed {len(untagged_stipends)} stipends",
-                related_object=self,
-                user_id=0,  # System user
-                priority='medium'
-            )
+            # Process untagged stipends chunk by chunk
+            super().run(batch_iter, ctx)
             
-            return True
+            self._complete_bot(ctx)
+            return ctx
             
+        except BotCancelled:
+            raise
         except Exception as e:
             self._handle_error(e)
-            # Create error notification
-            Notification.create(
-                type=NotificationType.BOT_ERROR,
-                message=f"TagBot failed: {str(e)}",
-                related_object=self,
-                user_id=0,  # System user
-                priority='high'
-            )
-            return False
+            raise
 
     def _start_bot(self):
         """Handle bot startup logic."""
@@ -78,8 +86,7 @@ class TagBot:
         AuditLog.create(
             user_id=0,
             action="bot_start",
-            details=f"TagBot started at {datetime.now(timezone.utc)}",
-            object_type="Bot"
+            details=f"TagBot started at {datetime.now(timezone.utc)}"
         )
 
     def _process_stipend(self, stipend):
@@ -87,13 +94,20 @@ class TagBot:
         tags_to_add = []
         for tag_name, keyword_list in self.keywords.items():
             if self._contains_keywords(stipend, keyword_list):
-                tag = Tag.query.filter_by(name=tag_name).first()
+                tag = self._get_tags().get(tag_name)
                 if tag and tag not in stipend.tags:
                     tags_to_add.append(tag)
         
         if tags_to_add:
             self._add_tags(stipend, tags_to_add)
 
+    def _get_tags(self):
+        """Load the keyword tags once per run instead of once per stipend."""
+        if self._tags is None:
+            tags = db.session.query(Tag).filter(Tag.name.in_(list(self.keywords))).all()
+            self._tags = {tag.name: tag for tag in tags}
+        return self._tags
+
     def _contains_keywords(self, stipend, keywords):
         """Check if stipend contains any of the given keywords."""
         content = f"{stipend.name} {stipend.description}".lower()
@@ -107,22 +121,18 @@ class TagBot:
             action="tag_added",
             details=f"Added tags {[t.name for t in tags]} to stipend {stipend.id}",
             object_type="Stipend",
-            object_id=stipend.id
+            object_id=stipend.id,
+            durability=AuditDurability.ASYNC
         )
 
-    def _complete_bot(self):
+    def _complete_bot(self, ctx):
         """Handle bot completion logic."""
         self.status = "completed"
         self.last_run = datetime.now(timezone.utc)
-        Notification.create(
-            type="bot_success",
-            message=f"{self.name} completed successfully"
-        )
         AuditLog.create(
             user_id=0,
             action="bot_complete",
-            details=f"TagBot completed at {self.last_run}",
-            object_type="Bot"
+            details=f"TagBot completed at {self.last_run} - processed {ctx.processed} stipends"
         )
         db.session.commit()
 
@@ -130,22 +140,15 @@ class TagBot:
         """Handle bot errors."""
         self.status = "error"
         self.logger.error(f"Failed to run TagBot: {error}")
-        
-        # Create error notification
-        Notification.create(
-            type=NotificationType.BOT_ERROR,
-            message=f"{self.name} failed: {str(error)}",
-            related_object=self,
-            user_id=0  # System user
-        )
+        # Drop the failed chunk; it is retried from the checkpoint next run
+        db.session.rollback()
         
         # Create audit log
         AuditLog.create(
             user_id=0,
             action="bot_error",
-            details=f"TagBot failed with error: {str(error)}",
-            object_type="Bot"
+            details=f"TagBot failed with error: {str(error)}"
         )
         
         # Commit changes
-        self.session.commit()
+        db.session.commit()
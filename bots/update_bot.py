@@ -0,0 +1,79 @@
+import os
+import requests
+from app.common.batching import iter_chunks
+from app.extensions import db
+from app.models.stipend import Stipend
+from app.services.extraction_service import extract_stipend
+from bots.base import BaseBot
+
+def fetch_page(url, timeout=None):
+    """Fetch a page over HTTP and return its text"""
+    response = requests.get(
+        url,
+        timeout=timeout or float(os.getenv('UPDATE_BOT_FETCH_TIMEOUT', 15)),
+        headers={'User-Agent': os.getenv('BOT_USER_AGENT', 'SF4-UpdateBot/1.0')}
+    )
+    response.raise_for_status()
+    return response.text
+
+class UpdateBot(BaseBot):
+    """Refresh stipend details from their source pages.
+
+    Each stipend's homepage (or its organization's website) is fetched
+    through ``fetcher`` and run through the streaming extractor. Extracted
+    values are copied onto the stipend columns listed in ``FIELD_MAP``.
+    Passing a different ``fetcher`` lets the fixture harness replay
+    recorded pages without network access.
+    """
+    CHECKPOINT_NAME = 'update_bot'
+    fixture_tables = ('stipends', 'organization')
+    FIELD_MAP = {
+        'deadline': 'application_deadline',
+        'eligibility': 'eligibility_criteria',
+    }
+
+    def __init__(self, fetcher=None, chunk_size=None):
+        super().__init__()
+        self.name = "UpdateBot"
+        self.description = "Keeps stipend details up to date."
+        self.fetcher = fetcher or fetch_page
+        self.chunk_size = chunk_size or int(os.getenv('UPDATE_BOT_CHUNK_SIZE', 100))
+        self.summary = {'fetched': 0, 'failed': 0, 'updated': 0}
+
+    def iter_batches(self, ctx):
+        return iter_chunks(db.session.query(Stipend), key=Stipend.id, chunk_size=self.chunk_size,
+                           checkpoint=self.CHECKPOINT_NAME)
+
+    def process_batch(self, batch, ctx):
+        for stipend in batch:
+            url = self._source_url(stipend)
+            if not url:
+                continue
+            try:
+                with ctx.stage('fetch'):
+                    html = self.fetcher(url)
+            except Exception as e:
+                self.summary['failed'] += 1
+                self.logger.warning(f"Fetching {url} for stipend {stipend.id} failed: {e}")
+                continue
+            self.summary['fetched'] += 1
+            with ctx.stage('extract'):
+                extracted = extract_stipend(html, url)
+            if self._apply(stipend, extracted):
+                self.summary['updated'] += 1
+
+    def _source_url(self, stipend):
+        organization = stipend.organization
+        return stipend.homepage_url or (organization.website if organization else None)
+
+    def _apply(self, stipend, extracted):
+        """Copy extracted values onto the stipend, returning True if any changed"""
+        changed = False
+        for field, attribute in self.FIELD_MAP.items():
+            value = extracted.get(field)
+            if value is None:
+                continue
+            if getattr(stipend, attribute) != value:
+                setattr(stipend, attribute, value)
+                changed = True
+        return changed
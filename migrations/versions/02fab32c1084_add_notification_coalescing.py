@@ -0,0 +1,28 @@
+"""Add repeat count and last seen columns to notification
+
+Revision ID: 02fab32c1084
+Revises: 9cfd1501511b
+Create Date: 2026-10-19 20:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '02fab32c1084'
+down_revision = '9cfd1501511b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notification') as batch_op:
+        batch_op.add_column(sa.Column('count', sa.Integer(), nullable=False, server_default='1'))
+        batch_op.add_column(sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('notification') as batch_op:
+        batch_op.drop_column('last_seen_at')
+        batch_op.drop_column('count')
@@ -0,0 +1,26 @@
+"""Add the notify flag to audit_log
+
+Revision ID: 0c7f87583ced
+Revises: c11fb334a207
+Create Date: 2026-10-19 19:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c7f87583ced'
+down_revision = 'c11fb334a207'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audit_log') as batch_op:
+        batch_op.add_column(sa.Column('notify', sa.Boolean(), nullable=False, server_default=sa.true()))
+
+
+def downgrade():
+    with op.batch_alter_table('audit_log') as batch_op:
+        batch_op.drop_column('notify')
@@ -0,0 +1,44 @@
+"""Add job checkpoints and review findings
+
+Revision ID: 29abbd31ebaa
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-19 18:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '29abbd31ebaa'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_checkpoint',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('last_timestamp', sa.DateTime(), nullable=True),
+        sa.Column('last_id', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_table('review_finding',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stipend_id', sa.Integer(), nullable=False),
+        sa.Column('field', sa.String(length=50), nullable=True),
+        sa.Column('issue', sa.String(length=50), nullable=False),
+        sa.Column('message', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_review_finding_stipend_issue', 'review_finding', ['stipend_id', 'issue'])
+
+
+def downgrade():
+    op.drop_index('ix_review_finding_stipend_issue', table_name='review_finding')
+    op.drop_table('review_finding')
+    op.drop_table('job_checkpoint')
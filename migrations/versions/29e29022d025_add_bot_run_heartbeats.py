@@ -0,0 +1,34 @@
+"""Add heartbeat, progress and cancel columns to bot runs
+
+Revision ID: 29e29022d025
+Revises: 85c89cce4019
+Create Date: 2026-10-19 18:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '29e29022d025'
+down_revision = '85c89cce4019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bot_run') as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('processed', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('total', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('cancel_requested', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch_op.create_index('ix_bot_run_status_heartbeat', ['status', 'heartbeat_at'])
+
+
+def downgrade():
+    with op.batch_alter_table('bot_run') as batch_op:
+        batch_op.drop_index('ix_bot_run_status_heartbeat')
+        batch_op.drop_column('cancel_requested')
+        batch_op.drop_column('total')
+        batch_op.drop_column('processed')
+        batch_op.drop_column('heartbeat_at')
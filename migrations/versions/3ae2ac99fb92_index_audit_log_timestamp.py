@@ -0,0 +1,30 @@
+"""Index audit_log.timestamp and keep its ids monotonic on SQLite
+
+Revision ID: 3ae2ac99fb92
+Revises: 29e29022d025
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3ae2ac99fb92'
+down_revision = '29e29022d025'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_audit_log_timestamp', 'audit_log', ['timestamp'])
+    if op.get_bind().dialect.name == 'sqlite':
+        # The monthly rollover empties audit_log; without AUTOINCREMENT SQLite
+        # would hand out ids again that the id watermarks have already passed
+        with op.batch_alter_table('audit_log', recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': True}):
+            pass
+
+
+def downgrade():
+    op.drop_index('ix_audit_log_timestamp', table_name='audit_log')
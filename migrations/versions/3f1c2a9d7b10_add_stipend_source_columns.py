@@ -0,0 +1,30 @@
+"""Add source page columns to stipends
+
+Revision ID: 3f1c2a9d7b10
+Revises: 
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stipends') as batch_op:
+        batch_op.add_column(sa.Column('homepage_url', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('eligibility_criteria', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('application_deadline', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('stipends') as batch_op:
+        batch_op.drop_column('application_deadline')
+        batch_op.drop_column('eligibility_criteria')
+        batch_op.drop_column('homepage_url')
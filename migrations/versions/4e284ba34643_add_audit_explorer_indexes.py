@@ -0,0 +1,28 @@
+"""Add the audit log explorer indexes
+
+Revision ID: 4e284ba34643
+Revises: 3ae2ac99fb92
+Create Date: 2026-10-19 19:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e284ba34643'
+down_revision = '3ae2ac99fb92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_audit_log_user_timestamp', 'audit_log', ['user_id', 'timestamp'])
+    op.create_index('ix_audit_log_object_timestamp', 'audit_log', ['object_type', 'object_id', 'timestamp'])
+    op.create_index('ix_audit_log_action_timestamp', 'audit_log', ['action', 'timestamp'])
+
+
+def downgrade():
+    op.drop_index('ix_audit_log_action_timestamp', table_name='audit_log')
+    op.drop_index('ix_audit_log_object_timestamp', table_name='audit_log')
+    op.drop_index('ix_audit_log_user_timestamp', table_name='audit_log')
@@ -0,0 +1,26 @@
+"""Add the notification list and retention indexes
+
+Revision ID: 7b63c0ce038c
+Revises: 02fab32c1084
+Create Date: 2026-10-19 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b63c0ce038c'
+down_revision = '02fab32c1084'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_notification_user_read_created', 'notification', ['user_id', 'read_status', 'created_at'])
+    op.create_index('ix_notification_created_at', 'notification', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_notification_created_at', table_name='notification')
+    op.drop_index('ix_notification_user_read_created', table_name='notification')
@@ -0,0 +1,31 @@
+"""Add the compact JSON changes column to audit_log
+
+Revision ID: 7bee548dfaff
+Revises: 4e284ba34643
+Create Date: 2026-10-19 19:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7bee548dfaff'
+down_revision = '4e284ba34643'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audit_log') as batch_op:
+        batch_op.add_column(sa.Column('changes', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True))
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_audit_log_changes', 'audit_log', ['changes'], postgresql_using='gin')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_audit_log_changes', table_name='audit_log')
+    with op.batch_alter_table('audit_log') as batch_op:
+        batch_op.drop_column('changes')
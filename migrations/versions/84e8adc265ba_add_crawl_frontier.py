@@ -0,0 +1,59 @@
+"""Add the crawl frontier tables
+
+Revision ID: 84e8adc265ba
+Revises: 29abbd31ebaa
+Create Date: 2026-10-19 18:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '84e8adc265ba'
+down_revision = '29abbd31ebaa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('crawl_host',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('host', sa.String(length=255), nullable=False),
+        sa.Column('crawl_delay', sa.Float(), nullable=False),
+        sa.Column('next_allowed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('host')
+    )
+    op.create_table('crawl_url',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('url', sa.Text(), nullable=False),
+        sa.Column('url_hash', sa.String(length=64), nullable=False),
+        sa.Column('host', sa.String(length=255), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('next_fetch_at', sa.DateTime(), nullable=False),
+        sa.Column('recrawl_interval', sa.Integer(), nullable=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=True),
+        sa.Column('last_fetched_at', sa.DateTime(), nullable=True),
+        sa.Column('fetch_count', sa.Integer(), nullable=False),
+        sa.Column('error_count', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.String(length=255), nullable=True),
+        sa.Column('lease_owner', sa.String(length=100), nullable=True),
+        sa.Column('lease_token', sa.String(length=36), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('discovered_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('url_hash')
+    )
+    op.create_index('ix_crawl_url_host', 'crawl_url', ['host'])
+    op.create_index('ix_crawl_url_ready', 'crawl_url', ['status', 'next_fetch_at', 'priority'])
+    op.create_index('ix_crawl_url_lease_token', 'crawl_url', ['lease_token'])
+
+
+def downgrade():
+    op.drop_index('ix_crawl_url_lease_token', table_name='crawl_url')
+    op.drop_index('ix_crawl_url_ready', table_name='crawl_url')
+    op.drop_index('ix_crawl_url_host', table_name='crawl_url')
+    op.drop_table('crawl_url')
+    op.drop_table('crawl_host')
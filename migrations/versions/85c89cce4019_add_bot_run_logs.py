@@ -0,0 +1,48 @@
+"""Add bot runs and their compressed log chunks
+
+Revision ID: 85c89cce4019
+Revises: b636bdc7faa7
+Create Date: 2026-10-19 18:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '85c89cce4019'
+down_revision = 'b636bdc7faa7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('bot_run',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bot_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('error_summary', sa.String(length=500), nullable=True),
+        sa.Column('log_size', sa.BigInteger(), nullable=False),
+        sa.Column('log_chunks', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['bot_id'], ['bot.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_bot_run_bot_started', 'bot_run', ['bot_id', 'started_at'])
+    op.create_table('bot_run_log_chunk',
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('start_offset', sa.BigInteger(), nullable=False),
+        sa.Column('length', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['run_id'], ['bot_run.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('run_id', 'seq')
+    )
+
+
+def downgrade():
+    op.drop_table('bot_run_log_chunk')
+    op.drop_index('ix_bot_run_bot_started', table_name='bot_run')
+    op.drop_table('bot_run')
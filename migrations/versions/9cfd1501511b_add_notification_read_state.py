@@ -0,0 +1,68 @@
+"""Add per-user read state for system-wide notifications
+
+Revision ID: 9cfd1501511b
+Revises: ee8885989085
+Create Date: 2026-10-19 20:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9cfd1501511b'
+down_revision = 'ee8885989085'
+branch_labels = None
+depends_on = None
+
+# Counter key for system-wide notifications (user_id NULL)
+BROADCAST_KEY = -1
+
+notification = sa.table('notification',
+    sa.column('user_id', sa.Integer()),
+    sa.column('read_status', sa.Boolean())
+)
+counter = sa.table('notification_counter',
+    sa.column('user_id', sa.Integer()),
+    sa.column('unread', sa.Integer()),
+    sa.column('updated_at', sa.DateTime())
+)
+
+
+def _recount_broadcasts(condition):
+    op.execute(counter.delete().where(counter.c.user_id == BROADCAST_KEY))
+    op.execute(counter.insert().from_select(
+        ['user_id', 'unread', 'updated_at'],
+        sa.select(sa.literal(BROADCAST_KEY), sa.func.count(), sa.func.current_timestamp())
+        .where(notification.c.user_id.is_(None), condition)
+        .having(sa.func.count() > 0)
+    ))
+
+
+def upgrade():
+    op.create_table('notification_read_mark',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('notification_id', sa.Integer(), nullable=False),
+        sa.Column('read_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id', 'notification_id')
+    )
+    op.create_index('ix_notification_read_mark_notification_id', 'notification_read_mark', ['notification_id'])
+    op.create_table('notification_read_state',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('broadcast_cursor', sa.Integer(), nullable=False),
+        sa.Column('broadcast_read', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_notification_user_id_id', 'notification', ['user_id', 'id'])
+    # The broadcast counter now counts every broadcast; what each user read
+    # is subtracted from notification_read_state
+    _recount_broadcasts(sa.true())
+
+
+def downgrade():
+    _recount_broadcasts(sa.func.coalesce(notification.c.read_status, sa.false()) == sa.false())
+    op.drop_index('ix_notification_user_id_id', table_name='notification')
+    op.drop_table('notification_read_state')
+    op.drop_index('ix_notification_read_mark_notification_id', table_name='notification_read_mark')
+    op.drop_table('notification_read_mark')
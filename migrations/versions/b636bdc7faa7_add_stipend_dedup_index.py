@@ -0,0 +1,53 @@
+"""Add the near-duplicate stipend index
+
+Revision ID: b636bdc7faa7
+Revises: 84e8adc265ba
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b636bdc7faa7'
+down_revision = '84e8adc265ba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stipend_signature',
+        sa.Column('stipend_id', sa.Integer(), nullable=False),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('stipend_id')
+    )
+    op.create_table('stipend_lsh_band',
+        sa.Column('stipend_id', sa.Integer(), nullable=False),
+        sa.Column('band', sa.SmallInteger(), nullable=False),
+        sa.Column('bucket', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('stipend_id', 'band')
+    )
+    op.create_index('ix_stipend_lsh_band_bucket', 'stipend_lsh_band', ['band', 'bucket'])
+    op.create_table('duplicate_candidate',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stipend_id', sa.Integer(), nullable=False),
+        sa.Column('duplicate_of_id', sa.Integer(), nullable=False),
+        sa.Column('similarity', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('stipend_id', 'duplicate_of_id', name='uq_duplicate_candidate_pair')
+    )
+    op.create_index('ix_duplicate_candidate_stipend_id', 'duplicate_candidate', ['stipend_id'])
+    op.create_index('ix_duplicate_candidate_duplicate_of_id', 'duplicate_candidate', ['duplicate_of_id'])
+
+
+def downgrade():
+    op.drop_index('ix_duplicate_candidate_duplicate_of_id', table_name='duplicate_candidate')
+    op.drop_index('ix_duplicate_candidate_stipend_id', table_name='duplicate_candidate')
+    op.drop_table('duplicate_candidate')
+    op.drop_index('ix_stipend_lsh_band_bucket', table_name='stipend_lsh_band')
+    op.drop_table('stipend_lsh_band')
+    op.drop_table('stipend_signature')
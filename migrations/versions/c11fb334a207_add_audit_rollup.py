@@ -0,0 +1,32 @@
+"""Add audit rollups
+
+Revision ID: c11fb334a207
+Revises: e8c7af14726d
+Create Date: 2026-10-19 19:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c11fb334a207'
+down_revision = 'e8c7af14726d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('audit_rollup',
+        sa.Column('granularity', sa.String(length=10), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('action', sa.String(length=100), nullable=False),
+        sa.Column('object_type', sa.String(length=50), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('granularity', 'bucket_start', 'action', 'object_type', 'user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('audit_rollup')
@@ -0,0 +1,28 @@
+"""Add hit count and last seen columns to audit_log
+
+Revision ID: e8c7af14726d
+Revises: 7bee548dfaff
+Create Date: 2026-10-19 19:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c7af14726d'
+down_revision = '7bee548dfaff'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audit_log') as batch_op:
+        batch_op.add_column(sa.Column('hit_count', sa.Integer(), nullable=False, server_default='1'))
+        batch_op.add_column(sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('audit_log') as batch_op:
+        batch_op.drop_column('last_seen_at')
+        batch_op.drop_column('hit_count')
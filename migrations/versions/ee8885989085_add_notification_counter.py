@@ -0,0 +1,44 @@
+"""Add per-user unread notification counters
+
+Revision ID: ee8885989085
+Revises: 0c7f87583ced
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ee8885989085'
+down_revision = '0c7f87583ced'
+branch_labels = None
+depends_on = None
+
+# Counter key for system-wide notifications (user_id NULL)
+BROADCAST_KEY = -1
+
+
+def upgrade():
+    counter = op.create_table('notification_counter',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('unread', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    # Start the counters from the unread notifications already stored
+    notification = sa.table('notification',
+        sa.column('user_id', sa.Integer()),
+        sa.column('read_status', sa.Boolean())
+    )
+    key = sa.func.coalesce(notification.c.user_id, BROADCAST_KEY)
+    op.execute(counter.insert().from_select(
+        ['user_id', 'unread', 'updated_at'],
+        sa.select(key, sa.func.count(), sa.func.current_timestamp())
+        .where(sa.func.coalesce(notification.c.read_status, sa.false()) == sa.false())
+        .group_by(key)
+    ))
+
+
+def downgrade():
+    op.drop_table('notification_counter')
@@ -0,0 +1,86 @@
+"""Audit log partition maintenance, notification pruning and offline archive queries.
+
+Usage:
+    python scripts/audit_maintenance.py maintain --database-uri postgresql://...
+    python scripts/audit_maintenance.py rollup [--rebuild]
+    python scripts/audit_maintenance.py prune-notifications
+    python scripts/audit_maintenance.py query archives/audit [--since 2025-01-01]
+        [--until 2025-02-01] [--action delete] [--user-id 3] [--object-type Stipend]
+
+``maintain`` brings the activity rollups up to date, creates upcoming
+partitions (PostgreSQL) or rolls the hot table over (SQLite), then
+archives and drops months past AUDIT_RETENTION_MONTHS. Run it daily from
+cron. ``rollup`` only updates the rollups; run it every few minutes.
+``prune-notifications`` deletes notifications past their retention
+policy; run it daily.
+``query`` prints matching archived entries as JSON lines and needs no
+database.
+"""
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.audit_partition_service import AuditPartitionService, iter_archive  # noqa: E402
+from app.services.audit_rollup_service import AuditRollupService  # noqa: E402
+from app.services.notification_retention_service import NotificationRetentionService  # noqa: E402
+
+def _create_app(database_uri):
+    from flask import Flask
+    from app.configs.base_config import BaseConfig
+    from app.extensions import db
+    flask_app = Flask('audit_maintenance')
+    flask_app.config.from_object(BaseConfig(flask_app.root_path))
+    if database_uri:
+        flask_app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    db.init_app(flask_app)
+    return flask_app
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    maintain_parser = subparsers.add_parser('maintain', help='Create, roll over and archive partitions')
+    maintain_parser.add_argument('--database-uri')
+    maintain_parser.add_argument('--archive-dir')
+    rollup_parser = subparsers.add_parser('rollup', help='Roll up new audit rows for activity charts')
+    rollup_parser.add_argument('--database-uri')
+    rollup_parser.add_argument('--rebuild', action='store_true', help='Recount the whole audit log')
+    prune_parser = subparsers.add_parser('prune-notifications', help='Delete expired notifications')
+    prune_parser.add_argument('--database-uri')
+    query_parser = subparsers.add_parser('query', help='Search archived entries offline')
+    query_parser.add_argument('archive_dir')
+    query_parser.add_argument('--since', type=datetime.fromisoformat)
+    query_parser.add_argument('--until', type=datetime.fromisoformat)
+    query_parser.add_argument('--action')
+    query_parser.add_argument('--user-id', type=int)
+    query_parser.add_argument('--object-type')
+    query_parser.add_argument('--object-id', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'query':
+        for row in iter_archive(args.archive_dir, since=args.since, until=args.until,
+                                action=args.action, user_id=args.user_id,
+                                object_type=args.object_type, object_id=args.object_id):
+            print(json.dumps(row, default=str))
+        return
+
+    logging.basicConfig(level=logging.INFO)
+    with _create_app(args.database_uri).app_context():
+        if args.command == 'prune-notifications':
+            print(json.dumps(NotificationRetentionService().prune(), indent=2))
+            return
+        rollups = AuditRollupService()
+        if args.command == 'rollup':
+            print(f"Rolled up {rollups.rebuild() if args.rebuild else rollups.run()} audit rows")
+            return
+        # Count rows before rollover or archival moves them out of audit_log
+        rollups.run()
+        report = AuditPartitionService(archive_dir=args.archive_dir).run_maintenance()
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark the streaming stipend extractor against a BeautifulSoup baseline.
+
+Usage:
+    python scripts/benchmark_extraction.py [--pages-dir DIR] [--pages N] [--workers N]
+
+Without --pages-dir a synthetic set of funder-like pages is generated.
+Reports pages/sec for the BeautifulSoup baseline, the streaming parser in
+one process, and the streaming parser fanned out over a process pool.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from app.services.extraction_service import (  # noqa: E402
+    DEFAULT_SELECTORS, _parse_deadline, extract_many
+)
+
+FILLER = '<div class="news"><h3>Update</h3><p>{}</p><ul>{}</ul></div>'
+
+def synthetic_pages(count):
+    pages = []
+    for i in range(count):
+        filler = ''.join(
+            FILLER.format('Lorem ipsum dolor sit amet ' * 20,
+                          ''.join(f'<li><a href="/p/{j}">Item {j}</a></li>' for j in range(15)))
+            for _ in range(30)
+        )
+        html = (
+            f'<html><head><title>Funder {i}</title><script>var x = {i};</script></head><body>'
+            f'<nav>{"<a href=/>Home</a>" * 40}</nav>'
+            f'<h1 class="stipend-name">Research Stipend {i}</h1>'
+            f'<p class="amount">NOK {1000 + i},000 per year</p>'
+            f'<div class="eligibility">Open to master and PhD students in year {i % 5}.</div>'
+            f'<p class="deadline">{1 + i % 28} March 2027</p>'
+            f'{filler}</body></html>'
+        )
+        pages.append((f'https://funder{i}.example/stipend', html))
+    return pages
+
+def load_pages(directory):
+    return [(path.name, path.read_text(encoding='utf-8', errors='replace'))
+            for path in sorted(Path(directory).glob('*.html'))]
+
+def extract_with_beautifulsoup(page):
+    url, html = page
+    soup = BeautifulSoup(html, 'html.parser')
+    fields = {}
+    for field, selectors in DEFAULT_SELECTORS.items():
+        for selector in selectors:
+            element = soup.select_one(selector.source)
+            if element is not None:
+                fields[field] = element.get('content') or element.get_text(' ', strip=True)
+                break
+    fields['deadline'] = _parse_deadline(fields.get('deadline'))
+    return fields
+
+def timed(label, func, pages):
+    start = time.perf_counter()
+    func(pages)
+    elapsed = time.perf_counter() - start
+    rate = len(pages) / elapsed if elapsed else float('inf')
+    print(f"{label:<32} {len(pages):>6} pages  {elapsed:8.2f}s  {rate:10.1f} pages/sec")
+    return rate
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages-dir', help='Directory of .html files to use instead of synthetic pages')
+    parser.add_argument('--pages', type=int, default=500, help='Number of synthetic pages')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Process pool size')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages_dir) if args.pages_dir else synthetic_pages(args.pages)
+    if not pages:
+        parser.error('No pages to benchmark')
+
+    baseline = timed('BeautifulSoup (1 process)', lambda p: [extract_with_beautifulsoup(x) for x in p], pages)
+    streaming = timed('Streaming (1 process)', lambda p: extract_many(p, workers=1), pages)
+    pooled = timed(f'Streaming ({args.workers} processes)', lambda p: extract_many(p, workers=args.workers), pages)
+    print(f"Speedup vs BeautifulSoup: {streaming / baseline:.1f}x single process, "
+          f"{pooled / baseline:.1f}x with pool")
+
+if __name__ == '__main__':
+    main()
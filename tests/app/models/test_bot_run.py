@@ -0,0 +1,12 @@
+import subprocess
+import sys
+from pathlib import Path
+
+def test_models_package_resolves_bot_run_foreign_key():
+    # A fresh interpreter, so no other test has imported app.models.bot already
+    check = ("import app.models; from app.extensions import db; "
+             "print(next(iter(db.metadata.tables['bot_run'].c.bot_id.foreign_keys)).column)")
+    result = subprocess.run([sys.executable, '-c', check], capture_output=True, text=True,
+                            cwd=Path(__file__).resolve().parents[3])
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'bot.id'
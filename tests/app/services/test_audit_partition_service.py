@@ -0,0 +1,86 @@
+import gzip
+import json
+from datetime import datetime
+from sqlalchemy import insert, text
+from app.extensions import db
+from app.models.audit_log import AuditLog
+from app.services.audit_partition_service import (
+    AuditPartitionService, add_months, iter_archive, partition_month, partition_name
+)
+
+def test_month_helpers():
+    assert add_months(datetime(2025, 11, 1), 3) == datetime(2026, 2, 1)
+    assert add_months(datetime(2025, 1, 1), -1) == datetime(2024, 12, 1)
+    assert partition_name(datetime(2025, 3, 1)) == 'audit_log_p2025_03'
+    assert partition_month('audit_log_p2025_03') == datetime(2025, 3, 1)
+    assert partition_month('audit_log_history') is None
+
+def _write_archive(archive_dir, name, rows):
+    with gzip.open(archive_dir / f'{name}.jsonl.gz', 'wt', encoding='utf-8') as out:
+        for row in rows:
+            out.write(json.dumps(row) + '\n')
+    index_path = archive_dir / 'index.json'
+    index = json.loads(index_path.read_text()) if index_path.exists() else {}
+    index[name] = {
+        'file': f'{name}.jsonl.gz',
+        'rows': len(rows),
+        'min_timestamp': rows[0]['timestamp'],
+        'max_timestamp': rows[-1]['timestamp']
+    }
+    index_path.write_text(json.dumps(index))
+
+def test_iter_archive_filters_and_skips_files_out_of_range(tmp_path):
+    row = {'user_id': 1, 'action': 'update', 'object_type': 'Stipend', 'object_id': 5}
+    _write_archive(tmp_path, 'audit_log_p2025_01', [
+        dict(row, id=1, timestamp='2025-01-10T12:00:00'),
+        dict(row, id=2, action='delete', timestamp='2025-01-20T12:00:00')
+    ])
+    _write_archive(tmp_path, 'audit_log_p2025_02', [dict(row, id=3, user_id=2, timestamp='2025-02-03T08:00:00')])
+    (tmp_path / 'audit_log_p2025_01.jsonl.gz').rename(tmp_path / 'moved.jsonl.gz')
+
+    # January's file is gone but never opened, since its range ends before ``since``
+    rows = list(iter_archive(tmp_path, since=datetime(2025, 2, 1), user_id=2))
+    assert [r['id'] for r in rows] == [3]
+    assert rows[0]['timestamp'] == datetime(2025, 2, 3, 8)
+
+    (tmp_path / 'moved.jsonl.gz').rename(tmp_path / 'audit_log_p2025_01.jsonl.gz')
+    assert [r['id'] for r in iter_archive(tmp_path, action='delete')] == [2]
+    assert list(iter_archive(tmp_path / 'missing')) == []
+
+def test_maintenance_rolls_over_and_archives_expired_months(app, tmp_path):
+    with app.app_context():
+        db.session.execute(insert(AuditLog), [
+            {'user_id': None, 'action': 'old', 'timestamp': datetime(2024, 1, 5)},
+            {'user_id': None, 'action': 'recent', 'timestamp': datetime(2025, 5, 5)},
+            {'user_id': None, 'action': 'current', 'timestamp': datetime(2025, 6, 2)}
+        ])
+        db.session.commit()
+
+        service = AuditPartitionService(archive_dir=tmp_path)
+        report = service.run_maintenance(now=datetime(2025, 6, 15))
+
+        assert report['rolled_over'] == {'audit_log_p2024_01': 1, 'audit_log_p2025_05': 1}
+        assert report['archived'] == {'audit_log_p2024_01': 1}
+        assert service.list_partitions() == ['audit_log_p2025_05']
+        assert [row['action'] for row in iter_archive(tmp_path)] == ['old']
+        history = db.session.execute(text('SELECT action FROM audit_log_history ORDER BY timestamp'))
+        assert history.scalars().all() == ['recent', 'current']
+        assert service.run_maintenance(now=datetime(2025, 6, 15))['rolled_over'] == {}
+
+def test_ids_keep_growing_after_rollover_empties_the_table(app, tmp_path):
+    with app.app_context():
+        db.session.execute(insert(AuditLog), [
+            {'user_id': None, 'action': 'old', 'timestamp': datetime(2025, 5, 5)},
+            {'user_id': None, 'action': 'older', 'timestamp': datetime(2025, 5, 6)}
+        ])
+        db.session.commit()
+        AuditPartitionService(archive_dir=tmp_path).run_maintenance(now=datetime(2025, 6, 15))
+        assert db.session.query(AuditLog).count() == 0
+
+        db.session.execute(insert(AuditLog), [{'user_id': None, 'action': 'new', 'timestamp': datetime(2025, 6, 16)}])
+        db.session.commit()
+
+        # The watermark jobs tail ``id > last_id``; a reused id would be skipped
+        assert db.session.query(AuditLog.id).scalar() == 3
+        ids = db.session.execute(text('SELECT id FROM audit_log_history ORDER BY id')).scalars().all()
+        assert ids == [1, 2, 3]
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert
+from app.models.audit_log import AuditLog
+from app.models.audit_rollup import AuditRollup, RollupGranularity
+from app.services.audit_rollup_service import AuditRollupService
+
+def test_hours_are_summed_into_days():
+    hours = [
+        (datetime(2025, 1, 1, 9), 'update', 'Stipend', 1, 2),
+        (datetime(2025, 1, 1, 17), 'update', 'Stipend', 1, 3),
+        (datetime(2025, 1, 2, 9), 'update', 'Stipend', 1, 1)
+    ]
+    assert sorted(AuditRollupService()._to_days(hours)) == [
+        (datetime(2025, 1, 1), 'update', 'Stipend', 1, 5),
+        (datetime(2025, 1, 2), 'update', 'Stipend', 1, 1)
+    ]
+
+def _total(db_session, granularity):
+    return db_session.query(func.sum(AuditRollup.count)).filter_by(granularity=granularity).scalar()
+
+def test_runs_only_count_new_rows_and_weight_hits(db_session):
+    hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+    db_session.execute(insert(AuditLog), [
+        {'user_id': 1, 'action': 'update', 'timestamp': hour + timedelta(minutes=5)},
+        {'user_id': 1, 'action': 'update', 'timestamp': hour + timedelta(minutes=50)},
+        {'user_id': None, 'action': 'view_dashboard', 'timestamp': hour, 'hit_count': 12}
+    ])
+    db_session.commit()
+
+    service = AuditRollupService()
+    assert service.run() == 3
+    assert _total(db_session, RollupGranularity.HOUR) == 14
+    assert _total(db_session, RollupGranularity.DAY) == 14
+    assert service.run() == 0
+
+    db_session.execute(insert(AuditLog), [{'user_id': 1, 'action': 'update', 'timestamp': hour}])
+    db_session.commit()
+    assert service.run() == 1
+    update_row = db_session.query(AuditRollup).filter_by(
+        granularity=RollupGranularity.HOUR, action='update', user_id=1
+    ).one()
+    assert (update_row.bucket_start, update_row.count) == (hour, 3)
+    assert sum(bucket['count'] for bucket in service.activity_series(hours=6)) == 15
+
+def test_rows_inside_the_lag_window_wait_for_the_next_run(db_session):
+    db_session.execute(insert(AuditLog), [{'user_id': 1, 'action': 'update', 'timestamp': datetime.utcnow()}])
+    db_session.commit()
+    assert AuditRollupService().run() == 0
@@ -0,0 +1,98 @@
+from datetime import timedelta
+import pytest
+from flask import Flask
+from app.constants import AuditReadMode
+from app.models.audit_log import AuditLog
+from app.services.audit_writer import AuditWriter
+
+class RecordingWriter(AuditWriter):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def _write_batch(self, rows):
+        if rows:
+            self.batches.append(list(rows))
+
+    def _fan_out(self):
+        pass
+
+@pytest.fixture
+def writer():
+    writer = RecordingWriter()
+    writer.batch_size = 50
+    writer.init_app(Flask(__name__))
+    yield writer
+    writer.close()
+
+def row(action='view_dashboard'):
+    return AuditLog.build_row(1, action)
+
+def test_entries_are_written_in_batches(writer):
+    with writer.app.app_context():
+        for _ in range(120):
+            writer.submit(row())
+    assert writer.flush()
+    assert sum(len(batch) for batch in writer.batches) == 120
+    assert max(len(batch) for batch in writer.batches) <= 50
+
+def test_close_flushes_pending_entries(writer):
+    with writer.app.app_context():
+        writer.submit(row('logout_view'))
+    writer.close()
+    assert not writer.running
+    assert writer.batches[-1][0]['action'] == 'logout_view'
+
+def test_entries_from_other_apps_are_written_inline(writer):
+    with Flask('other').app_context():
+        writer.submit(row())
+    assert not writer.running
+    assert len(writer.batches) == 1
+
+def test_build_row_validates_before_queueing():
+    with pytest.raises(ValueError):
+        AuditLog.build_row(1, '')
+    with pytest.raises(ValueError):
+        AuditLog.build_row(1, 'update', object_type='Stipend')
+    assert AuditLog.build_row(1, 'update', details_after={'a': 1})['changes'] == {'after': {'a': 1}}
+
+def test_repeated_reads_coalesce_into_one_row_per_window(writer):
+    writer.read_window = timedelta(minutes=5)
+    first = row()
+    with writer.app.app_context():
+        for seconds in (0, 30, 290):
+            writer.submit_read(dict(first, timestamp=first['timestamp'] + timedelta(seconds=seconds)))
+        writer.submit_read(dict(first, timestamp=first['timestamp'] + timedelta(seconds=400)))
+        writer.submit_read(row('search_audit_log'))
+    assert writer.flush()
+    entries = [entry for batch in writer.batches for entry in batch]
+    assert sorted((e['action'], e['hit_count']) for e in entries) == [
+        ('search_audit_log', 1), ('view_dashboard', 1), ('view_dashboard', 3)
+    ]
+    window = next(e for e in entries if e['hit_count'] == 3)
+    assert window['last_seen_at'] == first['timestamp'] + timedelta(seconds=290)
+
+def test_sampled_reads_are_weighted(writer, monkeypatch):
+    writer.read_mode = AuditReadMode.SAMPLE
+    writer.read_sample_rate = 0.25
+    draws = iter([0.1, 0.9, 0.5, 0.2])
+    monkeypatch.setattr('app.services.audit_writer.random.random', lambda: next(draws))
+    with writer.app.app_context():
+        for _ in range(4):
+            writer.submit_read(row())
+    assert writer.flush()
+    entries = [entry for batch in writer.batches for entry in batch]
+    assert [entry['hit_count'] for entry in entries] == [4, 4]
+    assert writer.reads_skipped == 2
+
+def test_table_check_keeps_the_callers_transaction(db_session, monkeypatch):
+    from app.models import audit_log
+    from app.models.job_checkpoint import JobCheckpoint
+    monkeypatch.setattr(audit_log, '_checked_engines', audit_log.weakref.WeakSet())
+    db_session.add(JobCheckpoint(name='pending'))
+    db_session.flush()
+
+    AuditLog.create(user_id=None, action='update_settings', commit=False)
+    db_session.commit()
+
+    assert db_session.query(JobCheckpoint).filter_by(name='pending').count() == 1
@@ -0,0 +1,178 @@
+import gzip
+import json
+import os
+import stat
+import sys
+import pytest
+from app.services.backup_service import BackupService
+
+# Stand-ins for pg_dump, pg_restore and psql: they record their arguments,
+# the restore list and the SQL fed to psql, and write or list a
+# directory-format dump of four tables, with their sequences and foreign keys.
+PG_DUMP = '''
+import gzip, json, os, sys
+log = os.environ['PG_STUB_LOG']
+with open(log, 'a') as f:
+    f.write(json.dumps(['pg_dump'] + sys.argv[1:]) + '\\n')
+target = next(arg.split('=', 1)[1] for arg in sys.argv if arg.startswith('--file='))
+os.makedirs(target)
+open(os.path.join(target, 'toc.dat'), 'wb').write(b'PGDMP')
+for dump_id, rows in ((3401, b'1\\tScholarship\\n'), (3402, b'1\\tscience\\n')):
+    with gzip.open(os.path.join(target, f'{dump_id}.dat.gz'), 'wb') as f:
+        f.write(rows)
+'''
+
+PG_RESTORE = '''
+import json, os, sys
+entries = []
+for arg in sys.argv:
+    if arg.startswith('--use-list='):
+        entries = open(arg.split('=', 1)[1]).read().splitlines()
+with open(os.environ['PG_STUB_LOG'], 'a') as f:
+    f.write(json.dumps(['pg_restore'] + sys.argv[1:] + entries) + '\\n')
+if '--list' in sys.argv:
+    print(';')
+    print('; Archive created at 2026-10-19 12:00:00 UTC')
+    print('215; 1259 16390 TABLE public stipends owner')
+    print('216; 1259 16388 SEQUENCE public stipends_id_seq owner')
+    print('3404; 0 16420 TABLE DATA public stipend_tag owner')
+    print('3401; 0 16390 TABLE DATA public stipends owner')
+    print('3402; 0 16401 TABLE DATA public tag owner')
+    print('3403; 0 16410 TABLE DATA public users owner')
+    print('3501; 0 0 SEQUENCE SET public stipends_id_seq owner')
+    print('3502; 0 0 SEQUENCE SET public tag_id_seq owner')
+    print('3503; 0 0 SEQUENCE SET public users_id_seq owner')
+    print('3601; 2606 16420 FK CONSTRAINT public stipend_tag stipend_tag_stipend_id_fkey owner')
+for index, entry in enumerate(entries):
+    print(f'-- {entry}', flush=True)
+    if os.environ.get('PG_STUB_FAIL_RESTORE') and index == 0:
+        sys.exit('pg_restore: error: could not read data file')
+'''
+
+PSQL = '''
+import json, os, sys
+script = sys.stdin.read() if '--file=-' in sys.argv else None
+with open(os.environ['PG_STUB_LOG'], 'a') as f:
+    f.write(json.dumps(['psql'] + sys.argv[1:] + ([script] if script is not None else [])) + '\\n')
+if any('pg_get_serial_sequence' in arg for arg in sys.argv):
+    print('public.stipends_id_seq')
+    print('public.tag_id_seq')
+if any('pg_constraint' in arg for arg in sys.argv):
+    print('public.stipend_tag|public.stipends')
+    print('public.stipend_tag|public.tag')
+    print('public.users|public.users')
+'''
+
+@pytest.fixture
+def backups(app, tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    for name, source in (('pg_dump', PG_DUMP), ('pg_restore', PG_RESTORE), ('psql', PSQL)):
+        path = bin_dir / name
+        path.write_text(f'#!{sys.executable}\n{source}')
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    log = tmp_path / 'calls.log'
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv('PG_STUB_LOG', str(log))
+    monkeypatch.setenv('BACKUP_DIR', str(tmp_path / 'backups'))
+    monkeypatch.setenv('BACKUP_FORMAT', 'directory')
+    monkeypatch.setenv('BACKUP_JOBS', '4')
+    with app.app_context():
+        service = BackupService()
+    calls = lambda: [json.loads(line) for line in log.read_text().splitlines()]
+    return service, calls
+
+def test_directory_dump_writes_per_table_manifest(backups):
+    service, calls = backups
+    target = service.backup_dir / 'db_backup_test.dir'
+
+    assert service.dump_directory(target) is None
+
+    dump = calls()[0]
+    assert dump[:3] == ['pg_dump', '--format=directory', '--jobs=4']
+    manifest = service.read_manifest(target)
+    assert manifest['jobs'] == 4
+    assert set(manifest['tables']) == {'public.stipend_tag', 'public.stipends', 'public.tag', 'public.users'}
+    assert manifest['tables']['public.stipends']['file'] == '3401.dat.gz'
+    assert manifest['tables']['public.tag']['bytes'] == (target / '3402.dat.gz').stat().st_size
+    assert service.verify_backup(target)
+
+def restore_calls(calls):
+    """The list pg_restore streamed and the script psql loaded, if it got that far"""
+    restore = next(call for call in calls() if call[0] == 'pg_restore' and '--data-only' in call)
+    loads = [call for call in calls() if call[0] == 'psql' and '--file=-' in call]
+    return restore, (loads[0][-1] if loads else None)
+
+def test_selective_restore_reloads_data_in_one_transaction(backups):
+    service, calls = backups
+    target = service.backup_dir / 'db_backup_test.dir'
+    service.dump_directory(target)
+
+    success, message = service.restore_backup(target, tables=['stipend_tag', 'stipends', 'public.tag'])
+
+    assert success, message
+    restore, script = restore_calls(calls)
+    # Only the rows and sequence values go back, referenced tables first; keys,
+    # indexes and foreign keys stay
+    assert restore[1] == '--data-only' and restore[2].startswith('--use-list=')
+    assert '--clean' not in restore
+    assert restore[5:] == [
+        '3401; 0 16390 TABLE DATA public stipends owner',
+        '3402; 0 16401 TABLE DATA public tag owner',
+        '3404; 0 16420 TABLE DATA public stipend_tag owner',
+        '3501; 0 0 SEQUENCE SET public stipends_id_seq owner',
+        '3502; 0 0 SEQUENCE SET public tag_id_seq owner'
+    ]
+    lines = script.splitlines()
+    assert lines[:2] == ['BEGIN;', 'TRUNCATE TABLE "public"."stipend_tag", "public"."stipends", "public"."tag";']
+    assert lines[2] == '-- 3401; 0 16390 TABLE DATA public stipends owner'
+    assert lines[-1] == 'COMMIT;'
+
+    success, message = service.restore_backup(target, tables=['accounts'])
+    assert not success and 'accounts' in message
+
+def test_failed_selective_restore_never_commits(backups, monkeypatch):
+    service, calls = backups
+    target = service.backup_dir / 'db_backup_test.dir'
+    service.dump_directory(target)
+    monkeypatch.setenv('PG_STUB_FAIL_RESTORE', '1')
+
+    success, message = service.restore_backup(target, tables=['stipends'])
+
+    assert not success and 'could not read data file' in message
+    _, script = restore_calls(calls)
+    # psql was killed, or saw the truncate and part of the data but no COMMIT
+    assert script is None or 'COMMIT;' not in script
+
+def test_full_restore_recreates_everything(backups):
+    service, calls = backups
+    target = service.backup_dir / 'db_backup_test.dir'
+    service.dump_directory(target)
+
+    success, message = service.restore_backup(target)
+
+    assert success, message
+    assert calls()[-1] == ['pg_restore', '--jobs=4', f'--dbname={service.db_url}', '--clean', '--if-exists', str(target)]
+
+def test_selective_restore_rejects_plain_backups(backups, tmp_path):
+    service, _ = backups
+    plain = tmp_path / 'db_backup_test.sql.gz'
+    with gzip.open(plain, 'wb') as f:
+        f.write(b'-- PostgreSQL database dump\n')
+
+    success, message = service.restore_backup(plain, tables=['stipends'])
+
+    assert not success and 'directory-format' in message
+
+def test_cleanup_counts_both_formats_once(backups):
+    service, _ = backups
+    service.max_backups = 2
+    for i, name in enumerate(('a.sql.gz', 'b.dir', 'c.sql.gz', 'd.dir')):
+        path = service.backup_dir / name
+        path.mkdir() if name.endswith('.dir') else path.write_bytes(b'')
+        os.utime(path, (1_000_000_000 + i, 1_000_000_000 + i))
+    service.retention_days = 100000
+
+    service.cleanup_old_backups()
+
+    assert sorted(p.name for p in service.backup_dir.iterdir()) == ['c.sql.gz', 'd.dir']
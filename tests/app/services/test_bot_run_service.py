@@ -0,0 +1,113 @@
+import logging
+import time
+import pytest
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.bot import Bot, BotStatus
+from app.models.bot_run import BotRunLogChunk
+from app.services.bot_run_service import BotRunHeartbeat, BotRunLogWriter, BotRunService
+from bots.base import BotCancelled, BotContext
+
+@pytest.fixture
+def bot_run(db_session):
+    bot = Bot(name='TagBot', description='Tags stipends')
+    db.session.add(bot)
+    db.session.commit()
+    return BotRunService().start_run(bot)
+
+def test_log_is_stored_in_compressed_chunks(bot_run):
+    writer = BotRunLogWriter(bot_run.id, block_size=1024, flush_interval=60)
+    for i in range(200):
+        writer.write(f"processed stipend {i}\n")
+    writer.flush()
+
+    chunks = BotRunLogChunk.query.filter_by(run_id=bot_run.id).order_by(BotRunLogChunk.seq).all()
+    assert len(chunks) > 1
+    assert sum(len(chunk.data) for chunk in chunks) < sum(chunk.length for chunk in chunks)
+    assert BotRunService().full_log(bot_run.id).splitlines()[-1] == "processed stipend 199"
+
+def test_read_log_resumes_from_offset(bot_run):
+    service = BotRunService()
+    writer = BotRunLogWriter(bot_run.id, flush_interval=60)
+    writer.write("first line\n")
+    writer.flush()
+    text, offset = service.read_log(bot_run.id)
+    assert text == "first line\n"
+
+    writer.write("second line\n")
+    writer.flush()
+    assert service.read_log(bot_run.id, offset) == ("second line\n", offset + len("second line\n"))
+    assert service.read_log(bot_run.id, offset + len("second line\n"))[0] == ""
+
+def test_handler_captures_bot_logger(bot_run):
+    service = BotRunService()
+    bot_logger = logging.getLogger('test_bot_run_service.bot')
+    bot_logger.setLevel(logging.INFO)
+    handler = service.attach_log(bot_run, bot_logger)
+    bot_logger.info("tagging started")
+    service.detach_log(bot_logger, handler)
+    service.finish_run(bot_run, 'failed', error='x' * 2000)
+
+    assert "tagging started" in service.full_log(bot_run.id)
+    assert len(bot_run.error_summary) == 500
+
+def test_claim_refuses_overlapping_runs(db_session):
+    bot = Bot(name='ReviewBot', description='Reviews stipends')
+    db.session.add(bot)
+    db.session.commit()
+    service = BotRunService()
+    assert service.claim(bot)
+    assert not service.claim(bot)
+
+def test_heartbeat_reports_progress_and_cancellation(bot_run):
+    service = BotRunService()
+    ctx = BotContext(progress_callback=BotRunHeartbeat(bot_run.id, interval=0))
+    ctx.report_progress(25, total=100)
+    db.session.refresh(bot_run)
+    assert (bot_run.processed, bot_run.total) == (25, 100)
+
+    assert service.request_cancel(bot_run.id)
+    ctx.report_progress(25)
+    with pytest.raises(BotCancelled):
+        ctx.check_cancelled()
+
+def test_stale_runs_are_reaped(bot_run):
+    service = BotRunService()
+    bot_run.heartbeat_at = datetime.utcnow() - timedelta(seconds=service.heartbeat_timeout + 60)
+    db.session.commit()
+
+    assert service.reap_stale_runs() == 1
+    db.session.refresh(bot_run)
+    assert bot_run.status == BotStatus.FAILED
+    assert bot_run.is_finished
+
+def test_heartbeat_thread_beats_during_a_long_batch(bot_run):
+    bot_run.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+    db.session.commit()
+    heartbeat = BotRunHeartbeat(bot_run.id, interval=0.05)
+    ctx = BotContext(progress_callback=heartbeat)
+
+    heartbeat.start(ctx)
+    # No report_progress: the batch is still running
+    time.sleep(0.3)
+    heartbeat.stop()
+
+    db.session.refresh(bot_run)
+    assert bot_run.heartbeat_at > datetime.utcnow() - timedelta(minutes=1)
+
+def test_bots_left_running_without_a_run_are_reaped(db_session):
+    service = BotRunService()
+    crashed = Bot(name='ReviewBot', description='Reviews stipends', status=BotStatus.RUNNING,
+                  last_run=datetime.utcnow() - timedelta(seconds=service.heartbeat_timeout + 60))
+    legacy = Bot(name='UpdateBot', description='Updates stipends', status=BotStatus.RUNNING)
+    db.session.add_all([crashed, legacy])
+    db.session.commit()
+
+    assert service.reap_stale_runs() == 2
+    assert (crashed.status, legacy.status) == (BotStatus.FAILED, BotStatus.FAILED)
+    assert service.claim(crashed)
+
+    # Claimed a moment ago; its run is about to start
+    assert service.reap_stale_runs() == 0
+    db.session.refresh(crashed)
+    assert crashed.status == BotStatus.RUNNING
@@ -65,3 +65,45 @@ def test_update_bot(db_session, test_bot):
     }
     updated_bot = bot_service.update(test_bot, updated_data)
     assert updated_bot.name == 'Updated Bot Name'
+
+def test_run_bot_runs_registered_bot_end_to_end(db_session):
+    from app.common.enums import NotificationType
+    from app.models.bot import BotStatus
+    from app.models.notification import Notification
+    from app.models.stipend import Stipend
+    from app.services.bot_service import run_bot
+    db_session.add(Stipend(name='Research grant', description='For academic study'))
+    bot = Bot(name='ReviewBot', description='Reviews stipends')
+    db_session.add(bot)
+    db_session.commit()
+
+    run = run_bot(bot)
+
+    assert run.status == BotStatus.COMPLETED
+    assert run.processed == 1
+    assert bot.status == BotStatus.COMPLETED
+    notification = db_session.query(Notification).filter_by(type=NotificationType.BOT_SUCCESS).one()
+    assert notification.related_object_id == bot.id
+
+def test_run_bot_records_failures(db_session, monkeypatch):
+    from app.common.enums import NotificationType
+    from app.models.bot import BotStatus
+    from app.models.notification import Notification
+    from app.models.stipend import Stipend
+    from app.services.bot_service import run_bot
+    from bots.review_bot import ReviewBot
+
+    def fail(self, batch, ctx):
+        raise RuntimeError("review failed")
+    monkeypatch.setattr(ReviewBot, 'process_batch', fail)
+    db_session.add(Stipend(name='Research grant'))
+    bot = Bot(name='ReviewBot', description='Reviews stipends')
+    db_session.add(bot)
+    db_session.commit()
+
+    run = run_bot(bot)
+
+    assert run.status == BotStatus.FAILED
+    assert 'review failed' in run.error_summary
+    notification = db_session.query(Notification).filter_by(type=NotificationType.BOT_ERROR).one()
+    assert notification.message == "ReviewBot failed: review failed"
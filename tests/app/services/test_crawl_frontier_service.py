@@ -0,0 +1,47 @@
+import pytest
+from app.models.crawl_frontier import CrawlStatus, CrawlURL
+from app.services.crawl_frontier_service import CrawlFrontier, normalize_url, url_hash
+
+@pytest.mark.parametrize('url,expected', [
+    ('HTTPS://Example.COM', 'https://example.com/'),
+    ('https://example.com:443/a//b#section', 'https://example.com/a/b'),
+    ('http://example.com:8080/x', 'http://example.com:8080/x'),
+    ('https://example.com/x?b=2&utm_source=mail&a=1&fbclid=z', 'https://example.com/x?a=1&b=2'),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+def test_normalize_url_rejects_non_http():
+    with pytest.raises(ValueError):
+        normalize_url('ftp://example.com/file')
+
+def test_equivalent_urls_share_hash():
+    assert url_hash(normalize_url('https://example.com/?b=1&a=2')) == \
+        url_hash(normalize_url('https://EXAMPLE.com:443/?a=2&b=1#top'))
+
+def test_add_urls_deduplicates(db_session):
+    frontier = CrawlFrontier()
+    assert frontier.add_urls(['https://a.org/x', 'https://A.org/x#frag', 'https://b.org/']) == 2
+    assert frontier.add_urls(['https://a.org/x']) == 0
+    assert db_session.query(CrawlURL).count() == 2
+
+def test_lease_batch_is_disjoint_per_host(db_session):
+    frontier = CrawlFrontier()
+    frontier.add_urls(['https://a.org/1', 'https://a.org/2', 'https://b.org/1'])
+
+    first = frontier.lease_batch('worker-1')
+    assert sorted(url.host for url in first) == ['a.org', 'b.org']
+    # Both hosts are inside their politeness delay now
+    assert frontier.lease_batch('worker-2') == []
+
+def test_complete_and_fail_release_lease(db_session):
+    frontier = CrawlFrontier()
+    frontier.add_urls(['https://a.org/1', 'https://b.org/1'])
+    leased = frontier.lease_batch('worker-1')
+
+    assert frontier.complete(leased[0], content_hash='abc', discovered_urls=['https://c.org/'])
+    assert frontier.fail(leased[1], 'timeout')
+    # A second completion with the stale lease is rejected
+    assert frontier.complete(leased[0], content_hash='abc') is False
+
+    assert frontier.stats() == {CrawlStatus.PENDING: 3}
@@ -0,0 +1,88 @@
+from app.models.stipend import Stipend
+from app.models.stipend_signature import (
+    DuplicateCandidate, DuplicateStatus, StipendLSHBand, StipendSignature
+)
+from app.services.dedup_service import (
+    NUM_BANDS, DedupService, band_buckets, compute_signature, estimate_similarity,
+    pack_signature, unpack_signature
+)
+from app.services.stipend_service import StipendService
+
+BASE_TEXT = ("Global Leaders Research Stipend. Funding for graduate students researching "
+             "climate adaptation in coastal communities. Ocean Futures Foundation")
+
+def test_near_duplicates_have_high_similarity():
+    variant = BASE_TEXT.replace("Global Leaders", "Global Leader's").replace("graduate", "postgraduate")
+    similarity = estimate_similarity(compute_signature(BASE_TEXT), compute_signature(variant))
+    assert similarity >= 0.8
+
+def test_unrelated_texts_have_low_similarity():
+    other = "Arts Travel Grant. Support for painters attending residencies abroad. Nordic Arts Council"
+    assert estimate_similarity(compute_signature(BASE_TEXT), compute_signature(other)) < 0.3
+
+def test_signature_is_deterministic_and_packable():
+    signature = compute_signature(BASE_TEXT)
+    assert signature == compute_signature(BASE_TEXT.upper())
+    assert unpack_signature(pack_signature(signature)) == signature
+    assert len(band_buckets(signature)) == NUM_BANDS
+
+def test_check_stipend_flags_only_bucket_candidates(db_session):
+    service = DedupService()
+    service.check_stipend(1, BASE_TEXT)
+    service.check_stipend(2, "Arts Travel Grant. Support for painters attending residencies abroad.")
+    matches = service.check_stipend(3, BASE_TEXT + " 2025")
+
+    assert [stipend_id for stipend_id, _ in matches] == [1]
+    candidate = db_session.query(DuplicateCandidate).one()
+    assert (candidate.stipend_id, candidate.duplicate_of_id) == (3, 1)
+    assert candidate.status == DuplicateStatus.OPEN
+    assert db_session.query(StipendLSHBand).filter_by(stipend_id=3).count() == NUM_BANDS
+
+def test_reindexing_does_not_duplicate_flags(db_session):
+    service = DedupService()
+    service.check_stipend(1, BASE_TEXT)
+    service.check_stipend(2, BASE_TEXT)
+    service.check_stipend(2, BASE_TEXT)
+    assert db_session.query(DuplicateCandidate).count() == 1
+
+def add_stipends(db_session, *descriptions):
+    stipends = [Stipend(name='Global Leaders Research Stipend', description=description)
+                for description in descriptions]
+    db_session.add_all(stipends)
+    db_session.commit()
+    return [stipend.id for stipend in stipends]
+
+def test_merge_dismisses_the_duplicates_other_pairs(db_session):
+    description = "Funding for graduate students researching climate adaptation in coastal communities."
+    keep, duplicate, other = add_stipends(db_session, description, description + " 2025", description + " 2026")
+    service = DedupService()
+    for stipend_id in (keep, duplicate, other):
+        service.check_stipend(stipend_id)
+
+    service.merge(keep, duplicate)
+
+    statuses = {(c.stipend_id, c.duplicate_of_id): c.status for c in db_session.query(DuplicateCandidate)}
+    assert statuses == {
+        (duplicate, keep): DuplicateStatus.MERGED,
+        (other, keep): DuplicateStatus.OPEN,
+        (other, duplicate): DuplicateStatus.DISMISSED
+    }
+
+def test_editing_a_stipend_reindexes_it(db_session, monkeypatch):
+    description = "Funding for graduate students researching climate adaptation in coastal communities."
+    original, edited = add_stipends(db_session, description, "Support for painters attending residencies abroad.")
+    service = DedupService()
+    service.check_stipend(original)
+    service.check_stipend(edited)
+    stale = db_session.get(StipendSignature, edited).signature
+    # Stipend has no update() of its own here; apply the fields directly
+    monkeypatch.setattr(Stipend, 'update', lambda self, data, user_id=None: [
+        setattr(self, field, value) for field, value in data.items()
+    ], raising=False)
+
+    StipendService().update(edited, {'description': description + " 2025"})
+
+    db_session.expire_all()
+    assert db_session.get(StipendSignature, edited).signature != stale
+    candidate = db_session.query(DuplicateCandidate).one()
+    assert (candidate.stipend_id, candidate.duplicate_of_id) == (edited, original)
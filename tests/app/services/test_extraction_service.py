@@ -0,0 +1,46 @@
+import pytest
+from datetime import datetime
+from app.services.extraction_service import Selector, StipendPageParser, extract_many, extract_stipend
+
+PAGE = '''<html><head><script>var deadline = "ignored";</script></head><body>
+<h1>Funder News</h1>
+<div class="stipend-name main">Nordic <b>Research</b> Grant</div>
+<span itemprop="amount" content="NOK 50,000"></span>
+<div id="eligibility">Open to <em>master</em> students.</div>
+<p class="deadline">15 March 2027</p>
+</body></html>'''
+
+def test_selector_matching():
+    selector = Selector('div.stipend-name[data-kind=grant]')
+    assert selector.matches('div', {'class': 'main stipend-name', 'data-kind': 'grant'})
+    assert not selector.matches('div', {'class': 'stipend-name'})
+    assert not selector.matches('span', {'class': 'stipend-name', 'data-kind': 'grant'})
+
+def test_invalid_selector_raises():
+    with pytest.raises(ValueError):
+        Selector('div > p')
+
+def test_extract_stipend_fields():
+    result = extract_stipend(PAGE, 'https://funder.example/grant')
+    assert result['name'] == 'Nordic Research Grant'
+    assert result['amount'] == 'NOK 50,000'
+    assert result['eligibility'] == 'Open to master students.'
+    assert result['deadline_text'] == '15 March 2027'
+    assert result['deadline'] == datetime(2027, 3, 15)
+
+def test_extract_uses_text_fallbacks():
+    result = extract_stipend('<p>Deadline: 1 May 2027. Award: $5,000 per year</p>')
+    assert result['deadline'] == datetime(2027, 5, 1)
+    assert result['amount'] == '$5,000 per year'
+
+def test_parser_stops_after_specific_matches():
+    parser = StipendPageParser()
+    parser.feed(PAGE)
+    assert parser.done
+
+def test_extract_many_matches_single_page():
+    pages = [('a', PAGE), ('b', '<h1>Only a title</h1>')]
+    results = extract_many(pages, workers=2, chunksize=1)
+    assert [r['url'] for r in results] == ['a', 'b']
+    assert results[1]['name'] == 'Only a title'
+    assert results[1]['deadline'] is None
@@ -0,0 +1,90 @@
+import smtplib
+import time
+import pytest
+from flask import Flask
+from flask_mail import Mail
+from app.services.mail_queue import MailQueue
+
+class StandInConnection:
+    """Records messages like an SMTP connection; fails while ``server.down`` is set"""
+
+    def __init__(self, server):
+        self.server = server
+
+    def __enter__(self):
+        if self.server.down:
+            raise smtplib.SMTPConnectError(421, 'Service not available')
+        self.server.connections += 1
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def send(self, message):
+        if message.recipients[0] in self.server.refused:
+            self.server.refused.discard(message.recipients[0])
+            raise smtplib.SMTPRecipientsRefused({message.recipients[0]: (450, 'Try again')})
+        self.server.delivered.append(message)
+
+class StandInServer:
+    def __init__(self):
+        self.connections = 0
+        self.delivered = []
+        self.refused = set()
+        self.down = False
+
+class StandInQueue(MailQueue):
+    def __init__(self, server):
+        super().__init__()
+        self.server = server
+
+    def _connect(self):
+        return StandInConnection(self.server)
+
+@pytest.fixture
+def server():
+    return StandInServer()
+
+@pytest.fixture
+def mail_queue(server):
+    mail_queue = StandInQueue(server)
+    mail_queue.batch_wait = 0.2
+    mail_queue.retry_base = 0.01
+    app = Flask(__name__)
+    app.config['MAIL_DEFAULT_SENDER'] = 'noreply@example.com'
+    Mail(app)
+    mail_queue.init_app(app)
+    yield mail_queue
+    mail_queue.close()
+
+def test_batch_shares_one_connection(mail_queue, server):
+    with mail_queue.app.app_context():
+        for i in range(20):
+            mail_queue.send_email('Hello', [f'user{i}@example.com'], 'Body')
+    assert mail_queue.flush()
+    assert len(server.delivered) == 20
+    assert server.connections < 5
+
+def test_failed_messages_are_retried_with_backoff(mail_queue, server):
+    server.down = True
+    server.refused.add('picky@example.com')
+    with mail_queue.app.app_context():
+        mail_queue.send_email('Reset', ['user@example.com'], 'Body')
+        mail_queue.flush()
+        assert server.delivered == []
+        server.down = False
+        mail_queue.send_email('Alert', ['picky@example.com'], 'Body')
+        mail_queue.flush()
+        time.sleep(0.1)
+        mail_queue.flush()
+    assert mail_queue.retried == 2
+    assert sorted(m.subject for m in server.delivered) == ['Alert', 'Reset']
+
+def test_gives_up_after_max_attempts(mail_queue, server):
+    server.down = True
+    mail_queue.max_attempts = 1
+    other = Flask('other')
+    Mail(other)
+    with other.app_context():
+        mail_queue.send_email('Lost', ['user@example.com'], 'Body')
+    assert mail_queue.failed == 1 and not mail_queue.running
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.common.enums import NotificationType
+from app.models.audit_log import AuditLog
+from app.models.notification import Notification
+from app.models.notification_counter import BROADCAST_KEY, NotificationCounter
+from app.services.notification_fanout_service import NotificationFanoutService
+from app.services.notification_service import get_notification_count, rebuild_unread_counters
+
+def test_counters_follow_orm_changes(db_session):
+    mine = Notification(message='Mine', type=NotificationType.SYSTEM, user_id=1)
+    broadcast = Notification(message='Everyone', type=NotificationType.SYSTEM, user_id=None)
+    db_session.add_all([mine, broadcast, Notification(message='Theirs', type=NotificationType.SYSTEM, user_id=2)])
+    db_session.commit()
+    assert get_notification_count(1) == 2
+
+    mine.read_status = True
+    db_session.commit()
+    assert get_notification_count(1) == 1
+    assert get_notification_count(2) == 2
+
+    db_session.delete(broadcast)
+    db_session.commit()
+    assert get_notification_count(1) == 0
+    assert db_session.get(NotificationCounter, BROADCAST_KEY).unread == 0
+
+def test_fanout_and_rebuild_keep_counters_exact(db_session):
+    service = NotificationFanoutService()
+    service.run()
+    committed = datetime.utcnow() - timedelta(minutes=1)
+    db_session.execute(insert(AuditLog), [
+        {'user_id': 1, 'action': 'create_stipend', 'object_type': 'Stipend', 'object_id': 1, 'timestamp': committed},
+        {'user_id': None, 'action': 'merge_stipend', 'object_type': 'Stipend', 'object_id': 1, 'timestamp': committed}
+    ])
+    db_session.commit()
+
+    assert service.run() == 2
+    assert get_notification_count(1) == 2
+
+    db_session.query(NotificationCounter).delete()
+    db_session.commit()
+    assert rebuild_unread_counters() == 2
+    assert get_notification_count(1) == 2
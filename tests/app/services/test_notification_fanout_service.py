@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.common.enums import NotificationPriority, NotificationType
+from app.models.audit_log import AuditLog
+from app.models.notification import Notification
+from app.models.stipend import Stipend
+from app.services.dedup_service import DedupService
+from app.services.notification_fanout_service import NotificationFanoutService, route
+
+def entry(action, object_type='Stipend', user_id=1):
+    return {'id': 7, 'user_id': user_id, 'action': action,
+            'object_type': object_type, 'object_id': 3 if object_type else None}
+
+def test_routing_rules():
+    deleted = route(entry('delete_stipend'))
+    assert deleted['type'] == NotificationType.CRUD_DELETE
+    assert deleted['priority'] == NotificationPriority.HIGH
+    assert deleted['user_id'] == 1
+    assert (deleted['related_object_type'], deleted['related_object_id']) == ('Stipend', 3)
+    assert route(entry('update_settings', object_type=None))['related_object_id'] == 7
+    assert deleted['message'] == 'Delete stipend on Stipend 3'
+    assert route(entry('view_dashboard', object_type=None)) is None
+    assert route(entry('update_notification', object_type='Notification')) is None
+    # Actor-addressed notifications need an actor
+    assert route(entry('update_stipend', user_id=None)) is None
+    assert route(entry('merge_stipend', user_id=None))['user_id'] is None
+
+def test_merges_are_broadcast(db_session):
+    keep, duplicate = Stipend(name='Ocean Stipend'), Stipend(name='Ocean Stipend 2025')
+    db_session.add_all([keep, duplicate])
+    db_session.commit()
+    keep_id, duplicate_id = keep.id, duplicate.id
+    DedupService().merge(keep_id, duplicate_id, user_id=1)
+
+    logged = db_session.query(AuditLog).filter_by(object_type='Stipend', object_id=keep_id).one()
+    routed = route({'id': logged.id, 'user_id': logged.user_id, 'action': logged.action,
+                    'object_type': logged.object_type, 'object_id': logged.object_id})
+    assert routed['type'] == NotificationType.ADMIN_ACTION
+    assert routed['user_id'] is None
+
+def test_fanout_creates_each_notification_once(db_session):
+    service = NotificationFanoutService()
+    assert service.run() == 0  # First run only sets the watermark
+
+    committed = datetime.utcnow() - timedelta(minutes=1)
+    db_session.execute(insert(AuditLog), [
+        {'user_id': 1, 'action': 'create_stipend', 'object_type': 'Stipend', 'object_id': 1, 'timestamp': committed},
+        {'user_id': 1, 'action': 'view_dashboard', 'timestamp': committed},
+        {'user_id': 1, 'action': 'create_tag', 'object_type': 'Tag', 'object_id': 2,
+         'timestamp': committed, 'notify': False}
+    ])
+    db_session.commit()
+
+    assert service.run() == 1
+    assert service.run() == 0
+    notification = db_session.query(Notification).one()
+    assert notification.type == NotificationType.CRUD_CREATE
+
+def test_repeats_are_merged_and_low_priority_goes_to_digest(db_session):
+    service = NotificationFanoutService()
+    service.run()
+    service.run_digest()
+
+    committed = datetime.utcnow() - timedelta(minutes=1)
+    db_session.execute(insert(AuditLog), [
+        {'user_id': 1, 'action': 'delete_stipend', 'object_type': 'Stipend', 'object_id': 4, 'timestamp': committed}
+        for _ in range(10)
+    ] + [
+        {'user_id': 1, 'action': 'update_stipend', 'object_type': 'Stipend', 'object_id': i, 'timestamp': committed}
+        for i in range(20)
+    ])
+    db_session.commit()
+
+    assert service.run() == 1
+    merged = db_session.query(Notification).one()
+    assert merged.count == 10 and merged.priority == NotificationPriority.HIGH
+
+    # A later repeat joins the open row while it is unread
+    db_session.execute(insert(AuditLog), [{'user_id': 1, 'action': 'delete_stipend', 'object_type': 'Stipend',
+                                           'object_id': 4, 'timestamp': committed}])
+    db_session.commit()
+    assert service.run() == 0
+    db_session.refresh(merged)
+    assert merged.count == 11
+
+    assert service.run_digest() == 0  # Not due yet
+    assert service.run_digest(now=datetime.utcnow() + timedelta(hours=2)) == 1
+    digest = db_session.query(Notification).filter_by(type=NotificationType.DIGEST).one()
+    assert digest.count == 20 and digest.user_id == 1
+    assert '20 x update stipend' in digest.message
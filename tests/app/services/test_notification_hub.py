@@ -0,0 +1,70 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.common.enums import NotificationType
+from app.models.notification import Notification
+from app.services.notification_hub import NotificationHub
+
+def event(event_id, user_id=1, message='Hello'):
+    return {'id': event_id, 'user_id': user_id, 'message': message, 'type': 'system',
+            'priority': 'medium', 'count': 1, 'created_at': None}
+
+def make_hub(**settings):
+    hub = NotificationHub()
+    hub.__dict__.update(settings)
+    hub._start_id = hub.last_id = 10
+    return hub
+
+def test_stream_resumes_after_last_event_id_and_filters_by_user():
+    hub = make_hub(heartbeat=0.01)
+    hub.publish([event(11), event(12, user_id=2), event(13, user_id=None, message='Everyone')])
+
+    stream = hub.stream(1, last_event_id=11)
+    assert next(stream).startswith('retry:')
+    frame = next(stream)
+    assert frame.startswith('id: 13\nevent: notification\n')
+    assert json.loads(frame.split('data: ')[1])['message'] == 'Everyone'
+    # Nothing new: a heartbeat comment keeps the connection open
+    assert next(stream) == ': keep-alive\n\n'
+
+    hub.publish([event(14)])
+    assert next(stream).startswith('id: 14\n')
+
+def test_evicted_events_are_reported_missing():
+    hub = make_hub()
+    hub._events = hub._events.__class__(maxlen=2)
+    hub.buffer_size = 2
+    hub.publish([event(11), event(12), event(13)])
+    assert hub.events_after(1, 10)[0] is None
+    assert [e['id'] for e in hub.events_after(1, 11)[0]] == [12, 13]
+    # Before the poller started nothing is buffered
+    assert make_hub().events_after(1, 5)[0] is None
+
+def test_connection_cap():
+    hub = make_hub(max_connections=1)
+    hub._ensure_started = lambda: None
+    assert hub.connect()
+    assert not hub.connect()
+    hub.disconnect()
+    assert hub.connect()
+
+def test_poll_holds_back_rows_that_may_still_be_committing(db_session):
+    hub = NotificationHub()
+    hub.lag = 5
+    assert hub.poll() == 0  # First poll only sets the position
+
+    committed = datetime.utcnow() - timedelta(minutes=1)
+    db_session.execute(insert(Notification), [
+        {'message': 'Old', 'type': NotificationType.SYSTEM, 'created_at': committed},
+        {'message': 'Fresh', 'type': NotificationType.SYSTEM, 'created_at': datetime.utcnow()},
+        {'message': 'Old too', 'type': NotificationType.SYSTEM, 'created_at': committed}
+    ])
+    db_session.commit()
+
+    # The row after the fresh one waits with it, so a late commit below it is not skipped
+    assert hub.poll() == 1
+    assert [e['message'] for e in hub._events] == ['Old']
+
+    hub.lag = 0
+    assert hub.poll() == 2
+    assert [e['message'] for e in hub._events] == ['Old', 'Fresh', 'Old too']
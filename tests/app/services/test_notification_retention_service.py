@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.common.enums import NotificationPriority, NotificationType
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
+from app.services.notification_retention_service import (
+    CHECKPOINT_NAME, NotificationRetentionService, RetentionPolicy
+)
+from app.services.notification_service import get_notification_count
+
+def test_first_matching_policy_decides():
+    service = NotificationRetentionService()
+    assert service.policy_for(NotificationType.DIGEST, NotificationPriority.MEDIUM).read_days == 7
+    assert service.policy_for(NotificationType.SYSTEM, NotificationPriority.CRITICAL).unread_days is None
+    policy = RetentionPolicy(read_days=1, unread_days=5)
+    assert policy.keep_days(True, user_id=1) == 1
+    # A broadcast's shared flag says nothing about who has read it
+    assert policy.keep_days(True, user_id=None) == 5
+
+def test_prune_deletes_expired_rows_in_chunks(db_session):
+    now = datetime(2025, 6, 1)
+    row = {'message': 'Test', 'type': NotificationType.SYSTEM, 'priority': NotificationPriority.MEDIUM}
+    db_session.execute(insert(Notification.__table__), [
+        dict(row, user_id=1, read_status=True, created_at=now - timedelta(days=40)),
+        dict(row, user_id=1, read_status=False, created_at=now - timedelta(days=40)),
+        dict(row, user_id=1, read_status=False, created_at=now - timedelta(days=200)),
+        dict(row, user_id=None, read_status=False, created_at=now - timedelta(days=200)),
+        dict(row, user_id=1, read_status=False, created_at=now - timedelta(days=1), priority=NotificationPriority.LOW)
+    ])
+    NotificationCounter.apply(db_session.connection(), {1: 3, None: 1})
+    db_session.commit()
+
+    service = NotificationRetentionService(policies=[RetentionPolicy(read_days=30, unread_days=180)])
+    service.chunk_size = 2
+    report = service.prune(now=now)
+
+    assert report == {'scanned': 4, 'deleted': 3}
+    assert db_session.query(Notification).count() == 2
+    assert get_notification_count(1) == 2
+
+def test_prune_resumes_where_a_limited_run_stopped(db_session):
+    now = datetime(2025, 6, 1)
+    row = {'message': 'Test', 'type': NotificationType.SYSTEM, 'priority': NotificationPriority.MEDIUM,
+           'user_id': 1, 'read_status': True}
+    db_session.execute(insert(Notification.__table__), [
+        dict(row, created_at=now - timedelta(days=40)),
+        dict(row, created_at=now - timedelta(days=10)),
+        dict(row, created_at=now - timedelta(days=40)),
+        dict(row, created_at=now - timedelta(days=1))
+    ])
+    db_session.commit()
+    service = NotificationRetentionService(policies=[RetentionPolicy(read_days=30, unread_days=180)])
+    service.chunk_size = 2
+
+    assert service.prune(now=now, max_chunks=1) == {'scanned': 2, 'deleted': 1}
+    checkpoint = db_session.query(JobCheckpoint).filter_by(name=CHECKPOINT_NAME).one()
+    assert checkpoint.last_id == 2
+
+    # The next run starts after the rows already scanned and finishes the pass
+    assert service.prune(now=now) == {'scanned': 2, 'deleted': 1}
+    db_session.refresh(checkpoint)
+    assert checkpoint.last_id is None
+    # A new pass revisits the rows kept earlier, which expire in time
+    assert service.prune(now=now + timedelta(days=30)) == {'scanned': 2, 'deleted': 2}
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from app.common.enums import NotificationType
+from app.models.notification import Notification
+from app.models.notification_read import NotificationReadMark, NotificationReadState
+from app.services.notification_service import (
+    delete_notifications, get_notification_count, get_unread_notifications, mark_notification_read,
+    mark_notifications_read, rebuild_unread_counters
+)
+
+def _add(db_session, user_id=1, type=NotificationType.SYSTEM, read=False, created_at=None):
+    notification = Notification(message='Test', type=type, user_id=user_id)
+    notification.read_status = read
+    notification.created_at = created_at or datetime.utcnow()
+    db_session.add(notification)
+    return notification
+
+def test_mark_notifications_read_by_type_and_all(db_session):
+    _add(db_session, type=NotificationType.CRUD_CREATE)
+    _add(db_session, type=NotificationType.CRUD_DELETE)
+    _add(db_session, type=NotificationType.CRUD_DELETE, read=True)
+    _add(db_session, user_id=2)
+    db_session.commit()
+
+    assert mark_notifications_read(1, type=NotificationType.CRUD_DELETE) == 1
+    assert get_notification_count(1) == 1
+    assert mark_notifications_read(1) == 1
+    assert mark_notifications_read(1) == 0
+    assert get_notification_count(1) == 0
+    assert get_notification_count(2) == 1
+
+def test_delete_notifications_keeps_counter_in_step(db_session):
+    old = _add(db_session, created_at=datetime.utcnow() - timedelta(days=40))
+    read = _add(db_session, read=True)
+    _add(db_session)
+    other = _add(db_session, user_id=2)
+    db_session.commit()
+    old_id = old.id
+
+    assert delete_notifications(1, before=datetime.utcnow() - timedelta(days=30)) == 1
+    assert get_notification_count(1) == 1
+    # Another user's ids are not touched
+    assert delete_notifications(1, ids=[read.id, other.id]) == 1
+    assert get_notification_count(1) == 1
+    assert delete_notifications(1) == 1
+    assert get_notification_count(1) == 0
+    assert get_notification_count(2) == 1
+    assert db_session.get(Notification, old_id) is None
+
+def test_broadcasts_are_read_per_user(db_session):
+    first = _add(db_session, user_id=None)
+    second = _add(db_session, user_id=None, type=NotificationType.CRUD_DELETE)
+    db_session.commit()
+    assert get_notification_count(1) == 2 and get_notification_count(2) == 2
+
+    mark_notification_read(first.id, user_id=1)
+    assert get_notification_count(1) == 1
+    assert get_notification_count(2) == 2
+    assert [n.id for n in get_unread_notifications(1)] == [second.id]
+    # Marking again does not count twice
+    assert mark_notifications_read(1, ids=[first.id]) == 0
+
+    assert mark_notifications_read(2, type=NotificationType.CRUD_DELETE) == 1
+    assert mark_notifications_read(1) == 1
+    assert get_unread_notifications(1) == []
+    assert db_session.query(NotificationReadMark).filter_by(user_id=1).count() == 0
+
+    third = _add(db_session, user_id=None)
+    db_session.commit()
+    assert get_notification_count(1) == 1
+    db_session.delete(first)
+    db_session.commit()
+    assert get_notification_count(1) == 1
+    assert get_notification_count(2) == 1
+
+    db_session.query(NotificationReadState).update({'broadcast_read': 0})
+    db_session.commit()
+    rebuild_unread_counters()
+    assert get_notification_count(1) == 1
+    assert [n.id for n in get_unread_notifications(2)] == [third.id]
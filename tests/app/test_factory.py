@@ -0,0 +1,26 @@
+from app.factory import create_app
+from app.models.audit_log import AuditLog
+from app.services.audit_writer import audit_writer
+from app.services.mail_queue import mail_queue
+from app.services.notification_hub import notification_hub
+
+def test_create_app_registers_background_services():
+    app = create_app('testing')
+
+    assert app.extensions['audit_writer'] is audit_writer and audit_writer.app is app
+    assert app.extensions['notification_hub'] is notification_hub and notification_hub.app is app
+    assert app.extensions['mail_queue'] is mail_queue and mail_queue.app is app
+
+def test_async_audit_entries_are_queued_for_the_factory_app(monkeypatch):
+    app = create_app('testing')
+    written = []
+    monkeypatch.setattr(audit_writer, '_write_batch', written.extend)
+    monkeypatch.setattr(audit_writer, '_ensure_started', lambda: None)
+
+    with app.app_context():
+        audit_writer.submit(AuditLog.build_row(1, 'view_dashboard'))
+
+    # Queued for the writer thread (which also runs the notification fan-out), not written inline
+    assert written == []
+    assert audit_writer._queue.qsize() == 1
+    audit_writer._queue.get_nowait()
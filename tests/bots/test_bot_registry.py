@@ -0,0 +1,62 @@
+import sys
+import pytest
+from bots import registry
+from bots.base import BaseBot, BotCancelled, BotContext
+
+class CountingBot(BaseBot):
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def iter_batches(self, ctx):
+        return iter([[1, 2], [3], [4, 5]])
+
+    def process_batch(self, batch, ctx):
+        self.seen.extend(batch)
+        if len(self.seen) >= 3:
+            ctx.cancel()
+
+def test_discover_finds_builtin_bots():
+    assert {'TagBot', 'UpdateBot', 'ReviewBot'} <= set(registry.available_bots())
+    assert registry.discover_bots()['ReviewBot'] == 'bots.review_bot:ReviewBot'
+
+def test_discovery_does_not_import_bot_modules():
+    sys.modules.pop('bots.update_bot', None)
+    registry.discover_bots.cache_clear()
+    registry.discover_bots()
+    assert 'bots.update_bot' not in sys.modules
+
+def test_get_bot_class_imports_lazily():
+    registry._class_cache.pop('UpdateBot', None)
+    bot_class = registry.get_bot_class('UpdateBot')
+    assert bot_class.__name__ == 'UpdateBot'
+    assert issubclass(bot_class, BaseBot)
+
+def test_get_unknown_bot_raises():
+    with pytest.raises(ValueError) as exc_info:
+        registry.get_bot_class('NoSuchBot')
+    assert "Unknown bot type: NoSuchBot" in str(exc_info.value)
+
+def test_run_reports_progress():
+    reports = []
+    ctx = BotContext(progress_callback=lambda c: reports.append(c.processed))
+    bot = CountingBot()
+    with pytest.raises(BotCancelled):
+        bot.run(ctx=ctx)
+    # Cancellation is honoured between batches
+    assert bot.seen == [1, 2, 3]
+    assert reports == [2, 3]
+
+def test_context_eta():
+    ctx = BotContext()
+    assert ctx.eta_seconds is None
+    ctx.report_progress(5, total=10)
+    assert ctx.eta_seconds is not None
+
+def test_incomplete_bot_cannot_be_instantiated():
+    class NoWorkBot(BaseBot):
+        def iter_batches(self, ctx):
+            return iter([])
+
+    with pytest.raises(TypeError):
+        NoWorkBot()
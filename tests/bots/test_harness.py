@@ -0,0 +1,129 @@
+import pytest
+from datetime import datetime
+from app.models.crawl_frontier import CrawlHost
+from bots.base import BaseBot, BotContext
+from bots.harness import FixtureBundle, FixtureMiss, ReplayFetcher, _decode, _encode, dry_run_session
+from bots.update_bot import UpdateBot
+
+def test_values_round_trip_through_json_encoding():
+    for value in (datetime(2026, 3, 1, 12, 30), b'\x00\xffdata', 'text', 42, None):
+        assert _decode(_encode(value)) == value
+
+def test_bundle_pages_round_trip(tmp_path):
+    bundle = FixtureBundle(tmp_path / 'bundle')
+    bundle.manifest['bot'] = 'UpdateBot'
+    bundle.save_page('https://funder.example/stipend', '<h1>Stipend</h1>')
+    bundle.save_manifest()
+
+    replay = ReplayFetcher(FixtureBundle(tmp_path / 'bundle'))
+    assert replay('https://funder.example/stipend') == '<h1>Stipend</h1>'
+    with pytest.raises(FixtureMiss):
+        replay('https://other.example/')
+
+def test_run_records_stage_timings():
+    class ListBot(BaseBot):
+        def iter_batches(self, ctx):
+            return iter([[1, 2], [3]])
+
+        def process_batch(self, batch, ctx):
+            with ctx.stage('fetch'):
+                pass
+
+    ctx = ListBot().run(ctx=BotContext())
+    assert ctx.processed == 3
+    assert ctx.stage_calls['process'] == 2
+    assert ctx.stage_calls['fetch'] == 2
+    assert ctx.stage_calls['load'] == 3
+
+def test_update_bot_record_replay_round_trip(db_session, tmp_path):
+    from app.models.organization import Organization
+    from app.models.stipend import Stipend
+    from bots.harness import record, replay
+    organization = Organization(name='Funder', website='https://funder.example/')
+    db_session.add(organization)
+    db_session.flush()
+    db_session.add_all([
+        Stipend(name='Own page', homepage_url='https://funder.example/own'),
+        Stipend(name='Organization page', organization_id=organization.id),
+        Stipend(name='No page'),
+    ])
+    db_session.commit()
+    pages = {
+        'https://funder.example/own':
+            '<h1>Own page</h1><p class="deadline">1 March 2027</p><p class="eligibility">PhD students</p>',
+        'https://funder.example/': '<h1>Funder</h1><p class="eligibility">Anyone</p>',
+    }
+
+    record('UpdateBot', tmp_path / 'bundle', fetcher=pages.__getitem__)
+
+    # The recording run is dry: the live rows are untouched
+    assert db_session.query(Stipend).filter(Stipend.eligibility_criteria.isnot(None)).count() == 0
+
+    db_session.query(Stipend).delete()
+    db_session.query(Organization).delete()
+    db_session.commit()
+    report = replay(tmp_path / 'bundle')
+
+    assert report['items'] == 3
+    assert report['summary'] == {'fetched': 2, 'failed': 0, 'updated': 2}
+    assert report['stages']['fetch']['calls'] == 2
+
+def test_review_bot_replays_into_a_fresh_schema(db_session, tmp_path):
+    from app.models.review_finding import ReviewFinding
+    from app.models.stipend import Stipend
+    from bots.harness import record, replay
+    db_session.add_all([Stipend(name='Described', description='Text'), Stipend(name='Undescribed')])
+    db_session.commit()
+
+    record('ReviewBot', tmp_path / 'bundle')
+    assert db_session.query(ReviewFinding).count() == 0
+
+    db_session.query(Stipend).delete()
+    db_session.commit()
+    report = replay(tmp_path / 'bundle')
+
+    assert report['items'] == 2
+    assert report['summary'] == {'reviewed': 2, 'findings': 3}
+
+def test_tag_bot_replay_keeps_audit_entries_in_the_dry_run(db_session, tmp_path):
+    from app.models.audit_log import AuditLog
+    from app.models.stipend import Stipend
+    from app.models.tag import Tag
+    from bots.harness import record, replay
+    db_session.add(Tag(name='Research', category='Type'))
+    db_session.add_all([Stipend(name='Research grant', description='For academic study'),
+                        Stipend(name='Travel fund', description='Conference travel')])
+    db_session.commit()
+
+    record('TagBot', tmp_path / 'bundle')
+    # Synchronous and ASYNC entries (tag_added) were rolled back with the run
+    assert db_session.query(AuditLog).count() == 0
+    assert db_session.query(Stipend).filter(Stipend.tags.any()).count() == 0
+
+    db_session.query(Stipend).delete()
+    db_session.query(Tag).delete()
+    db_session.commit()
+    report = replay(tmp_path / 'bundle')
+
+    assert report['items'] == 2
+    assert db_session.query(AuditLog).count() == 0
+
+def test_update_bot_applies_extracted_fields():
+    from app.models.stipend import Stipend
+    stipend = Stipend(name='Stipend')
+    deadline = datetime(2027, 3, 1)
+    bot = UpdateBot(fetcher=lambda url: '')
+    assert bot._apply(stipend, {'deadline': deadline, 'eligibility': 'PhD students', 'amount': '100'})
+    assert (stipend.application_deadline, stipend.eligibility_criteria) == (deadline, 'PhD students')
+    assert not bot._apply(stipend, {'deadline': deadline})
+
+def test_dry_run_session_discards_commits(db_session):
+    from app.extensions import db
+    db.session.add(CrawlHost(host='example.org', crawl_delay=1.0))
+    db.session.commit()
+
+    with dry_run_session():
+        CrawlHost.query.filter_by(host='example.org').one().crawl_delay = 9.0
+        db.session.commit()
+
+    assert CrawlHost.query.filter_by(host='example.org').one().crawl_delay == 1.0
@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.organization import Organization
+from app.models.review_finding import ReviewFinding, ReviewIssue
+from app.models.stipend import Stipend
+from bots.review_bot import ReviewBot
+
+@pytest.fixture
+def organization(db_session):
+    organization = Organization(name='Test Org')
+    db_session.add(organization)
+    db_session.commit()
+    return organization
+
+def test_review_clean_stipend_has_no_findings(db_session, organization):
+    stipend = Stipend(name='Test Stipend', description='Test description', organization_id=organization.id)
+    db_session.add(stipend)
+    db_session.commit()
+
+    assert ReviewBot()._review_stipend(stipend, datetime.utcnow()) == []
+
+def test_review_flags_missing_fields(db_session):
+    stipend = Stipend(name='Test Stipend', description='  ')
+    db_session.add(stipend)
+    db_session.commit()
+
+    findings = ReviewBot()._review_stipend(stipend, datetime.utcnow())
+    assert {f['issue'] for f in findings} == {ReviewIssue.MISSING_FIELD}
+    assert {f['field'] for f in findings} == {'description', 'organization_id'}
+
+def test_review_flags_past_deadline_only_when_active(db_session, organization):
+    past = datetime.utcnow() - timedelta(days=1)
+    stipend = Stipend(name='Test Stipend', description='Test description',
+                      organization_id=organization.id, application_deadline=past)
+    db_session.add(stipend)
+    db_session.commit()
+
+    findings = ReviewBot()._review_stipend(stipend, datetime.utcnow())
+    assert [(f['field'], f['issue']) for f in findings] == [('application_deadline', ReviewIssue.PAST_DEADLINE)]
+
+    stipend.active = False
+    db_session.commit()
+    assert ReviewBot()._review_stipend(stipend, datetime.utcnow()) == []
+
+def test_review_flags_invalid_url(db_session, organization):
+    stipend = Stipend(name='Test Stipend', description='Test description',
+                      organization_id=organization.id, homepage_url='ftp://example.com')
+    db_session.add(stipend)
+    db_session.commit()
+
+    findings = ReviewBot()._review_stipend(stipend, datetime.utcnow())
+    assert [(f['field'], f['issue']) for f in findings] == [('homepage_url', ReviewIssue.INVALID_URL)]
+
+    stipend.homepage_url = 'https://example.com/stipend'
+    db_session.commit()
+    assert ReviewBot()._review_stipend(stipend, datetime.utcnow()) == []
+
+def test_run_only_reviews_changed_stipends(db_session, organization):
+    for i in range(5):
+        db_session.add(Stipend(name=f'Stipend {i}', organization_id=organization.id))
+    db_session.commit()
+
+    bot = ReviewBot(chunk_size=2)
+    assert bot.run().processed == 5
+    assert bot.summary == {'reviewed': 5, 'findings': 5}
+    assert db_session.query(ReviewFinding).filter_by(field='description').count() == 5
+
+    # Nothing changed since the checkpoint
+    bot.run()
+    assert bot.summary['reviewed'] == 0
+
+    stipend = db_session.query(Stipend).first()
+    stipend_id = stipend.id
+    stipend.description = 'Now described'
+    db_session.commit()
+    bot.run()
+    assert bot.summary == {'reviewed': 1, 'findings': 0}
+    assert db_session.query(ReviewFinding).filter_by(stipend_id=stipend_id).count() == 0
+
+    checkpoint = db_session.query(JobCheckpoint).filter_by(name=ReviewBot.CHECKPOINT_NAME).one()
+    assert checkpoint.last_id == stipend_id
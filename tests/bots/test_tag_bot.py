@@ -0,0 +1,25 @@
+from app.models.stipend import Stipend
+from app.models.tag import Tag
+from bots.tag_bot import TagBot
+
+def test_run_tags_untagged_stipends_in_chunks(db_session):
+    research = Tag(name='Research', category='Type')
+    stem = Tag(name='STEM', category='Field')
+    db_session.add_all([research, stem])
+    db_session.add_all([
+        Stipend(name='Research grant', description='For academic study'),
+        Stipend(name='Engineering award', description='Science and technology'),
+        Stipend(name='Travel fund', description='Conference travel'),
+    ])
+    db_session.commit()
+
+    ctx = TagBot(chunk_size=2).run()
+
+    assert ctx.processed == 3
+    tagged = {stipend.name: sorted(tag.name for tag in stipend.tags)
+              for stipend in db_session.query(Stipend).all()}
+    assert tagged == {
+        'Research grant': ['Research'],
+        'Engineering award': ['STEM'],
+        'Travel fund': [],
+    }
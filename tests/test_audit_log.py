@@ -132,3 +132,24 @@ def test_audit_log_with_object_id():
         db.session.remove()
         db.drop_all()
 
+
+def test_compute_changes_keeps_only_changed_fields():
+    from app.models.audit_log import apply_changes, compute_changes
+    before = {'name': 'Old', 'summary': 'Long text', 'open': True}
+    after = {'name': 'New', 'summary': 'Long text', 'open': True}
+
+    assert compute_changes(None, after) == {'after': after}
+    assert compute_changes(before, None) == {'before': before}
+    changes = compute_changes(before, after)
+    assert changes == {'diff': {'name': ['Old', 'New']}}
+    assert apply_changes(before, changes) == (before, after)
+    # Legacy rows stored whole objects as JSON text
+    assert apply_changes(None, None, '{"name": "Old"}', '{"name": "New"}') == ({'name': 'Old'}, {'name': 'New'})
+
+def test_build_row_stores_diff_instead_of_text_blobs():
+    row = AuditLog.build_row(1, 'update_stipend', object_type='Stipend', object_id=1,
+                             details_before={'name': 'Old', 'amount': 5},
+                             details_after='{"name": "New", "amount": 5}')
+    assert row['changes'] == {'diff': {'name': ['Old', 'New']}}
+    assert row['details_before'] is None and row['details_after'] is None
+    assert AuditLog.build_row(1, 'note', details_before='free text')['details_before'] == 'free text'
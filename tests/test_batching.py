@@ -0,0 +1,57 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.common.batching import committed_id_bound, iter_chunks
+from app.extensions import db
+from app.models.audit_log import AuditLog
+from app.models.crawl_frontier import CrawlHost
+from app.models.job_checkpoint import JobCheckpoint
+
+@pytest.fixture
+def hosts(db_session):
+    db.session.execute(insert(CrawlHost), [
+        {'host': f'host{i}.org', 'crawl_delay': 1.0} for i in range(25)
+    ])
+    db.session.commit()
+    return db_session
+
+def test_iter_chunks_bounds_identity_map(hosts):
+    sizes = []
+    for chunk in iter_chunks(CrawlHost.query, chunk_size=10):
+        assert len(db.session.identity_map) <= 10
+        sizes.append(len(chunk))
+    assert sizes == [10, 10, 5]
+
+def test_iter_chunks_commits_each_chunk(hosts):
+    for chunk in iter_chunks(CrawlHost.query, chunk_size=10):
+        for host in chunk:
+            host.crawl_delay = 2.0
+    assert CrawlHost.query.filter_by(crawl_delay=2.0).count() == 25
+
+def test_iter_chunks_resumes_from_checkpoint(hosts):
+    with pytest.raises(RuntimeError):
+        for index, chunk in enumerate(iter_chunks(CrawlHost.query, chunk_size=10, checkpoint='hosts')):
+            if index == 1:
+                raise RuntimeError("worker killed")
+    db.session.rollback()
+
+    checkpoint = JobCheckpoint.query.filter_by(name='hosts').one()
+    resumed = next(iter_chunks(CrawlHost.query, chunk_size=10, checkpoint='hosts'))
+    assert resumed[0].id == checkpoint.last_id + 1
+
+def test_committed_id_bound_crosses_wide_id_gaps(db_session):
+    committed = datetime.utcnow() - timedelta(minutes=1)
+    db.session.execute(insert(AuditLog), [
+        {'id': i, 'user_id': None, 'action': 'update', 'timestamp': committed} for i in (1, 2, 500, 505, 900)
+    ] + [{'id': 1000, 'user_id': None, 'action': 'update', 'timestamp': datetime.utcnow()}])
+    db.session.commit()
+
+    def bound(after):
+        return committed_id_bound(db.session, AuditLog.id, AuditLog.timestamp, after, chunk_size=10, lag=5)
+
+    assert bound(0) == 2
+    assert bound(2) == 505
+    assert bound(505) == 900
+    # Row 1000 is too recent to pass the watermark
+    assert bound(900) == 999
+    assert bound(999) is None
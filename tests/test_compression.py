@@ -0,0 +1,25 @@
+import gzip
+import io
+import os
+import subprocess
+import pytest
+from app.common.compression import ParallelGzipWriter
+
+def test_output_is_standard_gzip_in_input_order(tmp_path):
+    data = b''.join(f'row {i}\n'.encode() for i in range(200000)) + os.urandom(50000)
+    path = tmp_path / 'dump.sql.gz'
+    with ParallelGzipWriter(path, level=6, threads=4, block_size=64 * 1024) as writer:
+        for start in range(0, len(data), 10000):
+            writer.write(data[start:start + 10000])
+    assert gzip.decompress(path.read_bytes()) == data
+    assert writer.bytes_out == path.stat().st_size < len(data)
+    if subprocess.run(['which', 'gzip'], capture_output=True).returncode == 0:
+        assert subprocess.run(['gzip', '-dc', str(path)], capture_output=True, check=True).stdout == data
+
+def test_empty_input_and_file_objects():
+    buffer = io.BytesIO()
+    with ParallelGzipWriter(buffer, threads=2):
+        pass
+    assert gzip.decompress(buffer.getvalue()) == b''
+    with pytest.raises(ValueError):
+        ParallelGzipWriter(io.BytesIO(), level=0)